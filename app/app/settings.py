@@ -37,15 +37,20 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "core",
     "user",
     "blog",
+    "portfolio",
+    "feed",
 ]
 
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -78,16 +83,72 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# Connections persist for DB_CONN_MAX_AGE seconds and are checked before
+# reuse. Threaded servers can set DB_ENGINE to core.backends.pooled, with
+# DB_CONN_MAX_AGE at 0, to hand connections back to a per-process pool of
+# DB_POOL_MIN_SIZE to DB_POOL_MAX_SIZE connections at the end of requests.
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": os.environ.get("DB_ENGINE", "core.backends.postgresql"),
         "HOST": os.environ.get("DB_HOST"),
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASS"),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        "POOL": {
+            "MIN_SIZE": int(os.environ.get("DB_POOL_MIN_SIZE", 1)),
+            "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        },
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend such as memcached so every process sees the same invalidations.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "portfolio-blog-api"),
     }
 }
 
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 300))
+
+# Responses of these types and at least this size are compressed, with
+# brotli when the optional brotli package is installed and gzip otherwise.
+# Compressed bodies are cached by ETag in the API cache.
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+)
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_CACHE_TIMEOUT = 600
+
+
+# Background jobs
+# Run by `manage.py run_worker`; failed jobs are retried with exponential
+# backoff and a claimed job is handed to another worker if its lease expires.
+
+JOB_MAX_ATTEMPTS = 5
+JOB_BACKOFF_BASE = 10
+JOB_BACKOFF_MAX = 60 * 60
+JOB_LEASE_SECONDS = 10 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -108,6 +169,15 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Authentication tokens
+# CreateTokenView issues database tokens unless a signed token is requested
+# or AUTH_TOKEN_TYPE is "signed". Signed tokens are verified without a query.
+
+AUTH_TOKEN_TYPE = os.environ.get("AUTH_TOKEN_TYPE", "db")
+SIGNED_TOKEN_MAX_AGE = int(os.environ.get("SIGNED_TOKEN_MAX_AGE", 60 * 60 * 24))
+SIGNED_TOKEN_USER_CACHE_TIMEOUT = 60
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.1/topics/i18n/
 
@@ -129,6 +199,66 @@ STATIC_URL = "/static/"
 MEDIA_URL = "/media/"
 
 MEDIA_ROOT = "/vol/web/media"
+
 STATIC_ROOT = "/vol/web/static"
 
+# Media is served by core.media.MediaView. Set MEDIA_OFFLOAD to
+# "x-accel-redirect" (nginx, with an internal location at MEDIA_ACCEL_PREFIX
+# aliased to MEDIA_ROOT) or "x-sendfile" (Apache, lighttpd) to let the web
+# server send the file once access has been checked.
+
+MEDIA_OFFLOAD = os.environ.get("MEDIA_OFFLOAD", "")
+MEDIA_ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/protected-media/")
+MEDIA_CACHE_MAX_AGE = int(os.environ.get("MEDIA_CACHE_MAX_AGE", 86400))
+
+# Picture images and renditions are stored under the SHA-256 of their content,
+# hashed while the upload streams in, so their URLs can be cached for good
+
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+FILE_UPLOAD_HANDLERS = [
+    "core.storage.HashingMemoryFileUploadHandler",
+    "core.storage.HashingTemporaryFileUploadHandler",
+]
+
 AUTH_USER_MODEL = "core.User"
+
+# Picture renditions: one per width smaller than the original, per format
+
+PICTURE_RENDITION_WIDTHS = (320, 640, 1280, 1920)
+PICTURE_RENDITION_FORMATS = ("WEBP", "JPEG")
+PICTURE_RENDITION_QUALITY = 80
+
+# Pictures carry a blurred placeholder no larger than this, as a data URI
+
+PICTURE_PLACEHOLDER_SIZE = 16
+
+# Resumable chunked uploads are assembled here before being attached
+
+CHUNKED_UPLOAD_DIR = os.environ.get("CHUNKED_UPLOAD_DIR", "/vol/web/chunks")
+CHUNKED_UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY = 24 * 60 * 60
+
+# Largest number of items accepted by a single bulk request
+
+BULK_MAX_ITEMS = 1000
+
+# Lifetime of public feed responses in browsers and in shared caches such as
+# a CDN, which can purge them early by surrogate key
+
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get("PUBLIC_CACHE_MAX_AGE", 60))
+PUBLIC_CACHE_S_MAXAGE = int(os.environ.get("PUBLIC_CACHE_S_MAXAGE", 600))
+
+# Static JSON snapshots of published content written by export_snapshot
+
+SNAPSHOT_ROOT = os.environ.get("SNAPSHOT_ROOT", "/vol/web/snapshot")
+
+# Request latency, query and response size aggregates per view, served at
+# /metrics in the Prometheus text format. Pre-fork servers point METRICS_DIR
+# at a directory shared by their workers, where each process writes its
+# aggregates at most every METRICS_FLUSH_INTERVAL seconds for the others to
+# read. Scrapes must send METRICS_TOKEN as a bearer token; without one set,
+# the metrics are only served with DEBUG on.
+
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 1))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
@@ -14,13 +14,23 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.media import MediaView
+from core.metrics import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/user/", include("user.urls")),
     path("api/blog/", include("blog.urls")),
     path("api/picture/", include("picture.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path("api/portfolio/", include("portfolio.urls")),
+    path("api/feed/", include("feed.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+    path(
+        f"{settings.MEDIA_URL.lstrip('/')}<path:path>",
+        MediaView.as_view(),
+        name="media",
+    ),
+]
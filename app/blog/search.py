@@ -0,0 +1,70 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Func, TextField, Value
+from django.db.models.functions import Cast
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_CONFIG = "english"
+
+# Title, tag names and text are weighted A, B and C respectively so that a
+# title match outranks a tag match, which outranks a match in the body.
+UPDATE_SEARCH_VECTOR_SQL = """
+    UPDATE core_blog SET search_vector =
+        setweight(to_tsvector(%(config)s::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector(%(config)s::regconfig, coalesce((
+            SELECT string_agg(core_tag.name, ' ')
+            FROM core_tag
+            INNER JOIN core_blog_tags ON core_blog_tags.tag_id = core_tag.id
+            WHERE core_blog_tags.blog_id = core_blog.id
+        ), '')), 'B') ||
+        setweight(to_tsvector(%(config)s::regconfig, coalesce(text, '')), 'C')
+    WHERE core_blog.id = ANY(%(ids)s)
+"""
+
+
+def update_search_vectors(blog_ids):
+    """Recompute the stored search vector of the given blogs"""
+    blog_ids = list(blog_ids)
+    if not blog_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPDATE_SEARCH_VECTOR_SQL, {"config": SEARCH_CONFIG, "ids": blog_ids}
+        )
+
+
+class SearchHeadline(Func):
+    """Highlighted fragments of a document matching a search query"""
+
+    function = "ts_headline"
+    output_field = TextField()
+
+    def __init__(self, expression, query, options="MaxFragments=2, MaxWords=30"):
+        config = Func(
+            Value(SEARCH_CONFIG),
+            template="%(expressions)s::regconfig",
+            output_field=TextField(),
+        )
+        super().__init__(config, expression, query, Value(options))
+
+
+class BlogSearchFilter(filters.BaseFilterBackend):
+    """Ranked full text search over the stored blog search vector"""
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def get_search_terms(self, request):
+        """Return the search terms from the query params"""
+        return request.query_params.get(self.search_param, "").strip()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        query = SearchQuery(terms, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+            snippet=SearchHeadline("text", query),
+        )
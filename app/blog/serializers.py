@@ -9,8 +9,8 @@ class TagSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Tag
-        fields = ("id", "name")
-        read_only_fields = ("id",)
+        fields = ("id", "name", "usage_count")
+        read_only_fields = ("id", "usage_count")
 
 
 class BlogSerializer(serializers.ModelSerializer):
@@ -20,10 +20,14 @@ class BlogSerializer(serializers.ModelSerializer):
         many=True, queryset=Picture.objects.all()
     )
     tags = serializers.PrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
+    snippet = serializers.CharField(read_only=True)
+
+    # Serializers nesting these relations in full with ?expand=
+    expandable_fields = {"pictures": PictureSerializer, "tags": TagSerializer}
 
     class Meta:
         model = Blog
-        fields = ("id", "title", "text", "pictures", "tags")
+        fields = ("id", "title", "text", "pictures", "tags", "published", "snippet")
         read_only_fields = ("id",)
 
 
@@ -0,0 +1,78 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from blog.search import update_search_vectors
+from blog.usage import update_usage_counts
+from core.models import Blog, Tag
+
+
+@receiver(post_save, sender=Blog)
+def update_blog_search_vector(sender, instance, **kwargs):
+    """Refresh the search vector after a blog is saved"""
+    update_search_vectors([instance.pk])
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def update_search_vector_on_tags_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Refresh the search vectors of blogs whose tags changed"""
+    if action == "pre_clear" and reverse:
+        instance._search_blog_ids = list(instance.blog_set.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove"):
+        update_search_vectors(pk_set if reverse else [instance.pk])
+    elif action == "post_clear":
+        update_search_vectors(
+            getattr(instance, "_search_blog_ids", []) if reverse else [instance.pk]
+        )
+
+
+@receiver(post_save, sender=Tag)
+def update_search_vector_on_tag_renamed(sender, instance, created, **kwargs):
+    """Refresh the search vectors of blogs carrying a renamed tag"""
+    if not created:
+        update_search_vectors(instance.blog_set.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_blogs(sender, instance, **kwargs):
+    """Record the blogs carrying a tag before its through rows are deleted"""
+    instance._search_blog_ids = list(instance.blog_set.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def update_search_vector_on_tag_deleted(sender, instance, **kwargs):
+    """Refresh the search vectors of blogs that carried a deleted tag"""
+    update_search_vectors(getattr(instance, "_search_blog_ids", []))
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def update_usage_counts_on_tags_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Recount the blogs carrying tags that were added or removed"""
+    if action == "pre_clear" and not reverse:
+        instance._usage_tag_ids = list(instance.tags.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove"):
+        update_usage_counts([instance.pk] if reverse else pk_set)
+    elif action == "post_clear":
+        update_usage_counts(
+            [instance.pk] if reverse else getattr(instance, "_usage_tag_ids", [])
+        )
+
+
+@receiver(pre_delete, sender=Blog)
+def remember_blog_tags(sender, instance, **kwargs):
+    """Record the tags of a blog before its through rows are deleted"""
+    instance._usage_tag_ids = list(instance.tags.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Blog)
+def update_usage_counts_on_blog_deleted(sender, instance, **kwargs):
+    """Recount the blogs carrying the tags of a deleted blog"""
+    update_usage_counts(getattr(instance, "_usage_tag_ids", []))
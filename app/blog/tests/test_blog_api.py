@@ -1,7 +1,11 @@
 from blog.serializers import BlogDetailSerializer, BlogSerializer
 from core.models import Blog, Tag
+from core.sparse import sparse_serializer
+from core.tests.query_budget import QueryBudgetMixin
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -41,7 +45,7 @@ class PublicBlogApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateBlogApiTests(TestCase):
+class PrivateBlogApiTests(QueryBudgetMixin, TestCase):
     """Test authenticated blog API access"""
 
     def setUp(self):
@@ -61,7 +65,7 @@ class PrivateBlogApiTests(TestCase):
         blogs = Blog.objects.all().order_by("-id")
         serializer = BlogSerializer(blogs, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_blogs_limited_to_user(self):
         """Test retrieving blogs for user"""
@@ -76,7 +80,7 @@ class PrivateBlogApiTests(TestCase):
         blogs = Blog.objects.filter(user=self.user)
         serializer = BlogSerializer(blogs, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_view_blog_detail(self):
         """Test viewing a blog detail"""
@@ -90,6 +94,90 @@ class PrivateBlogApiTests(TestCase):
         serializer = BlogDetailSerializer(blog)
         self.assertEqual(res.data, serializer.data)
 
+    def test_list_blogs_query_count_constant(self):
+        """Test listing blogs does not run a query per blog"""
+
+        def add_blog(i):
+            blog = sample_blog(user=self.user, title=f"Blog {i}")
+            blog.tags.add(sample_tag(user=self.user))
+            blog.pictures.add(sample_picture(user=self.user))
+
+        self.assertConstantQueries(BLOG_URL, add_blog)
+
+    def test_view_blog_detail_query_count_constant(self):
+        """Test blog detail does not run a query per picture or tag"""
+        blog = sample_blog(user=self.user)
+
+        def add_relations(i):
+            blog.tags.add(sample_tag(user=self.user, name=f"Tag {i}"))
+            blog.pictures.add(sample_picture(user=self.user))
+
+        self.assertConstantQueries(detail_url(blog.id), add_relations)
+
+    def test_list_blogs_sparse_fields(self):
+        """Test ?fields= trims the representation and the selected columns"""
+        sample_blog(user=self.user).tags.add(sample_tag(user=self.user))
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BLOG_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data["results"][0]), ["id", "title"])
+        self.assertFalse(any('"text"' in query["sql"] for query in queries))
+
+    def test_sparse_fields_order_shares_serializer(self):
+        """Test orderings of the same ?fields= reuse one serializer class"""
+        sample_blog(user=self.user)
+        res = self.client.get(BLOG_URL, {"fields": "id,title", "expand": "tags"})
+        cached = sparse_serializer.cache_info().currsize
+
+        res2 = self.client.get(BLOG_URL, {"fields": "title,id", "expand": "tags"})
+
+        self.assertEqual(sparse_serializer.cache_info().currsize, cached)
+        self.assertEqual(list(res2.data["results"][0]), list(res.data["results"][0]))
+
+    def test_view_blog_detail_sparse_fields(self):
+        """Test ?fields= defers unrequested columns of a single blog"""
+        blog = sample_blog(user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(detail_url(blog.id), {"fields": "id,title,tags"})
+
+        self.assertEqual(res.data, {"id": blog.id, "title": blog.title, "tags": []})
+        self.assertFalse(any('"text"' in query["sql"] for query in queries))
+
+    def test_list_blogs_unknown_fields(self):
+        """Test unknown fields and relations are rejected"""
+        res = self.client.get(BLOG_URL, {"fields": "id,secret", "expand": "user"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", res.data)
+        self.assertIn("expand", res.data)
+
+    def test_list_blogs_expand_relations(self):
+        """Test ?expand= nests pictures and tags in full"""
+        blog = sample_blog(user=self.user)
+        blog.tags.add(sample_tag(user=self.user))
+        blog.pictures.add(sample_picture(user=self.user))
+
+        res = self.client.get(BLOG_URL, {"expand": "pictures,tags"})
+
+        expected = BlogDetailSerializer(blog, context={"request": res.wsgi_request})
+        self.assertEqual(res.data["results"][0]["pictures"], expected.data["pictures"])
+        self.assertEqual(res.data["results"][0]["tags"], expected.data["tags"])
+
+    def test_list_blogs_expand_query_count_constant(self):
+        """Test expanded relations do not run a query per blog"""
+
+        def add_blog(i):
+            blog = sample_blog(user=self.user, title=f"Blog {i}")
+            blog.tags.add(sample_tag(user=self.user))
+            blog.pictures.add(sample_picture(user=self.user))
+
+        self.assertConstantQueries(
+            BLOG_URL, add_blog, params={"expand": "pictures,tags", "fields": "id"}
+        )
+
     def test_create_basic_blog(self):
         payload = {"title": "Sample Blog Post", "text": "Sample Blog Text"}
         res = self.client.post(BLOG_URL, payload)
@@ -180,9 +268,9 @@ class PrivateBlogApiTests(TestCase):
         serializer1 = BlogSerializer(blog1)
         serializer2 = BlogSerializer(blog2)
         serializer3 = BlogSerializer(blog3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_search_blog_by_title(self):
         """Test searching blog by title"""
@@ -190,11 +278,11 @@ class PrivateBlogApiTests(TestCase):
         blog2 = sample_blog(user=self.user, title="Andy Warhol")
 
         res = self.client.get(BLOG_URL, {"search": "REM"})
-        serializer1 = BlogSerializer(blog1)
-        serializer2 = BlogSerializer(blog2)
-        self.assertEqual(len(res.data), 1)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+
+        result_ids = [blog["id"] for blog in res.data["results"]]
+        self.assertEqual(len(result_ids), 1)
+        self.assertIn(blog1.id, result_ids)
+        self.assertNotIn(blog2.id, result_ids)
 
     def test_search_blog_by_text(self):
         """Test searching blog by text"""
@@ -207,11 +295,10 @@ class PrivateBlogApiTests(TestCase):
 
         res = self.client.get(BLOG_URL, {"search": "jayhawk"})
 
-        serializer1 = BlogSerializer(blog1)
-        serializer2 = BlogSerializer(blog2)
-        self.assertEqual(len(res.data), 1)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        result_ids = [blog["id"] for blog in res.data["results"]]
+        self.assertEqual(len(result_ids), 1)
+        self.assertIn(blog1.id, result_ids)
+        self.assertNotIn(blog2.id, result_ids)
 
     def test_search_blog_by_tag(self):
         """Test searching blog by tag name"""
@@ -221,8 +308,81 @@ class PrivateBlogApiTests(TestCase):
         blog1.tags.add(tag1)
 
         res = self.client.get(BLOG_URL, {"search": "Music"})
-        serializer1 = BlogSerializer(blog1)
-        serializer2 = BlogSerializer(blog2)
-        self.assertEqual(len(res.data), 1)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        result_ids = [blog["id"] for blog in res.data["results"]]
+        self.assertEqual(len(result_ids), 1)
+        self.assertIn(blog1.id, result_ids)
+        self.assertNotIn(blog2.id, result_ids)
+
+    def test_search_ranks_title_above_tags_and_text(self):
+        """Test search results are ordered title, then tag, then text match"""
+        text_match = sample_blog(user=self.user, title="Zoo", text="About jazz.")
+        tag_match = sample_blog(user=self.user, title="Records")
+        tag_match.tags.add(sample_tag(user=self.user, name="Jazz"))
+        title_match = sample_blog(user=self.user, title="Jazz standards")
+
+        res = self.client.get(BLOG_URL, {"search": "jazz"})
+
+        result_ids = [blog["id"] for blog in res.data["results"]]
+        self.assertEqual(result_ids, [title_match.id, tag_match.id, text_match.id])
+
+    def test_search_returns_snippet(self):
+        """Test search results include a highlighted snippet of the text"""
+        sample_blog(user=self.user, title="Birds", text="The jayhawk is a cool bird.")
+
+        res = self.client.get(BLOG_URL, {"search": "jayhawk"})
+
+        self.assertIn("<b>jayhawk</b>", res.data["results"][0]["snippet"])
+
+    def test_search_follows_tag_rename(self):
+        """Test renaming a tag updates the blogs it is assigned to"""
+        blog = sample_blog(user=self.user)
+        tag = sample_tag(user=self.user, name="Music")
+        blog.tags.add(tag)
+        tag.name = "Painting"
+        tag.save()
+
+        res = self.client.get(BLOG_URL, {"search": "painting"})
+        self.assertEqual([b["id"] for b in res.data["results"]], [blog.id])
+        res = self.client.get(BLOG_URL, {"search": "music"})
+        self.assertEqual(res.data["results"], [])
+
+    def test_search_follows_bulk_tag_rename(self):
+        """Test renaming tags in bulk updates the blogs they are assigned to"""
+        blog = sample_blog(user=self.user)
+        tag = sample_tag(user=self.user, name="Music")
+        blog.tags.add(tag)
+
+        res = self.client.patch(
+            reverse("blog:tag-bulk"),
+            [{"id": tag.id, "name": "Painting"}],
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(BLOG_URL, {"search": "painting"})
+        self.assertEqual([b["id"] for b in res.data["results"]], [blog.id])
+        res = self.client.get(BLOG_URL, {"search": "music"})
+        self.assertEqual(res.data["results"], [])
+
+    def test_search_follows_tag_removal(self):
+        """Test clearing a blog's tags removes them from its search vector"""
+        blog = sample_blog(user=self.user)
+        blog.tags.add(sample_tag(user=self.user, name="Music"))
+        blog.tags.clear()
+
+        res = self.client.get(BLOG_URL, {"search": "music"})
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_search_pages_by_rank(self):
+        """Test paging through search results keeps rank order"""
+        for i in range(3):
+            sample_blog(user=self.user, title=f"Jazz {i}", text="jazz " * i)
+
+        res = self.client.get(BLOG_URL, {"search": "jazz", "page_size": 2})
+        seen = [blog["id"] for blog in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        seen += [blog["id"] for blog in res.data["results"]]
+
+        self.assertEqual(len(set(seen)), 3)
+        self.assertIsNone(res.data["next"])
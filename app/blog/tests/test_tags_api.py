@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Tag, Blog
+from core.tests.query_budget import QueryBudgetMixin
 
 from blog.serializers import TagSerializer
 
@@ -25,7 +26,7 @@ class PublicTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateTagsApiTests(TestCase):
+class PrivateTagsApiTests(QueryBudgetMixin, TestCase):
     """Test the authorized user tags API"""
 
     def setUp(self):
@@ -45,7 +46,7 @@ class PrivateTagsApiTests(TestCase):
         tags = Tag.objects.all().order_by("-name")
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test that tags returned are for the authenticated user"""
@@ -58,8 +59,16 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], tag.name)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], tag.name)
+
+    def test_list_tags_query_count_constant(self):
+        """Test listing tags does not run a query per tag"""
+
+        def add_tag(i):
+            Tag.objects.create(user=self.user, name=f"Tag {i}")
+
+        self.assertConstantQueries(TAGS_URL, add_tag, params={"assigned_only": 0})
 
     def test_create_tag_successful(self):
         """Test creating a new tag"""
@@ -82,13 +91,14 @@ class PrivateTagsApiTests(TestCase):
         tag2 = Tag.objects.create(user=self.user, name="Art")
         blog = Blog.objects.create(title="REM", text="music article", user=self.user)
         blog.tags.add(tag1)
+        tag1.refresh_from_db()
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
         serializer1 = TagSerializer(tag1)
         serizliaer2 = TagSerializer(tag2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serizliaer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serizliaer2.data, res.data["results"])
 
     def test_retrieve_tags_assigned_unique(self):
         """Test filtering tags by assigned return unique items"""
@@ -103,4 +113,86 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_order_tags_by_usage(self):
+        """Test ordering tags by how many blogs carry them"""
+        tag1 = Tag.objects.create(user=self.user, name="Music")
+        tag2 = Tag.objects.create(user=self.user, name="Art")
+        Tag.objects.create(user=self.user, name="Film")
+        for title in ("REM", "The Cure"):
+            blog = Blog.objects.create(title=title, text="text", user=self.user)
+            blog.tags.add(tag1)
+        blog.tags.add(tag2)
+
+        res = self.client.get(TAGS_URL, {"ordering": "usage"})
+
+        self.assertEqual(
+            [(tag["name"], tag["usage_count"]) for tag in res.data["results"]],
+            [("Music", 2), ("Art", 1), ("Film", 0)],
+        )
+
+
+class TagUsageCountTests(TestCase):
+    """Test tag usage counts follow the blogs carrying them"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "password123"
+        )
+        self.tag = Tag.objects.create(user=self.user, name="Music")
+        self.blog = Blog.objects.create(title="REM", text="text", user=self.user)
+
+    def usage_count(self):
+        self.tag.refresh_from_db()
+        return self.tag.usage_count
+
+    def test_add_and_remove(self):
+        """Test adding and removing a tag changes its count"""
+        self.blog.tags.add(self.tag)
+        self.blog.tags.add(self.tag)
+        self.assertEqual(self.usage_count(), 1)
+
+        self.blog.tags.remove(self.tag)
+        self.blog.tags.remove(self.tag)
+        self.assertEqual(self.usage_count(), 0)
+
+    def test_reverse_add_and_clear(self):
+        """Test changes from the tag side change its count"""
+        blog2 = Blog.objects.create(title="Cure", text="text", user=self.user)
+        self.tag.blog_set.add(self.blog, blog2)
+        self.assertEqual(self.usage_count(), 2)
+
+        self.tag.blog_set.clear()
+        self.assertEqual(self.usage_count(), 0)
+
+    def test_clear_blog_tags(self):
+        """Test clearing a blog's tags lowers their counts"""
+        self.blog.tags.add(self.tag)
+        self.blog.tags.clear()
+
+        self.assertEqual(self.usage_count(), 0)
+
+    def test_delete_blog(self):
+        """Test deleting a blog lowers the counts of its tags"""
+        self.blog.tags.add(self.tag)
+        self.blog.delete()
+
+        self.assertEqual(self.usage_count(), 0)
+
+    def test_bulk_update_blog_tags(self):
+        """Test bulk relation writes keep counts up to date"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        tag2 = Tag.objects.create(user=self.user, name="Art")
+        self.blog.tags.add(self.tag)
+
+        client.patch(
+            reverse("blog:blog-bulk"),
+            [{"id": self.blog.id, "tags": [tag2.id]}],
+            format="json",
+        )
+
+        tag2.refresh_from_db()
+        self.assertEqual(self.usage_count(), 0)
+        self.assertEqual(tag2.usage_count, 1)
@@ -0,0 +1,36 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Blog, Tag
+
+
+def usage_count_expression():
+    """Return an expression counting the blogs carrying the outer tag"""
+    counts = (
+        Blog.tags.through.objects.filter(tag=OuterRef("pk"))
+        .order_by()
+        .values("tag")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def update_usage_counts(tag_ids=None):
+    """Recount the blogs carrying tags in one UPDATE; return how many changed
+
+    Only tags whose stored count is wrong are written. With no tag_ids every
+    tag is reconciled.
+    """
+    tags = Tag.objects.all()
+    if tag_ids is not None:
+        tag_ids = list(tag_ids)
+        if not tag_ids:
+            return 0
+        tags = tags.filter(pk__in=tag_ids)
+
+    count = usage_count_expression()
+    return tags.exclude(usage_count=count).update(
+        usage_count=count, updated_at=timezone.now()
+    )
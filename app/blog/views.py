@@ -1,48 +1,88 @@
-from rest_framework import filters, mixins, viewsets
+from rest_framework import mixins, viewsets
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 from blog import serializers
+from blog.search import BlogSearchFilter, update_search_vectors
+from blog.usage import update_usage_counts
+from core.bulk import BulkModelMixin
+from core.cache import CachedListMixin, CachedResponseMixin
+from core.conditional import ConditionalListMixin, ConditionalResponseMixin
+from core.fastpath import FastListMixin
 from core.models import Blog, Tag
+from core.pagination import KeysetPagination
+from core.prefetch import prefetch_for_serializer
+from core.sparse import SparseFieldsMixin
+from user.authentication import SignedTokenAuthentication
 
 
 class BaseBlogAttrViewSet(
-    viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin
+    ConditionalListMixin,
+    CachedListMixin,
+    FastListMixin,
+    viewsets.GenericViewSet,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
 ):
     """Base viewset for user owned blog attributes"""
 
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (SignedTokenAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
         """Create a new tag"""
         serializer.save(user=self.request.user)
 
 
-class TagViewSet(BaseBlogAttrViewSet):
+class TagViewSet(BulkModelMixin, BaseBlogAttrViewSet):
     """Manage tags in the database"""
 
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    ordering = "-name"
 
     def get_queryset(self):
         """Return objects for the current authenticated user only"""
         assigned_only = bool(int(self.request.query_params.get("assigned_only", 0)))
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(blog__isnull=False)
-        return queryset.filter(user=self.request.user).order_by("-name").distinct()
-
-
-class BlogViewSet(viewsets.ModelViewSet):
+            queryset = queryset.filter(usage_count__gt=0)
+        return queryset.filter(user=self.request.user).order_by(self.get_ordering())
+
+    def get_ordering(self):
+        """Return the pagination ordering, most used first if requested"""
+        if self.request.query_params.get("ordering") == "usage":
+            return "-usage_count"
+
+        return self.ordering
+
+    def bulk_changed(self, pks):
+        """Refresh the search vectors of blogs carrying tags renamed in bulk"""
+        super().bulk_changed(pks)
+        update_search_vectors(
+            Blog.objects.filter(tags__in=pks).values_list("id", flat=True).distinct()
+        )
+
+
+class BlogViewSet(
+    BulkModelMixin,
+    ConditionalResponseMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     """Manage recipes in the database"""
 
-    search_fields = ["title", "text", "tags__name"]
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (BlogSearchFilter,)
     serializer_class = serializers.BlogSerializer
     queryset = Blog.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    ordering = "-id"
+    conditional_related = ("pictures", "tags")
+    authentication_classes = (SignedTokenAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
 
     def _params_to_ints(self, qs):
         """Convert a list of string IDs to a list of integers"""
@@ -55,14 +95,34 @@ class BlogViewSet(viewsets.ModelViewSet):
         if tags:
             tag_ids = self._params_to_ints(tags)
             queryset = queryset.filter(tags__id__in=tag_ids)
+        queryset = prefetch_for_serializer(queryset, self.get_serializer_class())
         return queryset.filter(user=self.request.user)
 
+    def get_ordering(self):
+        """Return the pagination ordering, best search matches first"""
+        if BlogSearchFilter().get_search_terms(self.request):
+            return "-search_rank"
+
+        return self.ordering
+
     def get_serializer_class(self):
         """Return appropriate serializer class"""
+        serializer_class = self.serializer_class
         if self.action == "retrieve":
-            return serializers.BlogDetailSerializer
+            serializer_class = serializers.BlogDetailSerializer
+
+        return self.get_sparse_serializer_class(serializer_class)
+
+    def bulk_changed(self, pks):
+        """Refresh the search vectors of blogs written in bulk"""
+        super().bulk_changed(pks)
+        update_search_vectors(pks)
 
-        return self.serializer_class
+    def bulk_relation_changed(self, field, pks):
+        """Recount the usage of tags added to or removed from blogs in bulk"""
+        super().bulk_relation_changed(field, pks)
+        if field.name == "tags":
+            update_usage_counts(pks)
 
     def perform_create(self, serializer):
         """Create a new Blog"""
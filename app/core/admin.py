@@ -22,4 +22,8 @@ class UserAdmin(BaseUserAdmin):
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Tag)
 admin.site.register(models.Picture)
+admin.site.register(models.PictureRendition)
+admin.site.register(models.PictureUpload)
 admin.site.register(models.Slideshow)
+admin.site.register(models.SlideshowPicture)
+admin.site.register(models.Job)
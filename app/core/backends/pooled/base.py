@@ -0,0 +1,95 @@
+import os
+import threading
+
+from django.db.backends.postgresql.base import Database
+from django.db.utils import OperationalError
+from psycopg2 import extensions, pool
+
+from core.backends.postgresql import base
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Thread safe pool of psycopg2 connections that waits when exhausted"""
+
+    def __init__(self, min_size, max_size, timeout, conn_params):
+        self.pool = pool.ThreadedConnectionPool(min_size, max_size, **conn_params)
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.timeout = timeout
+
+    def get(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f"No database connection free within {self.timeout} seconds"
+            )
+        try:
+            return self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def put(self, connection, close=False):
+        try:
+            self.pool.putconn(connection, close=close or bool(connection.closed))
+        finally:
+            self.slots.release()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    """Return the connection pool of a database alias in this process
+
+    Pools are kept per process so that forked workers never share sockets
+    with their parent.
+    """
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            options = settings_dict.get("POOL", {})
+            _pools[key] = ConnectionPool(
+                options.get("MIN_SIZE", 1),
+                options.get("MAX_SIZE", 10),
+                options.get("TIMEOUT", 10),
+                conn_params,
+            )
+        return _pools[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend borrowing connections from an in-process pool
+
+    Meant for threaded servers: closing a connection, which Django does at
+    the end of every request with CONN_MAX_AGE at 0, returns it to the pool
+    for the next request instead of ending the session. Connections are
+    checked with a trivial query as they are borrowed when CONN_HEALTH_CHECKS
+    is set. POOL in the database settings takes MIN_SIZE, MAX_SIZE and the
+    TIMEOUT in seconds to wait for a free connection.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection_pool = get_pool(self.alias, self.settings_dict, conn_params)
+        connection = connection_pool.get()
+        if self.settings_dict.get("CONN_HEALTH_CHECKS"):
+            try:
+                connection.cursor().execute("SELECT 1")
+                connection.rollback()
+            except Database.Error:
+                connection_pool.put(connection, close=True)
+                connection = connection_pool.get()
+
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = options.get(
+            "isolation_level", extensions.ISOLATION_LEVEL_READ_COMMITTED
+        )
+        if connection.isolation_level != self.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection_pool = get_pool(self.alias, self.settings_dict, None)
+        with self.wrap_database_errors:
+            # The pool rolls back whatever the request left half done
+            connection_pool.put(self.connection)
@@ -0,0 +1,38 @@
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend checking persistent connections before reusing them
+
+    With CONN_HEALTH_CHECKS set in the database settings, a connection kept
+    open across requests by CONN_MAX_AGE is checked once at the start of the
+    next request that uses it, and replaced if the server dropped it, instead
+    of failing that request's first query.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    def connect(self):
+        # A fresh connection needs no check, including from the
+        # ensure_connection() calls made while setting it up
+        self.health_check_done = True
+        super().connect()
+
+    def ensure_connection(self):
+        if (
+            self.connection is not None
+            and not self.health_check_done
+            and not self.in_atomic_block
+            and self.settings_dict.get("CONN_HEALTH_CHECKS")
+        ):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Called as requests start and end; check again on next use
+        self.health_check_done = False
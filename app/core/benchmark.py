@@ -0,0 +1,261 @@
+import math
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from core.models import (
+    Blog,
+    Picture,
+    PictureRendition,
+    Slideshow,
+    SlideshowPicture,
+    Tag,
+)
+
+BENCHMARK_PASSWORD = "benchmark"
+
+# Name, method, path and body of the requests the API benchmark drives; paths
+# are formatted with the ids of a seeded blog, picture and slideshow
+SCENARIOS = (
+    ("blogs", "get", "/api/blog/blogs/", None),
+    ("blog", "get", "/api/blog/blogs/{blog}/", None),
+    ("tags", "get", "/api/blog/tags/", None),
+    ("pictures", "get", "/api/picture/picture/", None),
+    ("picture", "get", "/api/picture/picture/{picture}/", None),
+    ("slideshows", "get", "/api/picture/slideshow/", None),
+    ("slideshow", "get", "/api/picture/slideshow/{slideshow}/", None),
+    ("me", "get", "/api/user/me/", None),
+    ("token", "post", "/api/user/token/", {"password": BENCHMARK_PASSWORD}),
+)
+
+
+def default_host():
+    """Return a host name the running settings accept"""
+    return settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+
+
+def seed(rows):
+    """Create rows blogs, pictures, tags and slideshows for a throwaway user"""
+    user = get_user_model().objects.create_user(
+        f"benchmark-{time.time()}@andrewtdunn.com", BENCHMARK_PASSWORD
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(user=user, name=f"Tag {index}") for index in range(rows)
+    )
+    pictures = Picture.objects.bulk_create(
+        Picture(
+            user=user,
+            caption=f"Picture {index}",
+            image=f"uploads/picture/{index:064x}.jpg",
+            width=1920,
+            height=1080,
+            format="jpeg",
+            byte_size=250000,
+            dominant_color="#336699",
+        )
+        for index in range(rows)
+    )
+    PictureRendition.objects.bulk_create(
+        PictureRendition(
+            picture=picture,
+            width=width,
+            height=width * 9 // 16,
+            format="webp",
+            image=f"uploads/picture/{picture.pk:064x}-{width}.webp",
+        )
+        for picture in pictures
+        for width in (320, 640)
+    )
+    blogs = Blog.objects.bulk_create(
+        Blog(user=user, title=f"Blog {index}", text="Lorem ipsum " * 50)
+        for index in range(rows)
+    )
+    Blog.tags.through.objects.bulk_create(
+        Blog.tags.through(blog_id=blog.pk, tag_id=tags[index % rows].pk)
+        for index, blog in enumerate(blogs)
+    )
+    Blog.pictures.through.objects.bulk_create(
+        Blog.pictures.through(blog_id=blog.pk, picture_id=pictures[index].pk)
+        for index, blog in enumerate(blogs)
+    )
+    # A slideshow of ten pictures for every ten pictures
+    slideshows = Slideshow.objects.bulk_create(
+        Slideshow(user=user, title=f"Slideshow {index}")
+        for index in range(max(rows // 10, 1))
+    )
+    SlideshowPicture.objects.bulk_create(
+        SlideshowPicture(
+            slideshow=slideshows[index // 10 % len(slideshows)],
+            picture=picture,
+            position=(index % 10 + 1) * SlideshowPicture.POSITION_STEP,
+        )
+        for index, picture in enumerate(pictures)
+    )
+    return user
+
+
+def best_time(function, repeat):
+    """Return the fastest of repeat timed calls of function, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def percentile(values, percent):
+    """Return the percentile of sorted values, interpolating between ranks"""
+    if not values:
+        return None
+    rank = (len(values) - 1) * percent / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def run_scenario(scenario, user, ids, requests, concurrency):
+    """Send requests requests of a scenario from concurrency threads
+
+    Each thread drives the whole middleware stack through its own test
+    client and database connection, counting the queries of every request.
+    Returns the latency percentiles in milliseconds, the throughput in
+    requests per second and the mean number of queries per request.
+    """
+    _, method, path, data = scenario
+    path = path.format(**ids)
+    if data is not None:
+        data = {"email": user.email, **data}
+    token = Token.objects.get_or_create(user=user)[0].key
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    latencies, queries, errors = [], [], []
+
+    def worker():
+        client = Client(
+            HTTP_AUTHORIZATION=f"Token {token}",
+            HTTP_HOST=default_host(),
+            HTTP_ACCEPT_ENCODING="gzip, br",
+        )
+        count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        try:
+            with connection.execute_wrapper(count_queries):
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    count = 0
+                    start = time.perf_counter()
+                    response = getattr(client, method)(path, data)
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed * 1000)
+                        queries.append(count)
+                        if response.status_code >= 400:
+                            errors.append(response.status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "method": method.upper(),
+        "path": path,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / wall, 1),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "queries": round(sum(queries) / len(queries), 2),
+    }
+
+
+def revision():
+    """Return the git commit of the working tree, or None outside a checkout"""
+    try:
+        return subprocess.run(
+            ("git", "rev-parse", "--short", "HEAD"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(scenarios, rows, requests, concurrency):
+    """Seed rows of each kind and run scenarios against them
+
+    The seeded rows are committed, so the threads' connections see them, and
+    deleted once the benchmark is over.
+    """
+    user = seed(rows)
+    try:
+        ids = {
+            name: model.objects.filter(user=user).order_by("pk")[0].pk
+            for name, model in (
+                ("blog", Blog),
+                ("picture", Picture),
+                ("slideshow", Slideshow),
+            )
+        }
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        results = {
+            scenario[0]: run_scenario(scenario, user, ids, requests, concurrency)
+            for scenario in scenarios
+        }
+    finally:
+        user.delete()
+    return {
+        "revision": revision(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "rows": rows,
+        "requests": requests,
+        "concurrency": concurrency,
+        "scenarios": results,
+    }
+
+
+def compare(results, baseline):
+    """Yield (scenario, metric, baseline value, value, relative change)"""
+    for name, result in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        metrics = [
+            (f"latency {key}", previous["latency_ms"][key], result["latency_ms"][key])
+            for key in ("p50", "p95", "p99")
+        ]
+        metrics += [
+            ("rps", previous["rps"], result["rps"]),
+            ("queries", previous["queries"], result["queries"]),
+        ]
+        for metric, old, new in metrics:
+            change = (new - old) / old if old else None
+            yield name, metric, old, new, change
@@ -0,0 +1,299 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+
+from core.cache import bump_generation
+from core.prefetch import prefetch_for_serializer
+from core.signals import touch
+
+
+def bulk_update(model, objs, fields):
+    """Write fields of many objects in one UPDATE using CASE expressions"""
+    if not objs or not fields:
+        return 0
+    values = {}
+    for name in fields:
+        field = model._meta.get_field(name)
+        case = Case(
+            *[
+                When(
+                    pk=obj.pk,
+                    then=Value(getattr(obj, field.attname), output_field=field),
+                )
+                for obj in objs
+            ],
+            output_field=field,
+        )
+        values[field.attname] = Cast(case, output_field=field)
+    return model._default_manager.filter(pk__in=[obj.pk for obj in objs]).update(
+        **values
+    )
+
+
+def _item_result(status_code, **fields):
+    return dict(status=status_code, **fields)
+
+
+def _is_id(value):
+    # bool is a subclass of int, but True is not an id
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class BulkModelMixin:
+    """Create, update and delete many objects in a single request
+
+    ``POST``, ``PATCH`` and ``DELETE`` on ``<prefix>/bulk/`` take a list of
+    items and answer with one result per item, in order. Valid items are
+    written together in one transaction: ids referenced through many to many
+    fields are checked with one query per relation, rows are inserted with
+    ``bulk_create`` and relations with bulk through table inserts.
+
+    Bulk writes send no model signals, so ``bulk_changed`` invalidates what
+    the signals otherwise would.
+    """
+
+    @action(methods=["POST", "PATCH", "DELETE"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        """Apply a list of creates, updates or deletes"""
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Expected a list of items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.BULK_MAX_ITEMS:
+            return Response(
+                {"detail": f"At most {settings.BULK_MAX_ITEMS} items are allowed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.method == "POST":
+            results = self.bulk_create(items)
+        elif request.method == "PATCH":
+            results = self.bulk_update(items)
+        else:
+            results = self.bulk_destroy(items)
+
+        success = (
+            status.HTTP_201_CREATED,
+            status.HTTP_200_OK,
+            status.HTTP_204_NO_CONTENT,
+        )
+        if all(result["status"] in success for result in results):
+            code = (
+                status.HTTP_201_CREATED
+                if request.method == "POST"
+                else status.HTTP_200_OK
+            )
+        else:
+            code = status.HTTP_207_MULTI_STATUS
+        return Response(results, status=code)
+
+    def get_bulk_queryset(self):
+        """Return the objects of the current user that bulk requests may change"""
+        return self.queryset.model._default_manager.filter(user=self.request.user)
+
+    def get_bulk_relations(self, serializer):
+        """Return the writable many to many fields of a serializer"""
+        return {
+            name: field
+            for name, field in serializer.fields.items()
+            if isinstance(field, ManyRelatedField) and not field.read_only
+        }
+
+    def validate_bulk_items(self, items, instances=None):
+        """Validate items, returning per item (validated_data, relations, errors)
+
+        Relation fields are taken out of the per item serializers, which would
+        otherwise look up every id separately, and checked in one query per
+        relation against the current user's objects.
+        """
+        partial = instances is not None
+        relations = self.get_bulk_relations(self.get_serializer())
+        validated = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                validated.append(
+                    (None, {}, {"non_field_errors": ["Expected an object."]})
+                )
+                continue
+            instance = instances[index] if partial else None
+            serializer = self.get_serializer(instance, data=item, partial=partial)
+            for name in relations:
+                del serializer.fields[name]
+
+            errors = {} if serializer.is_valid() else dict(serializer.errors)
+            item_relations = {}
+            for name in relations:
+                if name in item:
+                    pks = item[name]
+                    if isinstance(pks, list) and all(_is_id(pk) for pk in pks):
+                        item_relations[name] = set(pks)
+                    else:
+                        errors[name] = ["Expected a list of ids."]
+                elif not partial and relations[name].required:
+                    errors[name] = ["This field is required."]
+            validated.append((serializer.validated_data, item_relations, errors))
+
+        for name, field in relations.items():
+            wanted = set().union(*(rel.get(name, ()) for _, rel, _ in validated))
+            if not wanted:
+                continue
+            queryset = field.child_relation.get_queryset()
+            if any(f.name == "user" for f in queryset.model._meta.fields):
+                queryset = queryset.filter(user=self.request.user)
+            found = set(queryset.filter(pk__in=wanted).values_list("pk", flat=True))
+            for _, item_relations, errors in validated:
+                missing = item_relations.get(name, set()) - found
+                if missing:
+                    errors[name] = [
+                        f'Invalid pk "{pk}" - object does not exist.'
+                        for pk in sorted(missing)
+                    ]
+
+        return validated, relations
+
+    def set_bulk_relations(self, objs, relations, item_relations):
+        """Replace the given relations of objs with bulk through table writes"""
+        model = self.queryset.model
+        for name in relations:
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = f"{field.m2m_field_name()}_id"
+            target = f"{field.m2m_reverse_field_name()}_id"
+
+            changed = [
+                (obj, rel[name])
+                for obj, rel in zip(objs, item_relations)
+                if name in rel
+            ]
+            if not changed:
+                continue
+            rows = through.objects.filter(
+                **{f"{source}__in": [obj.pk for obj, _ in changed]}
+            )
+            touched = set(rows.values_list(target, flat=True))
+            rows.delete()
+            through.objects.bulk_create(
+                [
+                    through(**{source: obj.pk, target: pk})
+                    for obj, pks in changed
+                    for pk in sorted(pks)
+                ]
+            )
+            self.bulk_relation_changed(
+                field, touched.union(*(pks for _, pks in changed))
+            )
+
+    def bulk_create(self, items):
+        """Create the valid items and return per item results"""
+        validated, relations = self.validate_bulk_items(items)
+        model = self.queryset.model
+
+        valid = [(data, rel) for data, rel, errors in validated if not errors]
+        with transaction.atomic():
+            objs = model._default_manager.bulk_create(
+                [model(user=self.request.user, **data) for data, _ in valid]
+            )
+            self.set_bulk_relations(objs, relations, [rel for _, rel in valid])
+            self.bulk_changed([obj.pk for obj in objs])
+
+        created = iter(self.serialize_bulk_objects([obj.pk for obj in objs]))
+        return [
+            _item_result(status.HTTP_400_BAD_REQUEST, errors=errors)
+            if errors
+            else _item_result(status.HTTP_201_CREATED, data=next(created))
+            for _, _, errors in validated
+        ]
+
+    def bulk_update(self, items):
+        """Partially update the valid items, identified by id, and return results"""
+        ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        existing = self.get_bulk_queryset().in_bulk([pk for pk in ids if _is_id(pk)])
+        found = [existing.get(pk) if _is_id(pk) else None for pk in ids]
+        indexes = [
+            index for index, instance in enumerate(found) if instance is not None
+        ]
+
+        validated, relations = self.validate_bulk_items(
+            [items[index] for index in indexes], [found[index] for index in indexes]
+        )
+        results = [
+            _item_result(status.HTTP_404_NOT_FOUND, errors={"id": ["Not found."]})
+            for _ in items
+        ]
+
+        objs, fields, item_relations = [], set(), []
+        for index, (data, rel, errors) in zip(indexes, validated):
+            if errors:
+                results[index] = _item_result(
+                    status.HTTP_400_BAD_REQUEST, errors=errors
+                )
+                continue
+            obj = found[index]
+            for name, value in data.items():
+                setattr(obj, name, value)
+            obj.updated_at = timezone.now()
+            fields.update(data, ["updated_at"])
+            objs.append(obj)
+            item_relations.append(rel)
+
+        with transaction.atomic():
+            bulk_update(self.queryset.model, objs, fields)
+            self.set_bulk_relations(objs, relations, item_relations)
+            self.bulk_changed([obj.pk for obj in objs])
+
+        updated = iter(self.serialize_bulk_objects([obj.pk for obj in objs]))
+        for index, (_, _, errors) in zip(indexes, validated):
+            if not errors:
+                results[index] = _item_result(status.HTTP_200_OK, data=next(updated))
+        return results
+
+    def bulk_destroy(self, ids):
+        """Delete the objects with the given ids and return per item results"""
+        valid = [pk for pk in ids if _is_id(pk)]
+        deleted = set()
+        if valid:
+            queryset = self.get_bulk_queryset().filter(pk__in=valid)
+            with transaction.atomic():
+                deleted = set(queryset.values_list("pk", flat=True))
+                queryset.delete()
+
+        results = []
+        for pk in ids:
+            if not _is_id(pk):
+                results.append(
+                    _item_result(
+                        status.HTTP_400_BAD_REQUEST,
+                        errors={"id": ["A valid integer is required."]},
+                    )
+                )
+            elif pk in deleted:
+                results.append(_item_result(status.HTTP_204_NO_CONTENT, id=pk))
+            else:
+                results.append(_item_result(status.HTTP_404_NOT_FOUND, id=pk))
+        return results
+
+    def bulk_changed(self, pks):
+        """Invalidate what the skipped model signals would have for pks"""
+        if pks:
+            bump_generation(self.request.user.pk)
+
+    def bulk_relation_changed(self, field, pks):
+        """Mark the related objects whose relation was rewritten as modified"""
+        touch(field.related_model, pks)
+
+    def serialize_bulk_objects(self, pks):
+        """Return the representations of the objects with pks, in order"""
+        serializer_class = self.get_serializer_class()
+        queryset = prefetch_for_serializer(
+            self.queryset.model._default_manager.filter(pk__in=pks), serializer_class
+        )
+        objs = {obj.pk: obj for obj in queryset}
+        return self.get_serializer([objs[pk] for pk in pks], many=True).data
@@ -0,0 +1,92 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+
+def get_cache():
+    """Return the cache backing API responses"""
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(user_id):
+    return f"api:generation:{user_id}"
+
+
+def get_generation(user_id):
+    """Return the current cache generation of a user's data
+
+    A missing counter is seeded from the clock rather than from zero so that
+    responses cached under an evicted counter can never be served again.
+    """
+    cache = get_cache()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(user_id):
+    """Invalidate every cached response for a user"""
+    cache = get_cache()
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        get_generation(user_id)
+
+
+def response_cache_key(request, view):
+    """Return the cache key of a GET response for the requesting user"""
+    user_id = request.user.pk
+    params = sorted(request.query_params.lists())
+    digest = hashlib.md5(
+        repr(
+            (
+                request.scheme,
+                request.get_host(),
+                request.path,
+                params,
+                view.__class__.__name__,
+                view.action,
+            )
+        ).encode()
+    ).hexdigest()
+    return f"api:response:{user_id}:{get_generation(user_id)}:{digest}"
+
+
+class CachedListMixin:
+    """Serve list responses from the per-user response cache
+
+    Cached entries are keyed by the user's data generation, which is bumped
+    by the signals in core.signals whenever any of their objects change.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response, calling handler on a cache miss"""
+        if not request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_cache_key(request, self)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class CachedResponseMixin(CachedListMixin):
+    """Serve list and retrieve responses from the per-user response cache"""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,168 @@
+import gzip
+import hashlib
+import logging
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from core.cache import get_cache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def gzip_compress(content):
+    buffer = BytesIO()
+    # A fixed mtime keeps the compressed bytes identical for identical content
+    with gzip.GzipFile(
+        fileobj=buffer,
+        mode="wb",
+        compresslevel=settings.COMPRESSION_GZIP_LEVEL,
+        mtime=0,
+    ) as gz:
+        gz.write(content)
+    return buffer.getvalue()
+
+
+def brotli_compress(content):
+    return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def available_encodings():
+    """Return the supported content codings, most preferred first"""
+    encodings = {"gzip": gzip_compress}
+    if brotli is not None:
+        encodings = {"br": brotli_compress, **encodings}
+    return encodings
+
+
+def accepted_encodings(header):
+    """Return the content codings of an Accept-Encoding header by q value"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """Return the supported coding the client prefers, or None
+
+    Between codings of equal quality the server's preference wins, which
+    puts brotli ahead of gzip when it is installed.
+    """
+    accepted = accepted_encodings(header or "")
+    best, best_quality = None, 0.0
+    for coding in available_encodings():
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _compressible(response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip()
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.has_header("Content-Encoding")
+        and content_type in settings.COMPRESSION_CONTENT_TYPES
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+def _cache_key(encoding, response):
+    """Return the cache key of a compressed body, or None if uncacheable
+
+    Only responses with an ETag, which are expected to be served again, are
+    cached. The key is a digest of the body itself, so a body changed under
+    an ETag that was not, such as one edited to the same length, is never
+    answered with a stale compression; the ETag and content type are only
+    additional parts of it.
+    """
+    etag = response.get("ETag")
+    if not etag:
+        return None
+    digest = hashlib.sha256(response.content)
+    digest.update(repr((etag, response["Content-Type"])).encode())
+    return f"compressed:{encoding}:{digest.hexdigest()}"
+
+
+def add_server_timing(response, metric):
+    """Append a metric to the Server-Timing header of a response"""
+    if response.has_header("Server-Timing"):
+        metric = f"{response['Server-Timing']}, {metric}"
+    response["Server-Timing"] = metric
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip as the client accepts
+
+    Bodies smaller than COMPRESSION_MIN_SIZE or of other types than
+    COMPRESSION_CONTENT_TYPES are sent as they are. Compressed bodies of
+    responses with an ETag are cached, so a hot response is compressed once
+    rather than on every request. The CPU time spent compressing, or a cache
+    hit, is reported in the Server-Timing header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not _compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None:
+            return response
+
+        cache = get_cache()
+        key = _cache_key(encoding, response)
+        compressed = cache.get(key) if key else None
+        if compressed is not None:
+            add_server_timing(response, f'compress;desc="{encoding} cached"')
+        else:
+            start = time.thread_time()
+            compressed = available_encodings()[encoding](response.content)
+            cpu = (time.thread_time() - start) * 1000
+            add_server_timing(response, f'compress;dur={cpu:.2f};desc="{encoding}"')
+            logger.debug(
+                "Compressed %s bytes to %s with %s in %.2f ms of CPU",
+                len(response.content),
+                len(compressed),
+                encoding,
+                cpu,
+            )
+            if key:
+                cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and not etag.startswith("W/"):
+            # The compressed body is not byte for byte the tagged one
+            response["ETag"] = f"W/{etag}"
+        return response
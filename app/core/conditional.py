@@ -0,0 +1,101 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+class ConditionalListMixin:
+    """Answer conditional list requests with 304 Not Modified
+
+    The ETag comes from a single aggregate over the ``updated_at`` of the
+    rows the request would return, so nothing is serialized to compute it.
+    No Last-Modified is sent: the latest ``updated_at`` does not move when a
+    row is deleted or unpublished, so If-Modified-Since would hide the change.
+    Relations nested in the list representation are listed in
+    ``conditional_list_related``; those nested on request with ``?expand=``
+    are added to them.
+    """
+
+    conditional_list_related = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_conditional_response(
+            super().list,
+            queryset,
+            self.get_conditional_related(self.conditional_list_related),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def get_conditional_related(self, related):
+        """Return related with the relations the serializer nests on request"""
+        serializer_class = self.get_serializer_class()
+        expanded = getattr(serializer_class, "expanded_relations", ())
+        return tuple(dict.fromkeys((*related, *expanded)))
+
+    def get_etag(self, queryset, related=()):
+        """Return the ETag of a queryset, or None if it has no rows"""
+        aggregates = {
+            "count": Count("pk", distinct=True),
+            "updated_at": Max("updated_at"),
+        }
+        for relation in related:
+            aggregates[relation] = Max(f"{relation}__updated_at")
+        # Aggregating through a pk semi-join keeps annotations added by the
+        # filter backends, such as search headlines, out of the query.
+        rows = queryset.model._default_manager.filter(
+            pk__in=queryset.order_by().values("pk")
+        )
+        values = rows.aggregate(**aggregates)
+
+        timestamps = [
+            value for name, value in values.items() if name != "count" and value
+        ]
+        if not timestamps:
+            return None
+
+        key = (self.request.get_full_path(), sorted(values.items()))
+        return quote_etag(hashlib.md5(repr(key).encode()).hexdigest())
+
+    def get_conditional_response(
+        self, handler, queryset, related, request, *args, **kwargs
+    ):
+        """Return 304 if the client's copy is current, else call handler"""
+        etag = self.get_etag(queryset, related)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+        return response
+
+
+class ConditionalResponseMixin(ConditionalListMixin):
+    """Answer conditional list and retrieve requests with 304 Not Modified
+
+    Relations nested in the detail representation are listed in
+    ``conditional_related`` so that changes to them change the ETag.
+    """
+
+    conditional_related = ()
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self.get_conditional_response(
+            super().retrieve,
+            queryset,
+            self.get_conditional_related(self.conditional_related),
+            request,
+            *args,
+            **kwargs,
+        )
@@ -0,0 +1,271 @@
+import re
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from rest_framework import serializers
+from rest_framework.relations import (
+    ManyRelatedField,
+    PrimaryKeyRelatedField,
+    RelatedField,
+)
+from rest_framework.response import Response
+
+from core.pagination import pagination_fields
+
+# Serializer fields whose representation of a database value is the value
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.NullBooleanField,
+)
+
+
+# Names that need no quoting and hold no dot segments
+PLAIN_NAME_RE = re.compile(r"^[\w-][\w/-]*(\.\w+)?$", re.ASCII)
+
+
+class Unsupported(Exception):
+    """Raised for serializer fields the fast path cannot represent"""
+
+
+def _converter(convert):
+    def convert_value(value):
+        return None if value is None else convert(value)
+
+    return convert_value
+
+
+def _file_url(request):
+    """Return a function giving the URL of a stored file like FileField does
+
+    URLs of plain file system names are put together directly, which is what
+    urljoin and build_absolute_uri would give at a fraction of the cost.
+    """
+    root = request.build_absolute_uri("/")[:-1] if request is not None else ""
+
+    def url(storage, name):
+        if not name:
+            return None
+        if isinstance(storage, FileSystemStorage) and PLAIN_NAME_RE.match(name):
+            url = storage.base_url + name
+            if url.startswith("/") and not url.startswith("//"):
+                return root + url
+            return url
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return url
+
+
+class ManyPrimaryKeys:
+    """The ids of a many to many relation, read from its through table"""
+
+    def __init__(self, model, name, field):
+        child = field.child_relation
+        if type(child) is not PrimaryKeyRelatedField or child.pk_field is not None:
+            raise Unsupported(name)
+        relation = model._meta.get_field(name)
+        if not isinstance(relation, models.ManyToManyField):
+            raise Unsupported(name)
+
+        self.through = relation.remote_field.through
+        self.source = f"{relation.m2m_field_name()}_id"
+        self.target = f"{relation.m2m_reverse_field_name()}_id"
+        # Ids come out in the order the related manager would list them
+        target = relation.m2m_reverse_field_name()
+        self.ordering = [
+            f"-{target}__{order[1:]}" if order.startswith("-") else f"{target}__{order}"
+            for order in relation.related_model._meta.ordering
+        ] + ["pk"]
+
+    def fetch(self, ids, context):
+        grouped = {}
+        rows = (
+            self.through.objects.filter(**{f"{self.source}__in": ids})
+            .order_by(*self.ordering)
+            .values_list(self.source, self.target)
+        )
+        for source, target in rows:
+            grouped.setdefault(source, []).append(target)
+        return grouped
+
+
+class NestedList:
+    """Related objects represented by a nested serializer
+
+    Reverse foreign keys are grouped by their key column and many to many
+    relations by the parent id joined in through the relation's query name.
+    """
+
+    def __init__(self, model, name, child):
+        relation = model._meta.get_field(name)
+        if relation.one_to_many:
+            self.model = relation.related_model
+            self.lookup = relation.field.name
+            self.column = relation.field.attname
+        elif isinstance(relation, models.ManyToManyField):
+            self.model = relation.related_model
+            self.lookup = self.column = relation.related_query_name()
+        else:
+            raise Unsupported(name)
+        self.compiled = compile_serializer(type(child))
+        if self.compiled is None:
+            raise Unsupported(name)
+
+    def fetch(self, ids, context):
+        queryset = self.model._default_manager.filter(**{f"{self.lookup}__in": ids})
+        rows = list(self.compiled.rows(queryset, extra=(self.column,)))
+        grouped = {}
+        for row, data in zip(rows, self.compiled.serialize(rows, context)):
+            grouped.setdefault(row[self.column], []).append(data)
+        return grouped
+
+
+class CompiledSerializer:
+    """Read-only fast path of a model serializer over ``values()`` rows
+
+    The serializer's fields are inspected once and turned into the source of
+    a function building each representation as a dict literal, so listing
+    skips model instances and the per-field ``to_representation`` calls.
+    Many to many ids and nested reverse foreign keys are each read with one
+    more query for the whole list.
+    """
+
+    def __init__(self, serializer, annotations=frozenset()):
+        if not isinstance(serializer, serializers.ModelSerializer):
+            raise Unsupported(type(serializer).__name__)
+        model = serializer.Meta.model
+        self.pk = model._meta.pk.attname
+        self.columns = [self.pk]
+        self.relations = []
+        namespace = {}
+        entries = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or len(field.source_attrs) != 1:
+                raise Unsupported(name)
+            source = field.source_attrs[0]
+
+            if isinstance(field, ManyRelatedField):
+                self.relations.append(ManyPrimaryKeys(model, source, field))
+            elif isinstance(field, serializers.ListSerializer):
+                self.relations.append(NestedList(model, source, field.child))
+            else:
+                expression = self._column_expression(
+                    model, name, source, field, annotations, namespace
+                )
+                if expression is not None:
+                    entries.append(f"{name!r}: {expression}")
+                continue
+            index = len(self.relations) - 1
+            entries.append(f"{name!r}: related[{index}].get(row[{self.pk!r}], [])")
+
+        code = "def serialize(row, related, url):\n    return {%s}\n" % ", ".join(
+            entries
+        )
+        exec(
+            compile(code, f"<{type(serializer).__name__} fast path>", "exec"), namespace
+        )
+        self.function = namespace["serialize"]
+
+    def _column_expression(self, model, name, source, field, annotations, namespace):
+        """Return the code reading field from a row, or None to leave it out"""
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            model_field = None
+
+        if model_field is None:
+            if source in annotations:
+                column = source
+            elif field.read_only and not hasattr(model, source):
+                # Like a serializer leaving out an annotation that is absent
+                return None
+            else:
+                raise Unsupported(name)
+        elif model_field.is_relation:
+            # A foreign key id is its own representation
+            if (
+                not model_field.many_to_one
+                or type(field) is not PrimaryKeyRelatedField
+                or field.pk_field is not None
+            ):
+                raise Unsupported(name)
+            column = model_field.attname
+        else:
+            column = model_field.attname
+
+        if column not in self.columns:
+            self.columns.append(column)
+        value = f"row[{column!r}]"
+        if type(field) in PASSTHROUGH_FIELDS or isinstance(field, RelatedField):
+            return value
+        if isinstance(field, serializers.FileField):
+            if model_field is None:
+                raise Unsupported(name)
+            if not getattr(field, "use_url", True):
+                return f"({value} or None)"
+            namespace[f"storage_{name}"] = model_field.storage
+            return f"url(storage_{name}, {value})"
+        namespace[f"convert_{name}"] = _converter(field.to_representation)
+        return f"convert_{name}({value})"
+
+    def rows(self, queryset, extra=()):
+        """Return queryset as ``values()`` rows with every column needed"""
+        columns = dict.fromkeys(self.columns + list(extra))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def serialize(self, rows, context=None):
+        """Return the representations of rows, in order"""
+        rows = list(rows)
+        request = (context or {}).get("request")
+        ids = [row[self.pk] for row in rows]
+        related = [relation.fetch(ids, context) for relation in self.relations]
+        function, url = self.function, _file_url(request)
+        return [function(row, related, url) for row in rows]
+
+
+# Bounded, as sparse serializer classes evicted from their cache are rebuilt
+@lru_cache(maxsize=1024)
+def compile_serializer(serializer_class, annotations=frozenset()):
+    """Return the fast path of a serializer class, or None if it has none
+
+    annotations are the names annotated on the querysets it will read.
+    """
+    try:
+        return CompiledSerializer(serializer_class(), annotations)
+    except Unsupported:
+        return None
+
+
+def compile_for_queryset(serializer_class, queryset):
+    """Return the fast path of a serializer class for rows of queryset"""
+    return compile_serializer(serializer_class, frozenset(queryset.query.annotations))
+
+
+class FastListMixin:
+    """List through the compiled fast path of the view's serializer
+
+    Serializers stay in charge of validation and writes; serializers with
+    fields the fast path cannot represent are listed the regular way.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        compiled = compile_for_queryset(self.get_serializer_class(), queryset)
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        rows = compiled.rows(queryset, pagination_fields(self, queryset))
+
+        page = self.paginate_queryset(rows)
+        context = self.get_serializer_context()
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize(page, context))
+        return Response(compiled.serialize(rows, context))
@@ -0,0 +1,35 @@
+from functools import partial
+
+from django.db import transaction
+
+from core.models import Picture, PictureRendition
+from core.storage import lock_file
+
+
+def reference_count(name):
+    """Return how many pictures and renditions refer to a stored file"""
+    return (
+        Picture.objects.filter(image=name).count()
+        + PictureRendition.objects.filter(image=name).count()
+    )
+
+
+def release_file(storage, name):
+    """Delete a stored file once nothing refers to it any more
+
+    Content addressed files are shared by every picture with identical
+    content, so a file is only removed with its last reference. The count is
+    taken under the lock a concurrent save of the same content waits on.
+    """
+    if not name:
+        return
+    with transaction.atomic():
+        lock_file(name)
+        if reference_count(name) == 0:
+            storage.delete(name)
+
+
+def release_files(storage, names):
+    """Release files once the current transaction commits"""
+    for name in set(filter(None, names)):
+        transaction.on_commit(partial(release_file, storage, name))
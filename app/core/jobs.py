@@ -0,0 +1,108 @@
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Job
+
+
+def task_path(task):
+    """Return the dotted import path of a task function"""
+    if isinstance(task, str):
+        return task
+    return f"{task.__module__}.{task.__qualname__}"
+
+
+def enqueue(task, queue="default", delay=0, max_attempts=None, **kwargs):
+    """Queue task(**kwargs) to be run by a worker
+
+    task is a module level function or its dotted path, and kwargs must be
+    JSON serializable. The job is committed with the current transaction.
+    """
+    return Job.objects.create(
+        queue=queue,
+        task=task_path(task),
+        kwargs=kwargs,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """Return the delay before retrying a job that failed attempts times"""
+    delay = min(
+        settings.JOB_BACKOFF_BASE * 2 ** (attempts - 1), settings.JOB_BACKOFF_MAX
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim_job(queue="default"):
+    """Lock and return the next runnable job, or None if there is none
+
+    SKIP LOCKED lets any number of workers poll the same queue without
+    blocking each other. A claimed job is leased for JOB_LEASE_SECONDS, after
+    which it is runnable again in case its worker died. A job whose lease
+    expired on its last attempt is failed rather than leased again, so a job
+    that kills its worker is not retried forever.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        while True:
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(
+                    queue=queue, status__in=(Job.QUEUED, Job.RUNNING), run_at__lte=now
+                )
+                .order_by("run_at", "id")
+                .first()
+            )
+            if job is None:
+                return None
+            if job.status != Job.RUNNING or job.attempts < job.max_attempts:
+                break
+
+            job.status = Job.FAILED
+            job.last_error = (
+                f"Lease expired on attempt {job.attempts} of {job.max_attempts}; "
+                "the worker running the job died"
+            )
+            job.save(update_fields=["status", "last_error", "updated_at"])
+
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.run_at = now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        job.save(update_fields=["status", "attempts", "run_at", "updated_at"])
+    return job
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome, scheduling a retry on error"""
+    try:
+        import_string(job.task)(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(seconds=backoff(job.attempts))
+    else:
+        job.status = Job.DONE
+    job.save(update_fields=["status", "run_at", "last_error", "updated_at"])
+    return job
+
+
+def run_pending(queue="default", limit=None):
+    """Run runnable jobs until the queue is drained; return how many ran"""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job(queue)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Picture
+from picture.metadata import update_metadata
+
+
+class Command(BaseCommand):
+    """Django command to extract the metadata of pictures uploaded before it"""
+
+    help = "Store the size, color and placeholder of pictures missing them"
+
+    def handle(self, *args, **options):
+        pictures = Picture.objects.exclude(image="").filter(
+            image__isnull=False, width__isnull=True
+        )
+        updated = failed = 0
+        for picture in pictures.iterator():
+            try:
+                update_metadata(picture)
+            except OSError as exc:
+                failed += 1
+                self.stderr.write(f"Picture {picture.pk}: {exc}")
+            else:
+                updated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {updated} pictures, {failed} failed")
+        )
@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import SCENARIOS, compare, run_benchmark
+
+
+class Command(BaseCommand):
+    """Django command to measure the latency and throughput of the API"""
+
+    help = (
+        "Seed a dataset, drive the API endpoints with concurrent clients and "
+        "report latency percentiles, requests per second and queries per request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests sent per scenario"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Number of concurrent clients"
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=[scenario[0] for scenario in SCENARIOS],
+            help="Scenario to run, repeated for several; all by default",
+        )
+        parser.add_argument("--output", help="File to write the results to as JSON")
+        parser.add_argument(
+            "--compare", help="JSON results of an earlier run to compare with"
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        names = options["scenario"]
+        scenarios = [
+            scenario for scenario in SCENARIOS if not names or scenario[0] in names
+        ]
+        results = run_benchmark(
+            scenarios, options["rows"], options["requests"], options["concurrency"]
+        )
+
+        self.stdout.write(
+            f"{'scenario':<12}{'p50':>9}{'p95':>9}{'p99':>9}"
+            f"{'req/s':>9}{'queries':>9}{'errors':>8}"
+        )
+        for name, result in results["scenarios"].items():
+            latency = result["latency_ms"]
+            self.stdout.write(
+                f"{name:<12}{latency['p50']:>9.1f}{latency['p95']:>9.1f}"
+                f"{latency['p99']:>9.1f}{result['rps']:>9.1f}"
+                f"{result['queries']:>9.1f}{result['errors']:>8}"
+            )
+
+        if baseline is not None:
+            self.stdout.write(f"\nCompared with {baseline.get('revision')}:")
+            differing = [
+                key
+                for key in ("rows", "requests", "concurrency")
+                if baseline.get(key) != results[key]
+            ]
+            if differing:
+                self.stdout.write(
+                    self.style.WARNING(f"The runs differ in {', '.join(differing)}")
+                )
+            for name, metric, old, new, change in compare(results, baseline):
+                change = f"{change:+.1%}" if change is not None else "n/a"
+                self.stdout.write(
+                    f"{name:<12}{metric:<13}{old:>9.1f} -> {new:>9.1f} {change:>8}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
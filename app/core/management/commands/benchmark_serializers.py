@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory
+
+from blog.serializers import BlogSerializer, TagSerializer
+from core.benchmark import best_time, default_host, seed
+from core.fastpath import compile_serializer
+from core.models import Blog, Picture, Tag
+from core.prefetch import prefetch_for_serializer
+from picture.serializers import PictureSerializer
+
+BENCHMARKS = (
+    ("blogs", Blog, BlogSerializer),
+    ("pictures", Picture, PictureSerializer),
+    ("tags", Tag, TagSerializer),
+)
+
+
+class Command(BaseCommand):
+    """Django command to compare the serializers with their compiled fast path"""
+
+    help = "Time listing rows with the serializers and with the fast path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = seed(options["rows"])
+            # Plan the queries with statistics covering the seeded rows
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            self.run(user, options["repeat"])
+            # Nothing written by the benchmark is kept
+            transaction.set_rollback(True)
+
+    def run(self, user, repeat):
+        request = APIRequestFactory().get("/api/", HTTP_HOST=default_host())
+        context = {"request": request}
+        for name, model, serializer_class in BENCHMARKS:
+            queryset = model.objects.filter(user=user).order_by("id")
+            compiled = compile_serializer(serializer_class)
+
+            def regular():
+                objects = prefetch_for_serializer(queryset, serializer_class)
+                return serializer_class(objects, many=True, context=context).data
+
+            def fast():
+                return compiled.serialize(compiled.rows(queryset), context)
+
+            regular_time = best_time(regular, repeat)
+            fast_time = best_time(fast, repeat)
+            self.stdout.write(
+                f"{name:<10} serializer {regular_time * 1000:8.1f} ms  "
+                f"fast path {fast_time * 1000:8.1f} ms  "
+                f"{regular_time / fast_time:5.1f}x"
+            )
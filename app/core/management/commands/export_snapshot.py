@@ -0,0 +1,48 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from feed.snapshot import export_snapshot
+
+
+class Command(BaseCommand):
+    """Django command to pre-render published content to static JSON files"""
+
+    help = (
+        "Render published blogs, projects, slideshows and the tag index to "
+        "JSON files with gzip'd copies, re-rendering only what changed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default=settings.SNAPSHOT_ROOT, help="Directory to write to"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes rendering objects",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Number of objects rendered per worker task",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Render every object instead of those changed since the last run",
+        )
+
+    def handle(self, *args, **options):
+        rendered, removed = export_snapshot(
+            options["output"],
+            workers=options["workers"],
+            full=options["full"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered {rendered} objects, removed {removed}")
+        )
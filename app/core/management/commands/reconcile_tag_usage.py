@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.usage import update_usage_counts
+
+
+class Command(BaseCommand):
+    """Django command to recompute the usage counts of every tag"""
+
+    help = "Recount the blogs carrying each tag with a single aggregate query"
+
+    def handle(self, *args, **options):
+        changed = update_usage_counts()
+        self.stdout.write(self.style.SUCCESS(f"Corrected {changed} tag counts"))
@@ -0,0 +1,48 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import claim_job, run_job
+
+
+class Command(BaseCommand):
+    """Django command to run queued background jobs"""
+
+    help = "Run background jobs from the database job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", default="default", help="Queue to consume")
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.stdout.write(f"Worker consuming queue '{options['queue']}'")
+        while self.running:
+            close_old_connections()
+            job = claim_job(options["queue"])
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+                continue
+
+            job = run_job(job)
+            self.stdout.write(f"{job.task} #{job.id}: {job.status}")
+        self.stdout.write(self.style.SUCCESS("Worker stopped"))
+
+    def stop(self, signum, frame):
+        """Finish the current job, then exit"""
+        self.running = False
@@ -0,0 +1,73 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.seeding import SEED_PASSWORD, seed_data
+
+
+class Command(BaseCommand):
+    """Django command to generate a large synthetic dataset"""
+
+    help = (
+        "Stream synthetic users, tags, pictures, blogs and slideshows into the "
+        "database with COPY, generating the same content for the same seed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--blogs", type=int, default=10000)
+        parser.add_argument("--tags", type=int, default=1000)
+        parser.add_argument("--pictures", type=int, default=10000)
+        parser.add_argument("--slideshows", type=int, default=1000)
+        parser.add_argument(
+            "--tags-per-blog", type=int, default=3, help="Mean tags of a blog"
+        )
+        parser.add_argument(
+            "--pictures-per-blog", type=int, default=2, help="Mean pictures of a blog"
+        )
+        parser.add_argument(
+            "--pictures-per-slideshow",
+            type=int,
+            default=10,
+            help="Mean pictures of a slideshow",
+        )
+        parser.add_argument(
+            "--images",
+            type=int,
+            default=0,
+            help="Number of distinct placeholder image files shared by the pictures",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes rendering images",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            created = seed_data(
+                users=options["users"],
+                blogs=options["blogs"],
+                tags=options["tags"],
+                pictures=options["pictures"],
+                slideshows=options["slideshows"],
+                tags_per_blog=options["tags_per_blog"],
+                pictures_per_blog=options["pictures_per_blog"],
+                pictures_per_slideshow=options["pictures_per_slideshow"],
+                images=options["images"],
+                seed=options["seed"],
+                workers=options["workers"],
+                log=self.stdout.write,
+            )
+        rows = sum(created.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {rows} rows in {time.perf_counter() - start:.1f}s; "
+                f"users log in with the password {SEED_PASSWORD!r}"
+            )
+        )
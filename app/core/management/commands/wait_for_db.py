@@ -1,20 +1,54 @@
+import random
 import time
 
-from django.db import connections
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+
+def probe(alias):
+    """Open a connection to the database and run a trivial query on it
+
+    Looking the connection up is not enough, as Django only connects when
+    the first query is run.
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
 
 
 class Command(BaseCommand):
     """Django command to pause execution until database is available"""
 
+    help = "Wait, with jittered exponential backoff, until the database answers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Give up after this many seconds",
+        )
+        parser.add_argument("--max-delay", type=float, default=5)
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
+        deadline = time.monotonic() + options["timeout"]
+        attempts = 0
+        while True:
             try:
-                db_conn = connections["default"]
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                probe(options["database"])
+                break
+            except OperationalError as exc:
+                attempts += 1
+                delay = min(0.1 * 2**attempts, options["max_delay"])
+                delay *= random.uniform(0.5, 1.0)
+                if time.monotonic() + delay > deadline:
+                    raise CommandError(
+                        f"Database unavailable after {attempts} attempts: {exc}"
+                    )
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:.2f} seconds..."
+                )
+                time.sleep(delay)
         self.stdout.write(self.style.SUCCESS("Database available"))
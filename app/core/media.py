@@ -0,0 +1,194 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Count, Q
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from core.models import Picture
+from core.storage import content_digest
+from user.authentication import SignedTokenAuthentication
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+OFFLOAD_HEADERS = {
+    "x-accel-redirect": "X-Accel-Redirect",
+    "x-sendfile": "X-Sendfile",
+}
+
+
+def media_access(name, user):
+    """Return whether user may read a media file, and whether it is public
+
+    Identical uploads share one file, so every picture whose image or
+    rendition is the file counts: it is public if any of them appears in
+    published content, and readable by the owners of all of them.
+    """
+    published = (
+        Q(blog__published=True)
+        | Q(slideshow__published=True)
+        | Q(slideshow__project__published=True)
+    )
+    access = Picture.objects.filter(
+        Q(image=name) | Q(renditions__image=name)
+    ).aggregate(
+        public=Count("pk", filter=published),
+        owned=Count("pk", filter=Q(user_id=user.pk)),
+    )
+    public = bool(access["public"])
+    return public or bool(access["owned"]), public
+
+
+def parse_range(header, size):
+    """Return the (start, end) inclusive byte range requested by a Range header
+
+    Returns None when the header should be ignored, which is the case for
+    missing, malformed and multi-range headers, and raises ValueError when
+    the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header or "")
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # A suffix range asks for the last bytes of the file
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class RangeFileWrapper:
+    """Iterate over length bytes of a file starting at offset"""
+
+    def __init__(self, file, offset, length, block_size=64 * 1024):
+        self.file = file
+        self.remaining = length
+        self.block_size = block_size
+        self.file.seek(offset)
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.file.read(min(self.block_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.file.close()
+
+
+def offload_response(path, name, content_type):
+    """Return a response handing the transfer of a file to the web server"""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_OFFLOAD == "x-accel-redirect":
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(name)
+    else:
+        response[OFFLOAD_HEADERS[settings.MEDIA_OFFLOAD]] = path
+    return response
+
+
+def cache_control(name, public):
+    """Return the Cache-Control of a media file
+
+    Content addressed files never change under their name, so they may be
+    kept as long as the client likes without revalidating.
+    """
+    if content_digest(name) is None:
+        return (
+            f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}" if public else "private"
+        )
+    visibility = "public" if public else "private"
+    return f"{visibility}, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable"
+
+
+def file_response(request, path, content_type, stat):
+    """Serve a file from Python with conditional and byte range support"""
+    if not was_modified_since(
+        request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime, stat.st_size
+    ):
+        return HttpResponseNotModified()
+
+    try:
+        byte_range = parse_range(request.META.get("HTTP_RANGE"), stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return response
+
+    if byte_range is None:
+        # FileResponse lets the WSGI server use sendfile for the whole file
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["Content-Length"] = stat.st_size
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFileWrapper(open(path, "rb"), start, end - start + 1),
+            content_type=content_type,
+            status=206,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+class MediaView(APIView):
+    """Serve uploaded media after checking the requester may see it
+
+    Pictures in published content are public, others are only served to
+    their owner. The transfer itself is handed to the front web server with
+    an X-Accel-Redirect or X-Sendfile header when MEDIA_OFFLOAD is set, and
+    done from Python otherwise.
+    """
+
+    authentication_classes = (SignedTokenAuthentication, TokenAuthentication)
+    permission_classes = (AllowAny,)
+
+    def get(self, request, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+            stat = os.stat(full_path)
+        except (SuspiciousFileOperation, OSError):
+            raise Http404("File not found")
+
+        readable, public = media_access(path, request.user)
+        if not readable:
+            raise Http404("File not found")
+
+        digest = content_digest(path)
+        etag = f'"{digest}"' if digest else None
+        content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        if etag and etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+            response = HttpResponseNotModified()
+        elif settings.MEDIA_OFFLOAD:
+            response = offload_response(full_path, path, content_type)
+        else:
+            response = file_response(request._request, full_path, content_type, stat)
+
+        if etag:
+            response["ETag"] = etag
+        response["Cache-Control"] = cache_control(path, public)
+        return response
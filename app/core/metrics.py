@@ -0,0 +1,306 @@
+import atexit
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.views import View
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Key in a series, metric name, help text and upper bounds of each histogram
+HISTOGRAMS = (
+    (
+        "duration",
+        "http_request_duration_seconds",
+        "Time spent answering requests",
+        DURATION_BUCKETS,
+    ),
+    (
+        "queries",
+        "http_request_db_queries",
+        "Database queries run per request",
+        QUERY_BUCKETS,
+    ),
+    ("size", "http_response_size_bytes", "Size of response bodies", SIZE_BUCKETS),
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Every thread records into a shard of its own, so recording takes no lock;
+# collecting sums the shards of all threads. The shards of threads that
+# exited are folded into _retired, so thread churn does not grow _shards.
+_local = threading.local()
+_shards = []
+_retired = {}
+_shards_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def new_series():
+    """Return empty aggregates of one view and method
+
+    A histogram is a list of the sum of the observations followed by the
+    number of observations falling in each bucket, the last being +Inf.
+    """
+    series = {"statuses": {}, "query_time": 0.0}
+    for key, _, _, buckets in HISTOGRAMS:
+        series[key] = [0] * (len(buckets) + 2)
+    return series
+
+
+def _shard():
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def record(view, method, status, duration, queries, query_time, size):
+    """Record a request answered by view in this thread's shard"""
+    shard = _shard()
+    series = shard.get((view, method))
+    if series is None:
+        series = shard[(view, method)] = new_series()
+    statuses = series["statuses"]
+    statuses[status] = statuses.get(status, 0) + 1
+    series["query_time"] += query_time
+    for (key, _, _, buckets), value in zip(HISTOGRAMS, (duration, queries, size)):
+        if value is None:
+            continue
+        histogram = series[key]
+        histogram[0] += value
+        histogram[1 + bisect_left(buckets, value)] += 1
+
+
+def merge(into, series_list):
+    """Add (view, method, series) triples to a dict of series by view and method"""
+    for view, method, series in series_list:
+        total = into.get((view, method))
+        if total is None:
+            total = into[(view, method)] = new_series()
+        for status, count in list(series["statuses"].items()):
+            status = str(status)
+            total["statuses"][status] = total["statuses"].get(status, 0) + count
+        total["query_time"] += series["query_time"]
+        for key, _, _, _ in HISTOGRAMS:
+            total[key] = [a + b for a, b in zip(total[key], series[key])]
+    return into
+
+
+def _series(shard):
+    # Copying the items is atomic, while iterating them is not
+    return [(*key, series) for key, series in list(shard.items())]
+
+
+def local_series():
+    """Return the aggregates of this process as (view, method, series) triples"""
+    with _shards_lock:
+        live = []
+        for thread, shard in _shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                # The thread exited, so its shard no longer changes
+                merge(_retired, _series(shard))
+        _shards[:] = live
+        totals = merge({}, _series(_retired))
+    for _, shard in live:
+        merge(totals, _series(shard))
+    return [(*key, series) for key, series in totals.items()]
+
+
+def reset():
+    """Forget every request recorded by this process"""
+    with _shards_lock:
+        _retired.clear()
+        for _, shard in _shards:
+            shard.clear()
+
+
+def _process_path(pid=None):
+    return os.path.join(settings.METRICS_DIR, f"metrics-{pid or os.getpid()}.json")
+
+
+def flush():
+    """Write the aggregates of this process to METRICS_DIR, if it is set"""
+    global _last_flush
+    if not settings.METRICS_DIR:
+        return
+    _last_flush = time.monotonic()
+    path = _process_path()
+    temp_path = f"{path}.tmp{threading.get_ident()}"
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    with open(temp_path, "w") as temp_file:
+        json.dump(local_series(), temp_file)
+    os.replace(temp_path, path)
+
+
+def maybe_flush():
+    """Flush if METRICS_FLUSH_INTERVAL passed, unless another thread is at it"""
+    if not settings.METRICS_DIR:
+        return
+    if time.monotonic() - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    if _flush_lock.acquire(blocking=False):
+        try:
+            flush()
+        finally:
+            _flush_lock.release()
+
+
+atexit.register(flush)
+
+
+def collect():
+    """Return the aggregates of every process by view and method
+
+    With METRICS_DIR set, the files flushed by the other processes sharing
+    it, including those that exited since, are added to the live aggregates
+    of this one.
+    """
+    totals = merge({}, local_series())
+    if settings.METRICS_DIR:
+        own = _process_path()
+        for path in glob.glob(_process_path("*")):
+            if path == own:
+                continue
+            try:
+                with open(path) as process_file:
+                    merge(totals, json.load(process_file))
+            except (OSError, ValueError):
+                # Being replaced or not completely written; skip it this time
+                continue
+    return totals
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def render(totals):
+    """Return aggregates in the Prometheus text exposition format"""
+    series = sorted(totals.items())
+    lines = [
+        "# HELP http_requests_total Requests answered",
+        "# TYPE http_requests_total counter",
+    ]
+    for (view, method), values in series:
+        for status, count in sorted(values["statuses"].items()):
+            labels = _labels(view=view, method=method, status=status)
+            lines.append(f"http_requests_total{labels} {count}")
+
+    lines += [
+        "# HELP db_query_duration_seconds_total Time spent in database queries",
+        "# TYPE db_query_duration_seconds_total counter",
+    ]
+    for (view, method), values in series:
+        labels = _labels(view=view, method=method)
+        lines.append(f"db_query_duration_seconds_total{labels} {values['query_time']}")
+
+    for key, name, help_text, buckets in HISTOGRAMS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (view, method), values in series:
+            total, *counts = values[key]
+            cumulative = 0
+            for bound, count in zip(buckets + ("+Inf",), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else str(float(bound))
+                labels = _labels(view=view, method=method, le=le)
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _labels(view=view, method=method)
+            lines.append(f"{name}_sum{labels} {total}")
+            lines.append(f"{name}_count{labels} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Record the latency, queries and response size of requests per view
+
+    Requests are aggregated by the name of the URL pattern they resolved to
+    and their method, which together tell the viewset actions apart. The
+    aggregates are served by MetricsView.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+        query_time = 0.0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries, query_time
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries += 1
+                query_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        if match is not None and getattr(match.func, "view_class", None) is MetricsView:
+            return response
+        if response.streaming:
+            size = response.get("Content-Length")
+            size = int(size) if size else None
+        else:
+            size = len(response.content)
+        record(
+            match.view_name if match is not None else "unmatched",
+            request.method,
+            str(response.status_code),
+            duration,
+            queries,
+            query_time,
+            size,
+        )
+        maybe_flush()
+        return response
+
+
+class MetricsView(View):
+    """Serve the request metrics in the Prometheus text format
+
+    Scrapers must send METRICS_TOKEN as a bearer token. Without one set, the
+    metrics are only served with DEBUG on.
+    """
+
+    def authorized(self, request):
+        """Return whether request may read the metrics"""
+        token = settings.METRICS_TOKEN
+        if not token:
+            return settings.DEBUG
+        given = request.META.get("HTTP_AUTHORIZATION", "")
+        return hmac.compare_digest(given.encode(), f"Bearer {token}".encode())
+
+    def get(self, request):
+        if not self.authorized(request):
+            response = HttpResponse(status=401)
+            response["WWW-Authenticate"] = "Bearer"
+            return response
+        return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
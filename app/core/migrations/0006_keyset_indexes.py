@@ -0,0 +1,29 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_project_slideshow'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['user', 'id'], name='blog_user_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='picture',
+            index=models.Index(fields=['user', 'caption', 'id'], name='picture_user_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slideshow',
+            index=models.Index(fields=['user', 'title', 'id'], name='slideshow_user_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'name', 'id'], name='tag_user_keyset_idx'),
+        ),
+    ]
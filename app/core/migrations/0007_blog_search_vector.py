@@ -0,0 +1,37 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:26
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+BACKFILL_SEARCH_VECTOR_SQL = """
+    UPDATE core_blog SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(core_tag.name, ' ')
+            FROM core_tag
+            INNER JOIN core_blog_tags ON core_blog_tags.tag_id = core_tag.id
+            WHERE core_blog_tags.blog_id = core_blog.id
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(text, '')), 'C')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_SEARCH_VECTOR_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='blog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='blog_search_vector_idx'),
+        ),
+    ]
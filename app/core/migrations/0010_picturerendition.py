@@ -0,0 +1,32 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_user_token_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PictureRendition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('format', models.CharField(max_length=10)),
+                ('image', models.ImageField(max_length=255, upload_to='')),
+                ('picture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='core.Picture')),
+            ],
+            options={
+                'ordering': ('width', 'format'),
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='picturerendition',
+            unique_together={('picture', 'width', 'format')},
+        ),
+    ]
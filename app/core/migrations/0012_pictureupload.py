@@ -0,0 +1,27 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PictureUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('checksum', models.CharField(max_length=64)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('picture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='core.Picture')),
+            ],
+        ),
+    ]
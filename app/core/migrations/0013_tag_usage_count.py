@@ -0,0 +1,29 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:39
+
+from django.db import migrations, models
+
+BACKFILL_USAGE_COUNT_SQL = """
+    UPDATE core_tag SET usage_count = (
+        SELECT COUNT(*) FROM core_blog_tags WHERE core_blog_tags.tag_id = core_tag.id
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_pictureupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL_USAGE_COUNT_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'usage_count', 'id'], name='tag_user_usage_idx'),
+        ),
+    ]
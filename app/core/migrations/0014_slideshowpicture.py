@@ -0,0 +1,65 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_POSITION_SQL = """
+    UPDATE core_slideshow_pictures SET position = numbered.position
+    FROM (
+        SELECT id, 1024 * ROW_NUMBER() OVER (
+            PARTITION BY slideshow_id ORDER BY id
+        ) AS position
+        FROM core_slideshow_pictures
+    ) AS numbered
+    WHERE core_slideshow_pictures.id = numbered.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_tag_usage_count'),
+    ]
+
+    operations = [
+        # The existing auto-created through table is adopted as is; only the
+        # position column and its index are new in the database.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='SlideshowPicture',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('picture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.Picture')),
+                        ('slideshow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='core.Slideshow')),
+                    ],
+                    options={
+                        'db_table': 'core_slideshow_pictures',
+                    },
+                ),
+                migrations.AlterUniqueTogether(
+                    name='slideshowpicture',
+                    unique_together={('slideshow', 'picture')},
+                ),
+                migrations.AlterField(
+                    model_name='slideshow',
+                    name='pictures',
+                    field=models.ManyToManyField(through='core.SlideshowPicture', to='core.Picture'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='slideshowpicture',
+            name='position',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunSQL(BACKFILL_POSITION_SQL, migrations.RunSQL.noop),
+        migrations.AlterModelOptions(
+            name='slideshowpicture',
+            options={'ordering': ('position', 'id')},
+        ),
+        migrations.AddIndex(
+            model_name='slideshowpicture',
+            index=models.Index(fields=['slideshow', 'position'], name='slideshow_position_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_slideshowpicture'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', 'id'], name='project_user_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_project_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='published',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='published',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='slideshow',
+            name='published',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['published', 'id'], name='blog_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['published', 'id'], name='project_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slideshow',
+            index=models.Index(fields=['published', 'title', 'id'], name='slideshow_published_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.1.15 on 2026-10-17 03:53
+
+import core.models
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_published'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='picture',
+            name='image',
+            field=models.ImageField(db_index=True, null=True, storage=core.storage.ContentAddressedStorage(), upload_to=core.models.picture_image_file_path),
+        ),
+        migrations.AlterField(
+            model_name='picturerendition',
+            name='image',
+            field=models.ImageField(db_index=True, max_length=255, storage=core.storage.ContentAddressedStorage(), upload_to=''),
+        ),
+    ]
@@ -4,11 +4,21 @@ import uuid
 from django.conf import settings
 from django.contrib.auth.models import PermissionsMixin  # noqa
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+
+from core.storage import ContentAddressedStorage
 
 
 def picture_image_file_path(instance, filename):
-    """Generate filepath for new picture image"""
+    """Generate filepath for new picture image
+
+    The storage replaces the file name with the hash of the content, keeping
+    the directory and extension.
+    """
     ext = filename.split(".")[-1]
     filename = f"{uuid.uuid4()}.{ext}"
 
@@ -44,6 +54,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    token_generation = models.PositiveIntegerField(default=0)
 
     objects = UserManager()
 
@@ -58,6 +69,16 @@ class Tag(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    usage_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "name", "id"], name="tag_user_keyset_idx"),
+            models.Index(
+                fields=["user", "usage_count", "id"], name="tag_user_usage_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -68,12 +89,75 @@ class Picture(models.Model):
 
     caption = models.CharField(max_length=255)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    image = models.ImageField(null=True, upload_to=picture_image_file_path)
+    image = models.ImageField(
+        null=True,
+        db_index=True,
+        upload_to=picture_image_file_path,
+        storage=ContentAddressedStorage(),
+    )
+    # Extracted from the image once at upload, see picture.metadata
+    width = models.PositiveIntegerField(null=True, editable=False)
+    height = models.PositiveIntegerField(null=True, editable=False)
+    format = models.CharField(max_length=10, blank=True, editable=False)
+    byte_size = models.BigIntegerField(null=True, editable=False)
+    dominant_color = models.CharField(max_length=7, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "caption", "id"], name="picture_user_keyset_idx"
+            )
+        ]
 
     def __str__(self):
         return self.caption
 
 
+class PictureRendition(models.Model):
+    """Resized copy of a picture's image in a web friendly format"""
+
+    picture = models.ForeignKey(
+        "Picture", on_delete=models.CASCADE, related_name="renditions"
+    )
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    format = models.CharField(max_length=10)
+    image = models.ImageField(
+        max_length=255, db_index=True, storage=ContentAddressedStorage()
+    )
+
+    class Meta:
+        ordering = ("width", "format")
+        unique_together = (("picture", "width", "format"),)
+
+    def __str__(self):
+        return self.image.name
+
+
+class PictureUpload(models.Model):
+    """Resumable chunked upload of a picture image in progress"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    picture = models.ForeignKey(
+        "Picture", on_delete=models.CASCADE, related_name="uploads"
+    )
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    checksum = models.CharField(max_length=64)
+    offset = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def temp_path(self):
+        """Path of the partial file receiving the chunks"""
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+
+    def __str__(self):
+        return self.filename
+
+
 class Blog(models.Model):
     """Blog post"""
 
@@ -82,6 +166,16 @@ class Blog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     pictures = models.ManyToManyField("Picture")
     tags = models.ManyToManyField("Tag")
+    published = models.BooleanField(default=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="blog_user_keyset_idx"),
+            models.Index(fields=["published", "id"], name="blog_published_idx"),
+            GinIndex(fields=["search_vector"], name="blog_search_vector_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -96,6 +190,14 @@ class Project(models.Model):
     slideshow = models.OneToOneField(
         "Slideshow", on_delete=models.CASCADE, blank=True, null=True
     )
+    published = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="project_user_keyset_idx"),
+            models.Index(fields=["published", "id"], name="project_published_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -108,7 +210,82 @@ class Slideshow(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, default=0
     )
-    pictures = models.ManyToManyField("Picture")
+    pictures = models.ManyToManyField("Picture", through="SlideshowPicture")
+    published = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "title", "id"], name="slideshow_user_keyset_idx"
+            ),
+            models.Index(
+                fields=["published", "title", "id"], name="slideshow_published_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class SlideshowPicture(models.Model):
+    """Position of a picture in a slideshow
+
+    Positions are spaced POSITION_STEP apart so a picture can be moved
+    between two others by rewriting only its own row.
+    """
+
+    POSITION_STEP = 1024
+
+    slideshow = models.ForeignKey(
+        Slideshow, on_delete=models.CASCADE, related_name="memberships"
+    )
+    picture = models.ForeignKey(Picture, on_delete=models.CASCADE)
+    position = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "core_slideshow_pictures"
+        ordering = ("position", "id")
+        unique_together = ("slideshow", "picture")
+        indexes = [
+            models.Index(
+                fields=["slideshow", "position"], name="slideshow_position_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.slideshow} #{self.position}"
+
+
+class Job(models.Model):
+    """Unit of background work run by the run_worker command"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    queue = models.CharField(max_length=50, default="default")
+    task = models.CharField(max_length=255)
+    kwargs = JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["queue", "status", "run_at"], name="job_claim_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
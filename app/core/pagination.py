@@ -0,0 +1,164 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def pagination_fields(view, queryset):
+    """Return the fields the view's paginator reads from every row
+
+    Views loading only some columns, or rows as dicts, must keep these.
+    """
+    paginator = view.paginator
+    if paginator is None or not hasattr(paginator, "get_row_fields"):
+        return ()
+    return paginator.get_row_fields(view.request, queryset, view)
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a stable (ordering key, id) pair
+
+    Pages are fetched by seeking past the last row of the previous page
+    instead of using OFFSET, so a deep page costs the same as the first.
+    The ordering key is taken from the view's ``get_ordering()`` method or
+    ``ordering`` attribute and ``id`` is always appended in the same
+    direction to break ties.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "-id"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a single page of results, or None if not paginating"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        ordering = self.get_ordering(request, queryset, view)
+        self.field = ordering.lstrip("-")
+        self.descending = ordering.startswith("-")
+
+        cursor = self.decode_cursor(request)
+        self.has_cursor = cursor is not None
+        self.reverse = bool(cursor and cursor["r"])
+
+        if cursor is not None:
+            queryset = queryset.filter(self._seek(cursor["k"], cursor["i"]))
+
+        # Paging backwards walks the index in the opposite direction.
+        descending = self.descending != self.reverse
+        queryset = queryset.order_by(*self._order_by(descending))
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_page_size(self, request):
+        """Return the page size requested by the client, within limits"""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering key, e.g. ``"-name"``"""
+        if hasattr(view, "get_ordering"):
+            return view.get_ordering()
+        return getattr(view, "ordering", self.ordering)
+
+    def get_row_fields(self, request, queryset, view):
+        """Return the fields cursors are built from"""
+        field = self.get_ordering(request, queryset, view).lstrip("-")
+        return (field,) if field == "id" else (field, "id")
+
+    def get_next_link(self):
+        has_next = self.has_cursor if self.reverse else self.has_more
+        if not has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        has_previous = self.has_more if self.reverse else self.has_cursor
+        if not has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        """Return the cursor from the query params, or None on page one"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            return {"k": cursor["k"], "i": int(cursor["i"]), "r": bool(cursor["r"])}
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        """Return the URL of the page that starts after (or before) row"""
+        cursor = {
+            "k": self._value(row, self.field),
+            "i": self._value(row, "id"),
+            "r": reverse,
+        }
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.rstrip("=")
+        )
+
+    def _order_by(self, descending):
+        prefix = "-" if descending else ""
+        if self.field == "id":
+            return [f"{prefix}id"]
+        return [f"{prefix}{self.field}", f"{prefix}id"]
+
+    def _seek(self, key, pk):
+        """Return a filter selecting the rows past (key, pk) in page order
+
+        The leading range condition on the key alone lets Postgres start an
+        index scan at the cursor position rather than filtering every row.
+        """
+        op = "lt" if self.descending != self.reverse else "gt"
+        if self.field == "id":
+            return Q(**{f"id__{op}": pk})
+
+        return Q(**{f"{self.field}__{op}e": key}) & (
+            Q(**{f"{self.field}__{op}": key}) | Q(**{f"id__{op}": pk})
+        )
+
+    @staticmethod
+    def _value(row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
@@ -0,0 +1,93 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def plan_prefetches(serializer):
+    """Return the (select_related, prefetch_related) lookups a serializer needs
+
+    Single-valued relations reached from the root are joined in with
+    select_related, everything else is prefetched, so the number of queries
+    depends on the shape of the serializer and not on the number of rows.
+    """
+    if not isinstance(serializer, serializers.ModelSerializer):
+        return (), ()
+    select_related, prefetch_related = [], []
+    model = serializer.Meta.model
+    _walk(serializer, model, "", False, select_related, prefetch_related)
+    return tuple(select_related), tuple(prefetch_related)
+
+
+# Bounded, as sparse serializer classes evicted from their cache are rebuilt
+@lru_cache(maxsize=1024)
+def get_prefetch_plan(serializer_class):
+    """Return the cached prefetch plan for a serializer class"""
+    return plan_prefetches(serializer_class())
+
+
+def prefetch_for_serializer(queryset, serializer_class):
+    """Apply the prefetches the serializer class needs to queryset"""
+    select_related, prefetch_related = get_prefetch_plan(serializer_class)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+def _walk(serializer, model, prefix, many, select_related, prefetch_related):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        relation = _resolve_relation(model, field.source_attrs)
+        if relation is None:
+            continue
+
+        lookup = prefix + "__".join(field.source_attrs)
+        related_model = relation.related_model
+        to_many = relation.many_to_many or relation.one_to_many
+
+        if isinstance(field, serializers.ListSerializer):
+            prefetch_related.append(lookup)
+            _walk(
+                field.child,
+                related_model,
+                lookup + "__",
+                True,
+                select_related,
+                prefetch_related,
+            )
+        elif isinstance(field, serializers.BaseSerializer):
+            nested_many = many or to_many
+            (prefetch_related if nested_many else select_related).append(lookup)
+            _walk(
+                field,
+                related_model,
+                lookup + "__",
+                nested_many,
+                select_related,
+                prefetch_related,
+            )
+        elif isinstance(field, ManyRelatedField):
+            prefetch_related.append(lookup)
+        elif isinstance(field, RelatedField) and not field.use_pk_only_optimization():
+            (prefetch_related if many else select_related).append(lookup)
+
+
+def _resolve_relation(model, source_attrs):
+    """Return the model field at the end of source_attrs if it is a relation"""
+    relation = None
+    for attr in source_attrs:
+        if model is None:
+            return None
+        try:
+            relation = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not relation.is_relation:
+            return None
+        model = relation.related_model
+    return relation
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+
+class PublicCacheMixin:
+    """Mark anonymous read responses as cacheable by shared caches
+
+    Successful reads are sent with ``Cache-Control: public`` and an
+    ``s-maxage`` for reverse proxies and CDNs, and with a ``Surrogate-Key``
+    header naming every object in the payload so that a proxy can purge all
+    responses that include an object when it changes. Lists also carry the
+    ``<surrogate_key>-list`` key.
+    """
+
+    surrogate_key = None
+
+    def get_surrogate_keys(self, obj):
+        """Return the surrogate keys of an object and what it nests"""
+        return [f"{self.surrogate_key}-{obj.pk}"]
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self.surrogate_objects = page
+        return page
+
+    def get_object(self):
+        obj = super().get_object()
+        self.surrogate_objects = [obj]
+        return obj
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in ("GET", "HEAD"):
+            return response
+
+        if response.status_code in (200, 304):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=settings.PUBLIC_CACHE_MAX_AGE,
+                s_maxage=settings.PUBLIC_CACHE_S_MAXAGE,
+            )
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+
+        if response.status_code == 200:
+            keys = [] if self.detail else [f"{self.surrogate_key}-list"]
+            for obj in getattr(self, "surrogate_objects", None) or ():
+                keys.extend(self.get_surrogate_keys(obj))
+            response["Surrogate-Key"] = " ".join(dict.fromkeys(keys))
+        return response
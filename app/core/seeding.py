@@ -0,0 +1,374 @@
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from io import BytesIO
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from blog.search import update_search_vectors
+from blog.usage import update_usage_counts
+from core.models import Blog, Picture, Slideshow, SlideshowPicture, Tag, User
+from picture.metadata import image_metadata
+
+SEED_PASSWORD = "seedpass"
+COPY_BUFFER_SIZE = 256 * 1024
+UPDATE_BATCH_SIZE = 10000
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo "
+    "consequat duis aute irure in reprehenderit voluptate velit esse cillum "
+    "fugiat nulla pariatur excepteur sint occaecat cupidatat non proident sunt "
+    "culpa qui officia deserunt mollit anim id est laborum"
+).split()
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value):
+    """Return a value in the text format of COPY"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+class CopyStream:
+    """File-like object reading rows in the text format of COPY
+
+    Rows are formatted as COPY reads them, so millions of them never need to
+    be held in memory at once.
+    """
+
+    def __init__(self, rows):
+        self.lines = (
+            ("\t".join(map(_copy_value, row)) + "\n").encode() for row in rows
+        )
+        self.pending = b""
+
+    def read(self, size=-1):
+        chunks, length = [self.pending], len(self.pending)
+        if size < 0 or length < size:
+            for line in self.lines:
+                chunks.append(line)
+                length += len(line)
+                if 0 <= size <= length:
+                    break
+        data = b"".join(chunks)
+        if size < 0:
+            size = len(data)
+        self.pending = data[size:]
+        return data[:size]
+
+
+def copy_rows(model, columns, rows):
+    """Stream rows of column values into the table of model with COPY"""
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_list = ", ".join(connection.ops.quote_name(column) for column in columns)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({column_list}) FROM STDIN",
+            CopyStream(rows),
+            size=COPY_BUFFER_SIZE,
+        )
+
+
+def reserve_ids(model, count):
+    """Take count consecutive primary keys from the sequence of model's table
+
+    COPY cannot return the keys it inserts, so they are reserved up front
+    and written explicitly, which lets related rows refer to them.
+    """
+    if count <= 0:
+        return range(0)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%(table)s, %(column)s), "
+            "nextval(pg_get_serial_sequence(%(table)s, %(column)s)) + %(count)s - 1)",
+            {
+                "table": model._meta.db_table,
+                "column": model._meta.pk.column,
+                "count": count,
+            },
+        )
+        last = cursor.fetchone()[0]
+    return range(last - count + 1, last + 1)
+
+
+def owned(ids, users, user_index):
+    """Return the ids of the rows handed to a user, every users'th of them"""
+    return ids[user_index::users]
+
+
+def batches(ids, size=UPDATE_BATCH_SIZE):
+    """Return an iterator over lists of up to size ids"""
+    ids = iter(ids)
+    return iter(lambda: list(islice(ids, size)), [])
+
+
+@lru_cache(maxsize=None)
+def popularity(count):
+    """Return cumulative weights making the first of count items most popular"""
+    return list(accumulate(1 / (rank + 1) for rank in range(count)))
+
+
+def render_image(task):
+    """Render a placeholder image; return its JPEG bytes and metadata"""
+    seed, index = task
+    rng = random.Random(f"{seed}-image-{index}")
+    width, height = rng.choice(((1600, 1200), (1200, 1600), (1920, 1080)))
+    image = Image.new("RGB", (width, height), tuple(rng.choices(range(256), k=3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(8):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle(
+            (x, y, x + rng.randrange(width // 2), y + rng.randrange(height // 2)),
+            fill=tuple(rng.choices(range(256), k=3)),
+        )
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=80)
+    content = buffer.getvalue()
+
+    metadata = image_metadata(BytesIO(content))
+    metadata["byte_size"] = len(content)
+    return content, metadata
+
+
+def create_images(count, seed, workers=1):
+    """Render and store count distinct placeholder images
+
+    Images are rendered in parallel if workers > 1. They are stored by this
+    process, as the storage locks file names in the database, which the
+    workers must not touch.
+    """
+    tasks = [(seed, index) for index in range(count)]
+    if workers > 1 and count > 1:
+        pool = multiprocessing.Pool(workers)
+        try:
+            rendered = pool.map(render_image, tasks)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    else:
+        rendered = [render_image(task) for task in tasks]
+
+    storage = Picture._meta.get_field("image").storage
+    return [
+        (storage.save(f"uploads/picture/seed-{index}.jpg", ContentFile(content)), meta)
+        for index, (content, meta) in enumerate(rendered)
+    ]
+
+
+def seed_data(
+    users=10,
+    blogs=10000,
+    tags=1000,
+    pictures=10000,
+    slideshows=1000,
+    tags_per_blog=3,
+    pictures_per_blog=2,
+    pictures_per_slideshow=10,
+    images=0,
+    seed=0,
+    workers=1,
+    log=None,
+):
+    """Generate a large synthetic dataset with COPY
+
+    Rows are shared round robin among users, and each user's blogs and
+    slideshows link to that user's tags and pictures. Blogs carry on average
+    tags_per_blog tags, favouring a few popular ones, and pictures_per_blog
+    pictures. With images, that many distinct placeholder image files are
+    rendered and shared by the pictures. The same seed generates the same
+    content. Returns the number of rows created per table.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    now = timezone.now()
+    created = {}
+
+    def copy(name, model, columns, rows):
+        created[name] = 0
+
+        def counted():
+            for row in rows:
+                created[name] += 1
+                yield row
+
+        start = time.perf_counter()
+        copy_rows(model, columns, counted())
+        log(f"Copied {created[name]} {name} in {time.perf_counter() - start:.1f}s")
+
+    def words(low, high):
+        return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+    def updated_at():
+        return now - timedelta(seconds=rng.randrange(365 * 24 * 60 * 60))
+
+    start = time.perf_counter()
+    image_files = create_images(images, seed, workers)
+    if images:
+        log(f"Rendered {images} images in {time.perf_counter() - start:.1f}s")
+
+    user_ids = reserve_ids(User, users)
+    password = make_password(SEED_PASSWORD)
+    copy(
+        "users",
+        User,
+        (
+            "id",
+            "password",
+            "is_superuser",
+            "email",
+            "name",
+            "is_active",
+            "is_staff",
+            "token_generation",
+        ),
+        (
+            (pk, password, False, f"seed{seed}-{index}@example.com", words(2, 3))
+            + (True, False, 0)
+            for index, pk in enumerate(user_ids)
+        ),
+    )
+
+    tag_ids = reserve_ids(Tag, tags)
+    copy(
+        "tags",
+        Tag,
+        ("id", "name", "user_id", "usage_count", "updated_at"),
+        (
+            (pk, f"{rng.choice(WORDS).title()} {index}", user_ids[index % users])
+            + (0, updated_at())
+            for index, pk in enumerate(tag_ids)
+        ),
+    )
+
+    def picture_row(index, pk):
+        name, metadata = None, {}
+        if image_files:
+            name, metadata = image_files[rng.randrange(len(image_files))]
+        return (
+            pk,
+            words(2, 8).capitalize(),
+            user_ids[index % users],
+            name,
+            metadata.get("width"),
+            metadata.get("height"),
+            metadata.get("format", ""),
+            metadata.get("byte_size"),
+            metadata.get("dominant_color", ""),
+            metadata.get("placeholder", ""),
+            updated_at(),
+        )
+
+    picture_ids = reserve_ids(Picture, pictures)
+    copy(
+        "pictures",
+        Picture,
+        (
+            "id",
+            "caption",
+            "user_id",
+            "image",
+            "width",
+            "height",
+            "format",
+            "byte_size",
+            "dominant_color",
+            "placeholder",
+            "updated_at",
+        ),
+        (picture_row(index, pk) for index, pk in enumerate(picture_ids)),
+    )
+
+    blog_ids = reserve_ids(Blog, blogs)
+    copy(
+        "blogs",
+        Blog,
+        ("id", "title", "text", "user_id", "published", "updated_at"),
+        (
+            (pk, words(2, 8).capitalize(), words(50, 400), user_ids[index % users])
+            + (rng.random() < 0.7, updated_at())
+            for index, pk in enumerate(blog_ids)
+        ),
+    )
+
+    def blog_tags():
+        for index, pk in enumerate(blog_ids):
+            own = owned(tag_ids, users, index % users)
+            if not own:
+                continue
+            chosen = rng.choices(
+                own,
+                cum_weights=popularity(len(own)),
+                k=rng.randint(0, 2 * tags_per_blog),
+            )
+            for tag_id in dict.fromkeys(chosen):
+                yield pk, tag_id
+
+    def sampled(ids, mean):
+        """Yield (pk, related id) pairs, mean related rows per pk on average"""
+        for index, pk in enumerate(ids):
+            own = owned(picture_ids, users, index % users)
+            count = min(rng.randint(0, 2 * mean), len(own))
+            for picture_id in rng.sample(own, count):
+                yield pk, picture_id
+
+    copy("blog tags", Blog.tags.through, ("blog_id", "tag_id"), blog_tags())
+    copy(
+        "blog pictures",
+        Blog.pictures.through,
+        ("blog_id", "picture_id"),
+        sampled(blog_ids, pictures_per_blog),
+    )
+
+    slideshow_ids = reserve_ids(Slideshow, slideshows)
+    copy(
+        "slideshows",
+        Slideshow,
+        ("id", "title", "user_id", "published", "updated_at"),
+        (
+            (pk, words(1, 4).capitalize(), user_ids[index % users])
+            + (rng.random() < 0.7, updated_at())
+            for index, pk in enumerate(slideshow_ids)
+        ),
+    )
+
+    def memberships():
+        previous, position = None, 0
+        for pk, picture_id in sampled(slideshow_ids, pictures_per_slideshow):
+            position = position if pk == previous else 0
+            position += SlideshowPicture.POSITION_STEP
+            previous = pk
+            yield pk, picture_id, position
+
+    copy(
+        "slideshow pictures",
+        SlideshowPicture,
+        ("slideshow_id", "picture_id", "position"),
+        memberships(),
+    )
+
+    # Denormalized columns the signals would have kept up to date
+    start = time.perf_counter()
+    for batch in batches(tag_ids):
+        update_usage_counts(batch)
+    for batch in batches(blog_ids):
+        update_search_vectors(batch)
+    log(f"Updated counts and search vectors in {time.perf_counter() - start:.1f}s")
+    return created
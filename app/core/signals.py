@@ -0,0 +1,89 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import bump_generation
+from core.files import release_files
+from core.models import (
+    Blog,
+    Picture,
+    PictureRendition,
+    Project,
+    Slideshow,
+    Tag,
+)
+
+CACHED_MODELS = (Blog, Picture, Project, Slideshow, Tag)
+CACHED_RELATIONS = (
+    Blog.pictures.through,
+    Blog.tags.through,
+    Slideshow.pictures.through,
+)
+
+
+def touch(model, pks):
+    """Bump updated_at of the given objects without sending signals"""
+    if pks:
+        model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def _through_column(through, model):
+    """Return the column of an M2M through table pointing at model"""
+    for field in through._meta.get_fields():
+        if field.many_to_one and field.related_model is model:
+            return field.attname
+
+
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Invalidate the cached responses of the object's owner"""
+    bump_generation(instance.user_id)
+
+
+def invalidate_user_cache_on_m2m(sender, instance, action, model, pk_set, **kwargs):
+    """Mark both sides of a changed relation as modified and invalidate"""
+    if action == "pre_clear":
+        column = _through_column(sender, type(instance))
+        instance._cleared_pks = list(
+            sender.objects.filter(**{column: instance.pk}).values_list(
+                _through_column(sender, model), flat=True
+            )
+        )
+    elif action.startswith("post_"):
+        if action == "post_clear":
+            pk_set = getattr(instance, "_cleared_pks", ())
+        touch(type(instance), [instance.pk])
+        touch(model, pk_set)
+        bump_generation(instance.user_id)
+
+
+@receiver(pre_delete, sender=Picture)
+def touch_picture_containers(sender, instance, **kwargs):
+    """Mark blogs and slideshows as modified when one of their pictures goes"""
+    touch(Blog, list(instance.blog_set.values_list("id", flat=True)))
+    touch(Slideshow, list(instance.slideshow_set.values_list("id", flat=True)))
+
+
+@receiver(post_delete, sender=Picture)
+@receiver(post_delete, sender=PictureRendition)
+def release_image(sender, instance, **kwargs):
+    """Delete the image file of a deleted row unless another row shares it"""
+    release_files(instance.image.storage, [instance.image.name])
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_tagged_blogs(sender, instance, **kwargs):
+    """Mark blogs as modified when one of their tags goes"""
+    touch(Blog, list(instance.blog_set.values_list("id", flat=True)))
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_user_cache, sender=model)
+    post_delete.connect(invalidate_user_cache, sender=model)
+
+for through in CACHED_RELATIONS:
+    m2m_changed.connect(invalidate_user_cache_on_m2m, sender=through)
@@ -0,0 +1,152 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+from core.pagination import pagination_fields
+
+# Serializer classes built for ?fields= and ?expand= are cached up to this
+# many, as their combinations come from clients
+SPARSE_CACHE_SIZE = 256
+
+
+def _split(value):
+    return tuple(
+        dict.fromkeys(name.strip() for name in value.split(",") if name.strip())
+    )
+
+
+@lru_cache(maxsize=None)
+def field_names(serializer_class):
+    """Return the names of the fields of a serializer class"""
+    return tuple(serializer_class().fields)
+
+
+@lru_cache(maxsize=SPARSE_CACHE_SIZE)
+def sparse_serializer(serializer_class, fields=None, expand=()):
+    """Return a subclass of serializer_class with only fields, expand nested
+
+    fields is a sorted tuple of field names to keep, or None for all of
+    them, and the sorted tuple expand names relations to represent with the
+    serializer listed for them in ``expandable_fields`` instead of by id. The model relations nested
+    are listed in ``expanded_relations``. Classes are cached so the prefetch
+    plans and fast paths built per class are reused.
+    """
+    original = serializer_class().fields
+    names = [
+        name for name in original if fields is None or name in fields or name in expand
+    ]
+
+    attrs = {"expanded_relations": tuple(original[name].source for name in expand)}
+    for name in expand:
+        field = original[name]
+        kwargs = {
+            "many": isinstance(field, (ManyRelatedField, serializers.ListSerializer))
+        }
+        if field.source != name:
+            kwargs["source"] = field.source
+        attrs[name] = serializer_class.expandable_fields[name](read_only=True, **kwargs)
+
+    attrs["Meta"] = type("Meta", (serializer_class.Meta,), {"fields": tuple(names)})
+    return type(serializer_class.__name__, (serializer_class,), attrs)
+
+
+@lru_cache(maxsize=SPARSE_CACHE_SIZE)
+def sparse_columns(serializer_class):
+    """Return the model columns a serializer class reads, or None if unknown
+
+    Relations are loaded by prefetches and need no column of their own;
+    fields whose source is not a plain model field, such as properties,
+    may read any column so nothing can be left out for them.
+    """
+    model = serializer_class.Meta.model
+    columns = {model._meta.pk.attname}
+    for field in serializer_class().fields.values():
+        if field.write_only or isinstance(
+            field, (ManyRelatedField, serializers.ListSerializer)
+        ):
+            continue
+        if field.source == "*" or len(field.source_attrs) != 1:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            # Annotations are selected whatever the columns, properties not
+            if hasattr(model, field.source_attrs[0]):
+                return None
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            continue
+        if model_field.is_relation and not (
+            isinstance(field, RelatedField) and field.use_pk_only_optimization()
+        ):
+            return None
+        columns.add(model_field.attname)
+    return columns
+
+
+class SparseFieldsMixin:
+    """Let read requests pick fields with ``?fields=`` and nest with ``?expand=``
+
+    ``?fields=id,title`` leaves every other field out of the representation
+    and its column out of the query, and ``?expand=pictures,tags`` nests the
+    relations listed in the serializer's ``expandable_fields`` in full, with
+    matching prefetches. Writes always use the complete serializer.
+
+    Views pass the serializer class they would use through
+    ``get_sparse_serializer_class`` in their ``get_serializer_class``.
+    """
+
+    fields_param = "fields"
+    expand_param = "expand"
+
+    def get_sparse_serializer_class(self, serializer_class):
+        """Return serializer_class trimmed and expanded as the request asks"""
+        if self.request is None or self.request.method not in ("GET", "HEAD"):
+            return serializer_class
+
+        params = self.request.query_params
+        fields = params.get(self.fields_param)
+        expand = _split(params.get(self.expand_param, ""))
+        if fields is None and not expand:
+            return serializer_class
+
+        errors = {}
+        available = field_names(serializer_class)
+        if fields is not None:
+            fields = _split(fields)
+            unknown = [name for name in fields if name not in available]
+            if unknown:
+                errors[self.fields_param] = [f"Unknown fields: {', '.join(unknown)}."]
+        expandable = getattr(serializer_class, "expandable_fields", {})
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            errors[self.expand_param] = [f"Cannot expand: {', '.join(unknown)}."]
+        if errors:
+            raise ValidationError(errors)
+
+        # Sorted, every ordering of the same names shares one cached class
+        if fields is not None:
+            fields = tuple(sorted(fields))
+        return sparse_serializer(serializer_class, fields, tuple(sorted(expand)))
+
+    def filter_queryset(self, queryset):
+        """Load only the columns the requested fields read"""
+        queryset = super().filter_queryset(queryset)
+        if (
+            self.request is None
+            or self.request.method not in ("GET", "HEAD")
+            or self.fields_param not in self.request.query_params
+        ):
+            return queryset
+
+        columns = sparse_columns(self.get_serializer_class())
+        if columns is None:
+            return queryset
+        columns = columns | set(pagination_fields(self, queryset))
+        model_columns = {
+            field.attname for field in queryset.model._meta.concrete_fields
+        }
+        return queryset.only(*(columns & model_columns))
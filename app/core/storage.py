@@ -0,0 +1,104 @@
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+from django.db import connection
+from django.utils.deconstruct import deconstructible
+
+CONTENT_NAME_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_hash(content):
+    """Return the SHA-256 hex digest of a file, reading it in chunks"""
+    digest = getattr(content, "content_hash", None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+def content_digest(name):
+    """Return the digest a content addressed file name was made from, or None"""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return stem if CONTENT_NAME_RE.match(stem) else None
+
+
+def lock_file(name):
+    """Hold a lock on a stored file name until the transaction ends
+
+    Saving a name and releasing it both take the lock, so a file found on
+    disk by a save cannot be deleted before the row referring to it commits,
+    and a release never deletes a file a new row is about to refer to.
+    """
+    key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [key])
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage naming files after the SHA-256 of their content
+
+    Only the directory and extension of the name asked for are kept. Saving
+    content that is already stored writes nothing and returns the existing
+    name, so identical files share one copy on disk and a name always refers
+    to the same bytes. Files are saved under lock_file(), so the file and the
+    row referring to it must be saved in the same transaction.
+    """
+
+    def _save(self, name, content):
+        directory, basename = os.path.split(name)
+        ext = os.path.splitext(basename)[1].lower()
+        name = os.path.join(directory, f"{content_hash(content)}{ext}")
+        lock_file(name)
+        if self.exists(name):
+            return name
+
+        # Written under a private name first so that concurrent saves of the
+        # same content never expose a partial file
+        temp_name = super()._save(
+            os.path.join(directory, f".{uuid.uuid4().hex}.tmp"), content
+        )
+        os.replace(self.path(temp_name), self.path(name))
+        return name
+
+
+class HashingUploadHandlerMixin:
+    """Hash uploaded files as they stream in, saving a second read to hash"""
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # A memory handler that is not in use passes data on unread
+        if getattr(self, "activated", True):
+            self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(
+    HashingUploadHandlerMixin, MemoryFileUploadHandler
+):
+    """Keep small uploads in memory, hashing them on the way"""
+
+
+class HashingTemporaryFileUploadHandler(
+    HashingUploadHandlerMixin, TemporaryFileUploadHandler
+):
+    """Stream large uploads to a temporary file, hashing them on the way"""
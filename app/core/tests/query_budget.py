@@ -0,0 +1,29 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+
+class QueryBudgetMixin:
+    """TestCase mixin asserting an endpoint's query count stays constant"""
+
+    def assertConstantQueries(self, url, add_row, sizes=(1, 3, 6), params=None):
+        """Assert GET url runs the same number of queries at every size
+
+        add_row is called until the number of rows created so far reaches
+        each of the sizes in turn, and the endpoint is queried in between.
+        """
+        counts = []
+        created = 0
+        for size in sizes:
+            while created < size:
+                add_row(created)
+                created += 1
+
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            counts.append(len(queries))
+
+        self.assertEqual(
+            len(set(counts)), 1, f"Query count grew with row count: {counts}"
+        )
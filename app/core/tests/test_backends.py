@@ -0,0 +1,62 @@
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+from core.backends.pooled import base as pooled
+from core.backends.postgresql.base import DatabaseWrapper
+
+
+def backend_pid(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+class BackendTests(SimpleTestCase):
+    """Test the database backends"""
+
+    allow_database_queries = True
+
+    def settings_dict(self, **kwargs):
+        return {**connection.settings_dict, "CONN_HEALTH_CHECKS": True, **kwargs}
+
+    def pooled_wrapper(self, settings_dict):
+        self.addCleanup(self.close_pools)
+        return pooled.DatabaseWrapper(settings_dict, alias=DEFAULT_DB_ALIAS)
+
+    def close_pools(self):
+        while pooled._pools:
+            pooled._pools.popitem()[1].pool.closeall()
+
+    def test_health_check_replaces_dropped_connection(self):
+        """Test a persistent connection dropped by the server is replaced"""
+        wrapper = DatabaseWrapper(self.settings_dict(), alias=DEFAULT_DB_ALIAS)
+        self.addCleanup(wrapper.close)
+        pid = backend_pid(wrapper)
+        wrapper.close_if_unusable_or_obsolete()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+        self.assertNotEqual(backend_pid(wrapper), pid)
+
+    def test_pool_reuses_connections(self):
+        """Test closing a pooled connection hands it to the next one opened"""
+        wrapper = self.pooled_wrapper(self.settings_dict())
+        pid = backend_pid(wrapper)
+        wrapper.close()
+
+        self.assertEqual(backend_pid(wrapper), pid)
+        wrapper.close()
+
+    def test_pool_exhausted(self):
+        """Test opening a connection fails once the pool waited long enough"""
+        settings_dict = self.settings_dict(POOL={"MAX_SIZE": 1, "TIMEOUT": 0.01})
+        first = self.pooled_wrapper(settings_dict)
+        second = self.pooled_wrapper(settings_dict)
+        backend_pid(first)
+
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+        first.close()
+        backend_pid(second)
+        second.close()
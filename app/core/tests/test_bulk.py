@@ -0,0 +1,180 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Blog, Picture, Tag
+
+BLOG_BULK_URL = reverse("blog:blog-bulk")
+TAG_BULK_URL = reverse("blog:tag-bulk")
+PICTURE_BULK_URL = reverse("picture:picture-bulk")
+
+
+class BulkApiTests(TestCase):
+    """Test the bulk create, update and delete endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_blogs(self):
+        """Test creating blogs with their relations in one request"""
+        tag = Tag.objects.create(user=self.user, name="Music")
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+        payload = [
+            {"title": "REM", "text": "Athens", "tags": [tag.id], "pictures": []},
+            {
+                "title": "The Cure",
+                "text": "Crawley",
+                "tags": [tag.id],
+                "pictures": [picture.id],
+            },
+        ]
+
+        res = self.client.post(BLOG_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([r["status"] for r in res.data], [201, 201])
+        blog = Blog.objects.get(id=res.data[1]["data"]["id"])
+        self.assertEqual(blog.user, self.user)
+        self.assertEqual(list(blog.tags.all()), [tag])
+        self.assertEqual(list(blog.pictures.all()), [picture])
+        self.assertEqual(res.data[1]["data"]["pictures"], [picture.id])
+
+    def test_bulk_create_reports_invalid_items(self):
+        """Test invalid items are reported while valid ones are created"""
+        user2 = get_user_model().objects.create_user(
+            "other@andrewtdunn.com", "testpass"
+        )
+        other_tag = Tag.objects.create(user=user2, name="Private")
+        payload = [
+            {"title": "REM", "text": "Athens", "tags": [], "pictures": []},
+            {"title": "", "text": "Crawley", "tags": [], "pictures": []},
+            {
+                "title": "Pixies",
+                "text": "Boston",
+                "tags": [other_tag.id],
+                "pictures": [],
+            },
+        ]
+
+        res = self.client.post(BLOG_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r["status"] for r in res.data], [201, 400, 400])
+        self.assertIn("title", res.data[1]["errors"])
+        self.assertIn("tags", res.data[2]["errors"])
+        self.assertEqual(list(Blog.objects.values_list("title", flat=True)), ["REM"])
+
+    def test_bulk_create_constant_queries(self):
+        """Test the number of queries does not grow with the batch size"""
+        tags = [Tag.objects.create(user=self.user, name=f"Tag {i}") for i in range(6)]
+
+        def payload(size):
+            return [
+                {
+                    "title": f"Blog {i}",
+                    "text": "Text",
+                    "tags": [tag.id for tag in tags[: i + 1]],
+                    "pictures": [],
+                }
+                for i in range(size)
+            ]
+
+        counts = []
+        for size in (2, 6):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(BLOG_BULK_URL, payload(size), format="json")
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_create_indexes_blogs_for_search(self):
+        """Test blogs created in bulk can be searched"""
+        payload = [{"title": "Andy Warhol", "text": "Pop", "tags": [], "pictures": []}]
+        self.client.post(BLOG_BULK_URL, payload, format="json")
+
+        res = self.client.get(reverse("blog:blog-list"), {"search": "warhol"})
+
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_bulk_update_blogs(self):
+        """Test partially updating blogs identified by id"""
+        tag1 = Tag.objects.create(user=self.user, name="Music")
+        tag2 = Tag.objects.create(user=self.user, name="Art")
+        blog1 = Blog.objects.create(user=self.user, title="REM", text="Athens")
+        blog1.tags.add(tag1)
+        blog2 = Blog.objects.create(user=self.user, title="Cure", text="Crawley")
+        payload = [
+            {"id": blog1.id, "tags": [tag2.id]},
+            {"id": blog2.id, "title": "The Cure"},
+            {"id": 0, "title": "Missing"},
+        ]
+
+        res = self.client.patch(BLOG_BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r["status"] for r in res.data], [200, 200, 404])
+        blog1.refresh_from_db()
+        blog2.refresh_from_db()
+        self.assertEqual(list(blog1.tags.all()), [tag2])
+        self.assertEqual(blog1.title, "REM")
+        self.assertEqual(blog2.title, "The Cure")
+        self.assertEqual(blog2.text, "Crawley")
+
+    def test_bulk_update_limited_to_user(self):
+        """Test objects of other users cannot be updated"""
+        user2 = get_user_model().objects.create_user(
+            "other@andrewtdunn.com", "testpass"
+        )
+        tag = Tag.objects.create(user=user2, name="Private")
+
+        res = self.client.patch(
+            TAG_BULK_URL, [{"id": tag.id, "name": "Mine"}], format="json"
+        )
+
+        self.assertEqual(res.data[0]["status"], status.HTTP_404_NOT_FOUND)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "Private")
+
+    def test_bulk_delete_pictures(self):
+        """Test deleting pictures by id"""
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+
+        res = self.client.delete(PICTURE_BULK_URL, [picture.id, 0], format="json")
+
+        self.assertEqual([r["status"] for r in res.data], [204, 404])
+        self.assertFalse(Picture.objects.filter(id=picture.id).exists())
+
+    def test_bulk_delete_invalid_ids(self):
+        """Test ids that are not integers are rejected per item"""
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+        items = [{"id": picture.id}, True, "1", picture.id]
+
+        res = self.client.delete(PICTURE_BULK_URL, items, format="json")
+
+        self.assertEqual([r["status"] for r in res.data], [400, 400, 400, 204])
+        self.assertIn("id", res.data[0]["errors"])
+
+    def test_bulk_create_tags_invalidates_cache(self):
+        """Test bulk writes invalidate the user's cached lists"""
+        tags_url = reverse("blog:tag-list")
+        self.client.get(tags_url)
+
+        self.client.post(TAG_BULK_URL, [{"name": "Music"}], format="json")
+        res = self.client.get(tags_url)
+
+        self.assertEqual([tag["name"] for tag in res.data["results"]], ["Music"])
+
+    def test_bulk_requires_list(self):
+        """Test a bulk request body must be a list"""
+        res = self.client.post(TAG_BULK_URL, {"name": "Music"}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
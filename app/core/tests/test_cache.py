@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.cache import bump_generation, get_generation
+from core.models import Blog, Picture, Slideshow, Tag
+
+BLOG_URL = reverse("blog:blog-list")
+SLIDESHOWS_URL = reverse("picture:slideshow-list")
+
+
+class ResponseCacheTests(TestCase):
+    """Test the per-user versioned response cache"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bump_generation(self):
+        """Test bumping a user's generation changes it"""
+        generation = get_generation(self.user.id)
+        bump_generation(self.user.id)
+
+        self.assertNotEqual(get_generation(self.user.id), generation)
+
+    def test_repeated_list_served_from_cache(self):
+        """Test a repeated GET only runs the validator aggregate query"""
+        Blog.objects.create(user=self.user, title="REM")
+        res1 = self.client.get(BLOG_URL)
+
+        with self.assertNumQueries(1):
+            res2 = self.client.get(BLOG_URL)
+
+        self.assertEqual(res1.data, res2.data)
+
+    def test_query_params_cached_separately(self):
+        """Test different query params do not share a cache entry"""
+        Blog.objects.create(user=self.user, title="REM")
+        Blog.objects.create(user=self.user, title="Andy Warhol")
+        self.client.get(BLOG_URL)
+
+        res = self.client.get(BLOG_URL, {"search": "warhol"})
+
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_save_invalidates_cache(self):
+        """Test saving an object invalidates the owner's cached lists"""
+        blog = Blog.objects.create(user=self.user, title="REM")
+        self.client.get(BLOG_URL)
+        blog.title = "The Cure"
+        blog.save()
+
+        res = self.client.get(BLOG_URL)
+
+        self.assertEqual(res.data["results"][0]["title"], "The Cure")
+
+    def test_m2m_change_invalidates_cache(self):
+        """Test changing a relation invalidates the owner's cached lists"""
+        blog = Blog.objects.create(user=self.user, title="REM")
+        tag = Tag.objects.create(user=self.user, name="Music")
+        self.client.get(BLOG_URL)
+        blog.tags.add(tag)
+
+        res = self.client.get(BLOG_URL)
+
+        self.assertEqual(res.data["results"][0]["tags"], [tag.id])
+
+    def test_delete_invalidates_cache(self):
+        """Test deleting an object invalidates the owner's cached lists"""
+        slideshow = Slideshow.objects.create(user=self.user, title="Travel")
+        self.client.get(SLIDESHOWS_URL)
+        slideshow.delete()
+
+        res = self.client.get(SLIDESHOWS_URL)
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_cache_limited_to_user(self):
+        """Test cached responses are not shared between users"""
+        Picture.objects.create(user=self.user, caption="Portrait")
+        url = reverse("picture:picture-list")
+        self.client.get(url)
+        user2 = get_user_model().objects.create_user(
+            "other@andrewtdunn.com", "testpass"
+        )
+        self.client.force_authenticate(user2)
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.data["results"], [])
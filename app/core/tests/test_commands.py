@@ -1,22 +1,164 @@
-from unittest.mock import patch
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import MagicMock, patch
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
 from django.db.utils import OperationalError
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from core.jobs import enqueue
+from core.models import Blog, Job, Picture, Slideshow, Tag
 
 
 class CommandTests(TestCase):
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is available"""
         with patch("django.db.utils.ConnectionHandler.__getitem__") as gi:
-            gi.return_value = True
-            call_command("wait_for_db")
+            gi.return_value = MagicMock()
+            call_command("wait_for_db", stdout=StringIO())
             self.assertEqual(gi.call_count, 1)
+            gi.return_value.cursor().__enter__().execute.assert_called_with("SELECT 1")
 
     @patch("time.sleep", return_value=True)
     def test_wait_for_db(self, ts):
         """Test waiting for db"""
         with patch("django.db.utils.ConnectionHandler.__getitem__") as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command("wait_for_db")
+            gi.return_value.cursor.side_effect = [OperationalError] * 5 + [MagicMock()]
+            call_command("wait_for_db", stdout=StringIO())
             self.assertEqual(gi.call_count, 6)
+            delays = [call[0][0] for call in ts.call_args_list]
+            self.assertEqual(len(delays), 5)
+            self.assertTrue(all(0 < delay <= 5 for delay in delays))
+            self.assertLess(delays[0], delays[-1])
+
+    @patch("time.sleep", return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """Test waiting for db gives up after the timeout"""
+        with patch("django.db.utils.ConnectionHandler.__getitem__") as gi:
+            gi.return_value.cursor.side_effect = OperationalError
+            with patch("time.monotonic", side_effect=[0, 1, 2, 100]):
+                with self.assertRaises(CommandError):
+                    call_command("wait_for_db", timeout=10, stdout=StringIO())
+            self.assertEqual(ts.call_count, 2)
+
+    @patch("core.management.commands.run_worker.close_old_connections")
+    def test_run_worker_once(self, coc):
+        """Test the worker drains the queue and exits with --once"""
+        job = enqueue("core.tests.test_jobs.record", value="worker")
+
+        call_command("run_worker", once=True, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+
+    def test_reconcile_tag_usage(self):
+        """Test drifted tag usage counts are recomputed"""
+        user = get_user_model().objects.create_user("test@andrewtdunn.com", "pass")
+        tag = Tag.objects.create(user=user, name="Music")
+        Blog.objects.create(user=user, title="REM").tags.add(tag)
+        Tag.objects.filter(pk=tag.pk).update(usage_count=7)
+        out = StringIO()
+
+        call_command("reconcile_tag_usage", stdout=out)
+
+        tag.refresh_from_db()
+        self.assertEqual(tag.usage_count, 1)
+        self.assertIn("Corrected 1", out.getvalue())
+
+    def test_backfill_picture_metadata(self):
+        """Test metadata is extracted for pictures uploaded without it"""
+        user = get_user_model().objects.create_user("test@andrewtdunn.com", "pass")
+        with tempfile.TemporaryDirectory() as media_root:
+            os.makedirs(os.path.join(media_root, "uploads"))
+            Image.new("RGB", (40, 30), "green").save(
+                os.path.join(media_root, "uploads", "old.jpg")
+            )
+            picture = Picture.objects.create(
+                user=user, caption="Old", image="uploads/old.jpg"
+            )
+            Picture.objects.create(user=user, caption="Gone", image="uploads/gone.jpg")
+            out, err = StringIO(), StringIO()
+
+            with override_settings(MEDIA_ROOT=media_root):
+                call_command("backfill_picture_metadata", stdout=out, stderr=err)
+
+        picture.refresh_from_db()
+        self.assertEqual((picture.width, picture.height), (40, 30))
+        self.assertEqual(picture.format, "jpeg")
+        self.assertIn("Updated 1 pictures, 1 failed", out.getvalue())
+
+    def test_seed_data(self):
+        """Test seeding generates linked rows, the same for the same seed"""
+        options = {"users": 2, "blogs": 20, "tags": 6, "pictures": 10}
+        options.update(slideshows=3, images=2, workers=2, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as media_root:
+            with override_settings(MEDIA_ROOT=media_root):
+                with transaction.atomic():
+                    call_command("seed_data", seed=3, **options)
+                    first = list(
+                        Blog.objects.order_by("id").values_list("title", "text")
+                    )
+                    transaction.set_rollback(True)
+                call_command("seed_data", seed=3, **options)
+            images = os.listdir(os.path.join(media_root, "uploads", "picture"))
+
+        self.assertEqual(
+            list(Blog.objects.order_by("id").values_list("title", "text")), first
+        )
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Picture.objects.count(), 10)
+        self.assertEqual(len(images), 2)
+        for blog in Blog.objects.prefetch_related("tags", "pictures"):
+            self.assertIsNotNone(blog.search_vector)
+            for related in list(blog.tags.all()) + list(blog.pictures.all()):
+                self.assertEqual(related.user_id, blog.user_id)
+        tag = Tag.objects.order_by("-usage_count").first()
+        self.assertEqual(tag.usage_count, tag.blog_set.count())
+        picture = Picture.objects.first()
+        self.assertIn(
+            picture.image.name, [f"uploads/picture/{name}" for name in images]
+        )
+        self.assertEqual(picture.format, "jpeg")
+        self.assertTrue(Slideshow.objects.filter(memberships__isnull=False).exists())
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    def test_benchmark_api(self):
+        """Test the API benchmark writes results and removes its dataset"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            call_command(
+                "benchmark_api",
+                rows=5,
+                requests=4,
+                concurrency=2,
+                scenario=["blogs", "me"],
+                output=output,
+                stdout=StringIO(),
+            )
+            out = StringIO()
+            call_command(
+                "benchmark_api",
+                rows=5,
+                requests=4,
+                concurrency=2,
+                scenario=["blogs"],
+                compare=output,
+                stdout=out,
+            )
+            with open(output) as results_file:
+                results = json.load(results_file)
+
+        self.assertEqual(set(results["scenarios"]), {"blogs", "me"})
+        blogs = results["scenarios"]["blogs"]
+        self.assertEqual((blogs["requests"], blogs["errors"]), (4, 0))
+        self.assertGreater(blogs["queries"], 0)
+        self.assertLessEqual(blogs["latency_ms"]["p50"], blogs["latency_ms"]["p99"])
+        self.assertIn("blogs       latency p95", out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
@@ -0,0 +1,95 @@
+import gzip
+import json
+from unittest.mock import Mock, patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core.cache import get_cache
+from core.compression import CompressionMiddleware, choose_encoding
+
+CONTENT = json.dumps([{"id": i, "title": f"Blog {i}"} for i in range(100)]).encode()
+
+
+def json_response(content=CONTENT, etag=None):
+    response = HttpResponse(content, content_type="application/json")
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test compressing responses"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.factory = RequestFactory()
+
+    def get(self, response, accept_encoding="gzip, deflate"):
+        """Pass response through the middleware for a GET request"""
+        middleware = CompressionMiddleware(lambda request: response)
+        request = self.factory.get("/api/blog/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return middleware(request)
+
+    def test_gzip_response(self):
+        """Test a large JSON response is gzip'd for clients accepting it"""
+        res = self.get(json_response())
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), CONTENT)
+        self.assertEqual(res["Content-Length"], str(len(res.content)))
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+        self.assertRegex(res["Server-Timing"], r'^compress;dur=[\d.]+;desc="gzip"$')
+
+    def test_small_response_not_compressed(self):
+        """Test bodies under the size threshold are sent as they are"""
+        res = self.get(json_response(b"[]"))
+
+        self.assertFalse(res.has_header("Content-Encoding"))
+        self.assertEqual(res.content, b"[]")
+
+    def test_encoding_not_accepted(self):
+        """Test clients not accepting a supported coding get the plain body"""
+        res = self.get(json_response(), accept_encoding="gzip;q=0, identity")
+
+        self.assertFalse(res.has_header("Content-Encoding"))
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+
+    def test_compressed_body_cached_by_etag(self):
+        """Test a response with an ETag is compressed once"""
+        with patch("core.compression.gzip_compress", return_value=b"gz") as compress:
+            self.get(json_response(etag='"abc"'))
+            res = self.get(json_response(etag='"abc"'))
+
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(res.content, b"gz")
+        self.assertEqual(res["ETag"], 'W/"abc"')
+        self.assertEqual(res["Server-Timing"], 'compress;desc="gzip cached"')
+
+    def test_changed_body_under_same_etag_recompressed(self):
+        """Test a body changed to the same length is not served from the cache"""
+        edited = CONTENT.replace(b"Blog 1", b"Blog X", 1)
+        self.get(json_response(etag='"abc"'))
+        res = self.get(json_response(edited, etag='"abc"'))
+
+        self.assertEqual(len(edited), len(CONTENT))
+        self.assertEqual(gzip.decompress(res.content), edited)
+        self.assertRegex(res["Server-Timing"], r'^compress;dur=[\d.]+;desc="gzip"$')
+
+    def test_brotli_preferred(self):
+        """Test brotli is used when installed and accepted"""
+        brotli = Mock()
+        brotli.compress.return_value = b"br"
+        with patch("core.compression.brotli", brotli):
+            res = self.get(json_response(), accept_encoding="gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "br")
+        self.assertEqual(res.content, b"br")
+
+    def test_choose_encoding(self):
+        """Test codings are chosen by the client's q values"""
+        with patch("core.compression.brotli", Mock()):
+            self.assertEqual(choose_encoding("br;q=0.5, gzip"), "gzip")
+            self.assertEqual(choose_encoding("*"), "br")
+            self.assertIsNone(choose_encoding("deflate"))
+            self.assertIsNone(choose_encoding(""))
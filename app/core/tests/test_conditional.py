@@ -0,0 +1,148 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Blog, Picture, Slideshow, Tag
+
+BLOG_URL = reverse("blog:blog-list")
+SLIDESHOWS_URL = reverse("picture:slideshow-list")
+
+
+def blog_detail_url(blog_id):
+    return reverse("blog:blog-detail", args=[blog_id])
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETag handling of the API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_sets_validators(self):
+        """Test list responses carry an ETag but no Last-Modified"""
+        Blog.objects.create(user=self.user, title="REM")
+
+        res = self.client.get(BLOG_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", res)
+        self.assertNotIn("Last-Modified", res)
+
+    def test_if_none_match_not_modified(self):
+        """Test a matching If-None-Match returns 304 with one query"""
+        Blog.objects.create(user=self.user, title="REM")
+        etag = self.client.get(BLOG_URL)["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(BLOG_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_if_modified_since_after_delete(self):
+        """Test If-Modified-Since cannot hide a deleted row"""
+        Slideshow.objects.create(user=self.user, title="Travel")
+        slideshow = Slideshow.objects.create(user=self.user, title="Work")
+        self.client.get(SLIDESHOWS_URL)
+        slideshow.delete()
+
+        res = self.client.get(
+            SLIDESHOWS_URL, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_etag_changes_on_update(self):
+        """Test updating a row changes the list ETag"""
+        blog = Blog.objects.create(user=self.user, title="REM")
+        etag = self.client.get(BLOG_URL)["ETag"]
+        blog.title = "The Cure"
+        blog.save()
+
+        res = self.client.get(BLOG_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_etag_changes_on_delete(self):
+        """Test deleting a row changes the list ETag"""
+        Blog.objects.create(user=self.user, title="REM")
+        blog = Blog.objects.create(user=self.user, title="The Cure")
+        etag = self.client.get(BLOG_URL)["ETag"]
+        blog.delete()
+
+        res = self.client.get(BLOG_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_etag_changes_on_m2m_change(self):
+        """Test adding a tag changes the list ETag"""
+        blog = Blog.objects.create(user=self.user, title="REM")
+        tag = Tag.objects.create(user=self.user, name="Music")
+        etag = self.client.get(BLOG_URL)["ETag"]
+        tag.blog_set.add(blog)
+
+        res = self.client.get(BLOG_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_etag_follows_nested_pictures(self):
+        """Test editing a nested picture changes the blog detail ETag"""
+        blog = Blog.objects.create(user=self.user, title="REM")
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+        blog.pictures.add(picture)
+        url = blog_detail_url(blog.id)
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        picture.caption = "Crowd"
+        picture.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["pictures"][0]["caption"], "Crowd")
+
+    def test_expanded_list_etag_follows_nested_pictures(self):
+        """Test editing a picture nested with ?expand= changes the list ETag"""
+        blog = Blog.objects.create(user=self.user, title="REM")
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+        blog.pictures.add(picture)
+        params = {"expand": "pictures,tags"}
+        etag = self.client.get(BLOG_URL, params)["ETag"]
+        self.assertEqual(
+            self.client.get(BLOG_URL, params, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        picture.caption = "Crowd"
+        picture.save()
+
+        res = self.client.get(BLOG_URL, params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["pictures"][0]["caption"], "Crowd")
+
+    def test_detail_etag_follows_deleted_picture(self):
+        """Test deleting a picture changes the detail ETag of its blogs"""
+        blog = Blog.objects.create(user=self.user, title="REM")
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+        blog.pictures.add(picture)
+        url = blog_detail_url(blog.id)
+        etag = self.client.get(url)["ETag"]
+        picture.delete()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
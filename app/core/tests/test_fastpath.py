@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from blog.search import BlogSearchFilter, update_search_vectors
+from blog.serializers import BlogDetailSerializer, BlogSerializer, TagSerializer
+from core.fastpath import compile_for_queryset, compile_serializer
+from core.models import Blog, Picture, PictureRendition, Tag
+from picture.serializers import PictureSerializer, SlideshowSerializer
+
+
+class FastPathTests(TestCase):
+    """Test the compiled read path matches the serializers it replaces"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.request = APIRequestFactory().get("/api/")
+        self.pictures = [
+            Picture.objects.create(
+                user=self.user, caption=f"Stage {index}", image=f"uploads/{index}.jpg"
+            )
+            for index in range(3)
+        ]
+        Picture.objects.create(user=self.user, caption="Empty")
+        PictureRendition.objects.create(
+            picture=self.pictures[0],
+            width=320,
+            height=240,
+            format="webp",
+            image="uploads/0-320w.webp",
+        )
+        self.tags = [
+            Tag.objects.create(user=self.user, name=name) for name in ("Rock", "Pop")
+        ]
+        # One of each per blog, as related managers list rows in no set order
+        for index, title in enumerate(("REM", "Blur")):
+            blog = Blog.objects.create(user=self.user, title=title, text="Out of time")
+            blog.tags.add(self.tags[index])
+            blog.pictures.add(self.pictures[index])
+        Blog.objects.create(user=self.user, title="Pulp")
+
+    def assertMatchesSerializer(self, serializer_class, queryset):
+        """Assert the fast path represents queryset like the serializer"""
+        compiled = compile_for_queryset(serializer_class, queryset)
+        context = {"request": self.request}
+        expected = serializer_class(queryset, many=True, context=context).data
+
+        self.assertIsNotNone(compiled)
+        self.assertEqual(compiled.serialize(compiled.rows(queryset), context), expected)
+
+    def test_blogs(self):
+        """Test blogs with many to many ids match"""
+        self.assertMatchesSerializer(BlogSerializer, Blog.objects.order_by("id"))
+
+    def test_blog_search_annotations(self):
+        """Test annotated search snippets are read from the rows"""
+        update_search_vectors(Blog.objects.values_list("id", flat=True))
+        request = APIRequestFactory().get("/api/", {"search": "time"})
+        request.query_params = request.GET
+        queryset = BlogSearchFilter().filter_queryset(request, Blog.objects, None)
+
+        self.assertMatchesSerializer(BlogSerializer, queryset)
+
+    def test_pictures(self):
+        """Test pictures with image URLs and nested renditions match"""
+        self.assertMatchesSerializer(PictureSerializer, Picture.objects.order_by("id"))
+
+    def test_nested_many_to_many(self):
+        """Test nested many to many serializers match"""
+        self.assertMatchesSerializer(BlogDetailSerializer, Blog.objects.order_by("id"))
+
+    def test_tags(self):
+        """Test a serializer of plain columns matches"""
+        self.assertMatchesSerializer(TagSerializer, Tag.objects.order_by("id"))
+
+    def test_query_count(self):
+        """Test each relation is read with one query for the whole list"""
+        compiled = compile_serializer(PictureSerializer)
+
+        with self.assertNumQueries(2):
+            compiled.serialize(compiled.rows(Picture.objects.all()))
+
+    def test_unsupported_serializers(self):
+        """Test serializers the fast path cannot represent are not compiled"""
+        self.assertIsNone(compile_serializer(SlideshowSerializer))
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+CALLS = []
+
+
+def record(value):
+    """Task appending its argument to CALLS"""
+    CALLS.append(value)
+
+
+def explode():
+    """Task that always fails"""
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        """Test a queued job is run with its arguments"""
+        job = jobs.enqueue(record, value="hello")
+
+        self.assertEqual(job.task, "core.tests.test_jobs.record")
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(CALLS, ["hello"])
+
+    def test_jobs_run_in_order(self):
+        """Test jobs are claimed oldest first"""
+        for value in range(3):
+            jobs.enqueue(record, value=value)
+
+        jobs.run_pending()
+
+        self.assertEqual(CALLS, [0, 1, 2])
+
+    def test_delayed_job_not_claimed(self):
+        """Test a job is not run before its run_at"""
+        jobs.enqueue(record, delay=60, value="later")
+
+        self.assertIsNone(jobs.claim_job())
+
+    def test_queues_are_separate(self):
+        """Test a worker only claims jobs from its own queue"""
+        jobs.enqueue(record, queue="images", value="image")
+
+        self.assertIsNone(jobs.claim_job("default"))
+        self.assertIsNotNone(jobs.claim_job("images"))
+
+    @override_settings(JOB_BACKOFF_BASE=10)
+    def test_failed_job_retried_with_backoff(self):
+        """Test a failing job is rescheduled with its error recorded"""
+        job = jobs.enqueue(explode)
+        before = timezone.now()
+
+        jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=5))
+
+    def test_backoff_grows(self):
+        """Test the retry delay grows with the number of attempts"""
+        self.assertLess(jobs.backoff(1), jobs.backoff(4))
+
+    def test_job_fails_after_max_attempts(self):
+        """Test a job is marked failed once it runs out of attempts"""
+        job = jobs.enqueue(explode, max_attempts=2)
+        for _ in range(2):
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            jobs.run_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_lease_reclaimed(self):
+        """Test a job whose worker died is claimed again after its lease"""
+        job = jobs.enqueue(record, value="retry")
+        jobs.claim_job()
+        self.assertIsNone(jobs.claim_job())
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        claimed = jobs.claim_job()
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_expired_lease_on_last_attempt_fails(self):
+        """Test a job whose worker died on its last attempt is not reclaimed"""
+        job = jobs.enqueue(record, max_attempts=1, value="crash")
+        other = jobs.enqueue(record, value="next")
+        jobs.claim_job()
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now() - timedelta(hours=1))
+        claimed = jobs.claim_job()
+
+        self.assertEqual(claimed.pk, other.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("Lease expired", job.last_error)
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Blog, Picture
+
+IMAGE_NAME = "uploads/picture/sample.jpg"
+CONTENT = bytes(range(256)) * 4
+
+
+def media_url(name):
+    """Return the URL of a media file"""
+    return reverse("media", args=[name])
+
+
+class MediaViewTests(TestCase):
+    """Test serving media files"""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root.name, MEDIA_OFFLOAD=""
+        )
+        self.settings_override.enable()
+        path = os.path.join(self.media_root.name, IMAGE_NAME)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as image_file:
+            image_file.write(CONTENT)
+        self.mtime = os.stat(path).st_mtime
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.picture = Picture.objects.create(
+            user=self.user, caption="Stage", image=IMAGE_NAME
+        )
+        blog = Blog.objects.create(user=self.user, title="REM", published=True)
+        blog.pictures.add(self.picture)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def test_serve_public_file(self):
+        """Test a picture in published content is served to anyone"""
+        res = self.client.get(media_url(IMAGE_NAME))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertIn("public", res["Cache-Control"])
+
+    def test_private_file_owner_only(self):
+        """Test an unpublished picture is only served to its owner"""
+        Blog.objects.update(published=False)
+
+        res = self.client.get(media_url(IMAGE_NAME))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(self.user)
+        res = self.client.get(media_url(IMAGE_NAME))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Cache-Control"], "private")
+
+    def test_shared_file_served_to_every_owner(self):
+        """Test a file shared by identical uploads is served to each owner"""
+        other = get_user_model().objects.create_user("other@andrewtdunn.com")
+        Picture.objects.create(user=other, caption="Copy", image=IMAGE_NAME)
+        Blog.objects.update(published=False)
+
+        for user in (self.user, other):
+            self.client.force_authenticate(user)
+            res = self.client.get(media_url(IMAGE_NAME))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res["Cache-Control"], "private")
+
+        self.client.force_authenticate(None)
+        res = self.client.get(media_url(IMAGE_NAME))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_shared_file_public_if_any_picture_published(self):
+        """Test a shared file is public when any picture using it is published"""
+        other = get_user_model().objects.create_user("other@andrewtdunn.com")
+        Picture.objects.create(user=other, caption="Copy", image=IMAGE_NAME)
+
+        self.client.force_authenticate(other)
+        res = self.client.get(media_url(IMAGE_NAME))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("public", res["Cache-Control"])
+
+    def test_unknown_file_not_found(self):
+        """Test files not belonging to a picture are not served"""
+        res = self.client.get(media_url("../../etc/passwd"))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.get(media_url("uploads/picture/missing.jpg"))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_byte_range(self):
+        """Test a byte range is served as partial content"""
+        res = self.client.get(media_url(IMAGE_NAME), HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[10:20])
+        self.assertEqual(res["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+        self.assertEqual(res["Content-Length"], "10")
+
+    def test_suffix_byte_range(self):
+        """Test a suffix range is served from the end of the file"""
+        res = self.client.get(media_url(IMAGE_NAME), HTTP_RANGE="bytes=-5")
+
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        """Test a range past the end of the file is rejected"""
+        res = self.client.get(
+            media_url(IMAGE_NAME), HTTP_RANGE=f"bytes={len(CONTENT)}-"
+        )
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_if_modified_since(self):
+        """Test an unchanged file is answered with 304"""
+        res = self.client.get(
+            media_url(IMAGE_NAME), HTTP_IF_MODIFIED_SINCE=http_date(self.mtime + 1)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_offload_x_accel_redirect(self):
+        """Test the transfer can be handed to nginx"""
+        with override_settings(
+            MEDIA_OFFLOAD="x-accel-redirect", MEDIA_ACCEL_PREFIX="/protected/"
+        ):
+            res = self.client.get(media_url(IMAGE_NAME))
+
+        self.assertEqual(res["X-Accel-Redirect"], f"/protected/{IMAGE_NAME}")
+        self.assertEqual(res.content, b"")
+
+    def test_offload_x_sendfile(self):
+        """Test the transfer can be handed to the server by file path"""
+        with override_settings(MEDIA_OFFLOAD="x-sendfile"):
+            res = self.client.get(media_url(IMAGE_NAME))
+
+        self.assertEqual(
+            res["X-Sendfile"], os.path.join(self.media_root.name, IMAGE_NAME)
+        )
+
+    def test_content_addressed_file_immutable(self):
+        """Test a file named by its content hash is cached for good"""
+        digest = hashlib.sha256(CONTENT).hexdigest()
+        name = f"uploads/picture/{digest}.jpg"
+        with open(os.path.join(self.media_root.name, name), "wb") as image_file:
+            image_file.write(CONTENT)
+        Picture.objects.filter(pk=self.picture.pk).update(image=name)
+
+        res = self.client.get(media_url(name))
+        cached = self.client.get(media_url(name), HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res["ETag"], f'"{digest}"')
+        self.assertEqual(res["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core import metrics
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsTests(TestCase):
+    """Test recording and exposing request metrics"""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self, **extra):
+        extra.setdefault("HTTP_AUTHORIZATION", "Bearer secret")
+        res = self.client.get("/metrics", **extra)
+        return res, res.content.decode()
+
+    def test_requests_recorded_per_view(self):
+        """Test latency, queries and sizes are aggregated by view and method"""
+        self.client.get("/api/blog/tags/")
+        self.client.get("/api/blog/tags/")
+        self.client.get("/api/no-such-page/")
+
+        res, text = self.scrape()
+
+        self.assertEqual(res["Content-Type"], metrics.CONTENT_TYPE)
+        labels = 'view="blog:tag-list",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 2', text)
+        self.assertIn(f"http_request_duration_seconds_count{{{labels}}} 2", text)
+        self.assertIn(
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', text
+        )
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="0.0"}} 0', text)
+        self.assertIn(f"http_response_size_bytes_count{{{labels}}} 2", text)
+        self.assertIn(
+            'http_requests_total{view="unmatched",method="GET",status="404"} 1', text
+        )
+        self.assertNotIn('view="metrics"', text)
+
+    def test_threads_aggregated(self):
+        """Test requests recorded by other threads are collected"""
+        thread = threading.Thread(
+            target=metrics.record,
+            args=("blog:blog-list", "GET", "200", 0.2, 3, 0.01, 900),
+        )
+        thread.start()
+        thread.join()
+        metrics.record("blog:blog-list", "GET", "200", 0.02, 1, 0.005, 100)
+
+        series = metrics.collect()[("blog:blog-list", "GET")]
+
+        self.assertEqual(series["statuses"], {"200": 2})
+        self.assertAlmostEqual(series["duration"][0], 0.22)
+        self.assertEqual(series["queries"][0], 4)
+        self.assertAlmostEqual(series["query_time"], 0.015)
+
+    def test_processes_aggregated(self):
+        """Test the aggregates flushed by other processes are collected"""
+        metrics.record("user:me", "GET", "200", 0.01, 2, 0.001, 300)
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            with override_settings(METRICS_DIR=metrics_dir):
+                metrics.flush()
+                with open(os.path.join(metrics_dir, "metrics-1.json"), "w") as other:
+                    json.dump(metrics.local_series(), other)
+                files = set(os.listdir(metrics_dir))
+
+                series = metrics.collect()[("user:me", "GET")]
+
+        self.assertEqual(files, {"metrics-1.json", f"metrics-{os.getpid()}.json"})
+        self.assertEqual(series["statuses"], {"200": 2})
+        self.assertEqual(series["queries"][0], 4)
+
+    def test_exited_threads_folded(self):
+        """Test the shards of exited threads are folded into one total"""
+        for _ in range(3):
+            thread = threading.Thread(
+                target=metrics.record,
+                args=("blog:blog-list", "GET", "200", 0.1, 1, 0.01, 100),
+            )
+            thread.start()
+            thread.join()
+
+        series = metrics.collect()[("blog:blog-list", "GET")]
+
+        self.assertEqual(series["statuses"], {"200": 3})
+        self.assertFalse(
+            [thread for thread, _ in metrics._shards if not thread.is_alive()]
+        )
+        self.assertEqual(metrics.collect()[("blog:blog-list", "GET")], series)
+
+    def test_token_required(self):
+        """Test scrapes must send the configured bearer token"""
+        res, _ = self.scrape(HTTP_AUTHORIZATION="")
+        self.assertEqual(res.status_code, 401)
+
+        res, _ = self.scrape()
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_token_required_outside_debug(self):
+        """Test metrics are only served without a token when DEBUG is on"""
+        res, _ = self.scrape()
+        self.assertEqual(res.status_code, 401)
+
+        with override_settings(DEBUG=True):
+            res, _ = self.scrape()
+        self.assertEqual(res.status_code, 200)
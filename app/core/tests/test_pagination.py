@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Blog, Tag
+
+BLOG_URL = reverse("blog:blog-list")
+TAGS_URL = reverse("blog:tag-list")
+
+
+class KeysetPaginationTests(TestCase):
+    """Test cursor pagination of the list endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_walk_pages_forward_and_back(self):
+        """Test following next and previous links through every page"""
+        blogs = [
+            Blog.objects.create(user=self.user, title=f"Blog {i}") for i in range(5)
+        ]
+        expected = [blog.id for blog in reversed(blogs)]
+
+        res = self.client.get(BLOG_URL, {"page_size": 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data["previous"])
+
+        seen = [blog["id"] for blog in res.data["results"]]
+        pages = [res.data]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            seen += [blog["id"] for blog in res.data["results"]]
+            pages.append(res.data)
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+
+        res = self.client.get(pages[2]["previous"])
+        self.assertEqual(res.data["results"], pages[1]["results"])
+        res = self.client.get(res.data["previous"])
+        self.assertEqual(res.data["results"], pages[0]["results"])
+        self.assertIsNone(res.data["previous"])
+
+    def test_ties_on_ordering_key_are_stable(self):
+        """Test rows sharing an ordering key are neither skipped nor repeated"""
+        for name in ["Art", "Music", "Music", "Music", "Zen"]:
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAGS_URL, {"page_size": 2})
+        seen = [tag["id"] for tag in res.data["results"]]
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            seen += [tag["id"] for tag in res.data["results"]]
+
+        expected = Tag.objects.order_by("-name", "-id").values_list("id", flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        res = self.client.get(BLOG_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+
+from blog.serializers import BlogDetailSerializer, BlogSerializer, TagSerializer
+from core.prefetch import plan_prefetches
+from picture.serializers import SlideshowSerializer
+
+
+class PrefetchPlannerTests(SimpleTestCase):
+    def test_plan_primary_key_relations(self):
+        """Test many-to-many primary key fields are prefetched"""
+        select_related, prefetch_related = plan_prefetches(BlogSerializer())
+
+        self.assertEqual(select_related, ())
+        self.assertEqual(set(prefetch_related), {"pictures", "tags"})
+
+    def test_plan_nested_serializers(self):
+        """Test nested many serializers are prefetched recursively"""
+        select_related, prefetch_related = plan_prefetches(BlogDetailSerializer())
+
+        self.assertEqual(select_related, ())
+        self.assertEqual(
+            set(prefetch_related), {"pictures", "pictures__renditions", "tags"}
+        )
+
+    def test_plan_scalar_serializer(self):
+        """Test a serializer without relations needs no prefetches"""
+        self.assertEqual(plan_prefetches(TagSerializer()), ((), ()))
+
+    def test_plan_slideshow(self):
+        """Test slideshow memberships are prefetched"""
+        _, prefetch_related = plan_prefetches(SlideshowSerializer())
+
+        self.assertEqual(prefetch_related, ("memberships",))
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from core.files import release_file
+from core.models import Picture
+from core.storage import ContentAddressedStorage, content_digest
+
+CONTENT = b"portrait"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Test storing files under the hash of their content"""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        self.settings_override.enable()
+        self.storage = ContentAddressedStorage()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def test_save_names_file_by_content(self):
+        """Test a saved file is named after its hash, keeping the extension"""
+        name = self.storage.save("uploads/picture/Portrait.JPG", ContentFile(CONTENT))
+
+        self.assertEqual(name, f"uploads/picture/{DIGEST}.jpg")
+        self.assertEqual(content_digest(name), DIGEST)
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), CONTENT)
+
+    def test_identical_content_stored_once(self):
+        """Test saving identical content reuses the stored file"""
+        name1 = self.storage.save("uploads/picture/a.jpg", ContentFile(CONTENT))
+        mtime = os.stat(self.storage.path(name1)).st_mtime_ns
+        name2 = self.storage.save("uploads/picture/b.jpg", ContentFile(CONTENT))
+
+        self.assertEqual(name1, name2)
+        self.assertEqual(os.stat(self.storage.path(name2)).st_mtime_ns, mtime)
+        self.assertEqual(
+            os.listdir(self.storage.path("uploads/picture")), [f"{DIGEST}.jpg"]
+        )
+
+    def test_release_file_keeps_shared_file(self):
+        """Test a file is only deleted with its last reference"""
+        name = self.storage.save("uploads/picture/a.jpg", ContentFile(CONTENT))
+        user = get_user_model().objects.create_user("test@andrewtdunn.com", "pass")
+        picture1 = Picture.objects.create(user=user, caption="One", image=name)
+        Picture.objects.create(user=user, caption="Two", image=name)
+
+        picture1.delete()
+        release_file(self.storage, name)
+        self.assertTrue(self.storage.exists(name))
+
+        Picture.objects.all().delete()
+        release_file(self.storage, name)
+        self.assertFalse(self.storage.exists(name))
+
+
+class ReleaseRaceTests(TransactionTestCase):
+    """Test releasing a file while identical content is being saved"""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        self.settings_override.enable()
+        self.storage = ContentAddressedStorage()
+        self.user = get_user_model().objects.create_user("test@andrewtdunn.com")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def test_release_waits_for_concurrent_save(self):
+        """Test a file reused by an uncommitted save is not released"""
+        name = self.storage.save("uploads/old.jpg", ContentFile(CONTENT))
+        saved = threading.Event()
+
+        def upload():
+            try:
+                with transaction.atomic():
+                    self.storage.save("uploads/new.jpg", ContentFile(CONTENT))
+                    saved.set()
+                    # The release runs now, before the new row commits
+                    time.sleep(0.2)
+                    Picture.objects.create(user=self.user, caption="New", image=name)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=upload)
+        thread.start()
+        saved.wait()
+        release_file(self.storage, name)
+        thread.join()
+
+        self.assertTrue(self.storage.exists(name))
@@ -0,0 +1,182 @@
+import gzip
+import json
+import multiprocessing
+import os
+from functools import reduce
+from io import BytesIO
+from itertools import islice
+from operator import or_
+
+from django.db import connections
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Tag
+from core.prefetch import prefetch_for_serializer
+from feed.views import (
+    PublicBlogViewSet,
+    PublicProjectViewSet,
+    PublicSlideshowViewSet,
+)
+
+SNAPSHOTS = {
+    "blogs": PublicBlogViewSet,
+    "projects": PublicProjectViewSet,
+    "slideshows": PublicSlideshowViewSet,
+}
+
+MANIFEST = "manifest.json"
+
+
+def _write_atomic(path, data):
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(data)
+    os.replace(temp_path, path)
+
+
+def write_file(path, content):
+    """Atomically write content to path along with a gzip'd copy at path.gz"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    buffer = BytesIO()
+    # A fixed mtime keeps the compressed bytes identical for identical content
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9, mtime=0) as gz:
+        gz.write(content)
+
+    _write_atomic(path, content)
+    _write_atomic(f"{path}.gz", buffer.getvalue())
+
+
+def remove_file(path):
+    """Remove a snapshot file and its gzip'd copy if they exist"""
+    for target in (path, f"{path}.gz"):
+        try:
+            os.remove(target)
+        except FileNotFoundError:
+            pass
+
+
+def object_path(output, name, pk):
+    return os.path.join(output, name, f"{pk}.json")
+
+
+def published(name):
+    """Return the published objects of a snapshot type"""
+    return SNAPSHOTS[name].queryset.filter(published=True)
+
+
+def changed_ids(name, since):
+    """Return the ids of published objects changed after since
+
+    An object counts as changed if it or any relation it nests was modified,
+    using the same relations as the feed's conditional GET validators.
+    """
+    viewset = SNAPSHOTS[name]
+    lookups = ["updated_at"] + [
+        f"{relation}__updated_at" for relation in viewset.conditional_related
+    ]
+    changed = reduce(or_, (Q(**{f"{lookup}__gt": since}) for lookup in lookups))
+    return set(published(name).filter(changed).values_list("pk", flat=True))
+
+
+def render_objects(name, ids, output):
+    """Render the published objects with ids to JSON files; return the count"""
+    viewset = SNAPSHOTS[name]
+    queryset = prefetch_for_serializer(
+        published(name).filter(pk__in=ids), viewset.serializer_class
+    )
+    renderer = JSONRenderer()
+    count = 0
+    for obj in queryset:
+        data = viewset.serializer_class(obj).data
+        write_file(object_path(output, name, obj.pk), renderer.render(data))
+        count += 1
+    return count
+
+
+def _render_task(task):
+    return render_objects(*task)
+
+
+def render_indexes(output):
+    """Render the index of every snapshot type and the tag index"""
+    renderer = JSONRenderer()
+    for name, viewset in SNAPSHOTS.items():
+        rows = (
+            published(name)
+            .order_by(viewset.ordering, "-id")
+            .values("id", "title", "updated_at")
+        )
+        write_file(os.path.join(output, name, "index.json"), renderer.render(rows))
+
+    tags = (
+        Tag.objects.filter(blog__published=True)
+        .annotate(blog_count=Count("blog"))
+        .order_by("name", "id")
+        .values("id", "name", "blog_count")
+    )
+    write_file(os.path.join(output, "tags", "index.json"), renderer.render(tags))
+
+
+def load_manifest(output):
+    """Return the manifest of the previous export to output, if any"""
+    try:
+        with open(os.path.join(output, MANIFEST)) as manifest_file:
+            return json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def export_snapshot(output, workers=1, full=False, chunk_size=200):
+    """Render published content to static JSON files under output
+
+    Unless full is set, only objects changed since the previous export are
+    rendered again and the files of objects no longer published are removed.
+    Objects are rendered in chunks by a pool of worker processes when
+    workers is more than one. Returns (rendered, removed) counts.
+    """
+    manifest = None if full else load_manifest(output)
+    since = parse_datetime(manifest["started_at"]) if manifest else None
+    started_at = timezone.now()
+
+    tasks, objects, removed = [], {}, 0
+    for name in SNAPSHOTS:
+        current = set(published(name).values_list("pk", flat=True))
+        previous = set(manifest["objects"].get(name, [])) if manifest else set()
+        objects[name] = sorted(current)
+
+        for pk in previous - current:
+            remove_file(object_path(output, name, pk))
+            removed += 1
+
+        ids = current if since is None else changed_ids(name, since)
+        ids = iter(sorted(ids | (current - previous)))
+        for chunk in iter(lambda: list(islice(ids, chunk_size)), []):
+            tasks.append((name, chunk, output))
+
+    if workers > 1 and len(tasks) > 1:
+        # Forked workers must open their own connections, not share ours
+        connections.close_all()
+        pool = multiprocessing.Pool(workers)
+        try:
+            rendered = sum(pool.imap_unordered(_render_task, tasks))
+            # Idle workers are let go rather than terminated, as a worker
+            # killed while waiting for a task can leave the queue lock held
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    else:
+        rendered = sum(_render_task(task) for task in tasks)
+
+    render_indexes(output)
+    manifest = {"started_at": started_at.isoformat(), "objects": objects}
+    os.makedirs(output, exist_ok=True)
+    _write_atomic(
+        os.path.join(output, MANIFEST), json.dumps(manifest, sort_keys=True).encode()
+    )
+    return rendered, removed
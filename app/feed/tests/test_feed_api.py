@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Blog, Picture, Project, Tag
+from core.tests.query_budget import QueryBudgetMixin
+from picture.tests.test_slideshows_api import sample_slideshow
+
+BLOGS_URL = reverse("feed:blog-list")
+PROJECTS_URL = reverse("feed:project-list")
+SLIDESHOWS_URL = reverse("feed:slideshow-list")
+
+
+def blog_url(blog_id):
+    """Return public blog detail URL"""
+    return reverse("feed:blog-detail", args=[blog_id])
+
+
+class PublicFeedApiTests(QueryBudgetMixin, TestCase):
+    """Test the anonymous read-only feed of published content"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+
+    def test_list_published_blogs(self):
+        """Test only published blogs are listed, without authentication"""
+        blog = Blog.objects.create(user=self.user, title="REM", published=True)
+        Blog.objects.create(user=self.user, title="Draft")
+
+        res = self.client.get(BLOGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([b["id"] for b in res.data["results"]], [blog.id])
+
+    def test_unpublished_blog_not_found(self):
+        """Test an unpublished blog cannot be read"""
+        blog = Blog.objects.create(user=self.user, title="Draft")
+
+        res = self.client.get(blog_url(blog.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_feed_is_read_only(self):
+        """Test the feed does not accept writes"""
+        res = self.client.post(BLOGS_URL, {"title": "Spam"})
+
+        self.assertIn(
+            res.status_code,
+            (status.HTTP_403_FORBIDDEN, status.HTTP_405_METHOD_NOT_ALLOWED),
+        )
+        self.assertFalse(Blog.objects.exists())
+
+    def test_cache_headers(self):
+        """Test responses are cacheable by shared caches"""
+        Blog.objects.create(user=self.user, title="REM", published=True)
+
+        res = self.client.get(BLOGS_URL)
+
+        cache_control = res["Cache-Control"]
+        self.assertIn("public", cache_control)
+        self.assertIn("s-maxage=", cache_control)
+        self.assertIn("Accept", res["Vary"])
+        self.assertIn("ETag", res)
+
+    def test_surrogate_keys(self):
+        """Test responses name every object they include"""
+        blog = Blog.objects.create(user=self.user, title="REM", published=True)
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+        tag = Tag.objects.create(user=self.user, name="Music")
+        blog.pictures.add(picture)
+        blog.tags.add(tag)
+
+        list_keys = self.client.get(BLOGS_URL)["Surrogate-Key"].split()
+        detail_keys = self.client.get(blog_url(blog.id))["Surrogate-Key"].split()
+
+        expected = {f"blog-{blog.id}", f"picture-{picture.id}", f"tag-{tag.id}"}
+        self.assertEqual(set(list_keys), expected | {"blog-list"})
+        self.assertEqual(set(detail_keys), expected)
+
+    def test_conditional_get(self):
+        """Test a proxy can revalidate with the ETag"""
+        Blog.objects.create(user=self.user, title="REM", published=True)
+        etag = self.client.get(BLOGS_URL)["ETag"]
+
+        res = self.client.get(BLOGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn("public", res["Cache-Control"])
+
+    def test_published_projects_with_slideshow(self):
+        """Test published projects include their slideshow pictures"""
+        slideshow = sample_slideshow(user=self.user)
+        project = Project.objects.create(
+            user=self.user, title="Google", slideshow=slideshow, published=True
+        )
+
+        res = self.client.get(PROJECTS_URL)
+
+        self.assertEqual(res.data["results"][0]["id"], project.id)
+        self.assertEqual(len(res.data["results"][0]["slideshow"]["pictures"]), 2)
+        keys = res["Surrogate-Key"].split()
+        self.assertIn(f"slideshow-{slideshow.id}", keys)
+
+    def test_list_published_slideshows_query_count_constant(self):
+        """Test listing public slideshows runs a fixed number of queries"""
+
+        def add_slideshow(i):
+            slideshow = sample_slideshow(user=self.user, title=f"Show {i}")
+            slideshow.published = True
+            slideshow.save()
+
+        self.assertConstantQueries(SLIDESHOWS_URL, add_slideshow)
@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from core.models import Blog, Picture, Tag
+from feed.snapshot import export_snapshot
+
+
+class SnapshotTestMixin:
+    def setUp(self):
+        self.output = tempfile.TemporaryDirectory()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+
+    def tearDown(self):
+        self.output.cleanup()
+
+    def read(self, *path):
+        with open(os.path.join(self.output.name, *path), "rb") as snapshot:
+            return json.loads(snapshot.read())
+
+
+class ExportSnapshotTests(SnapshotTestMixin, TestCase):
+    """Test exporting published content to static JSON files"""
+
+    def test_export_published_blogs(self):
+        """Test published blogs are rendered with gzip'd copies"""
+        tag = Tag.objects.create(user=self.user, name="Music")
+        blog = Blog.objects.create(user=self.user, title="REM", published=True)
+        blog.tags.add(tag)
+        draft = Blog.objects.create(user=self.user, title="Draft")
+
+        rendered, _ = export_snapshot(self.output.name)
+
+        self.assertEqual(rendered, 1)
+        data = self.read("blogs", f"{blog.id}.json")
+        self.assertEqual(data["title"], "REM")
+        self.assertEqual(data["tags"][0]["name"], "Music")
+        path = os.path.join(self.output.name, "blogs", f"{blog.id}.json")
+        with gzip.open(f"{path}.gz") as compressed, open(path, "rb") as plain:
+            self.assertEqual(compressed.read(), plain.read())
+        self.assertFalse(
+            os.path.exists(os.path.join(self.output.name, "blogs", f"{draft.id}.json"))
+        )
+        self.assertEqual(
+            [row["id"] for row in self.read("blogs", "index.json")], [blog.id]
+        )
+        self.assertEqual(self.read("tags", "index.json")[0]["blog_count"], 1)
+
+    def test_incremental_export(self):
+        """Test only changed objects are rendered again"""
+        blog1 = Blog.objects.create(user=self.user, title="REM", published=True)
+        Blog.objects.create(user=self.user, title="Cure", published=True)
+        export_snapshot(self.output.name)
+        blog1.title = "R.E.M."
+        blog1.save()
+
+        rendered, removed = export_snapshot(self.output.name)
+
+        self.assertEqual((rendered, removed), (1, 0))
+        self.assertEqual(self.read("blogs", f"{blog1.id}.json")["title"], "R.E.M.")
+
+    def test_incremental_export_nested_change(self):
+        """Test a change to a nested picture re-renders its blog"""
+        blog = Blog.objects.create(user=self.user, title="REM", published=True)
+        picture = Picture.objects.create(user=self.user, caption="Stage")
+        blog.pictures.add(picture)
+        export_snapshot(self.output.name)
+        picture.caption = "Backstage"
+        picture.save()
+
+        rendered, _ = export_snapshot(self.output.name)
+
+        self.assertEqual(rendered, 1)
+        data = self.read("blogs", f"{blog.id}.json")
+        self.assertEqual(data["pictures"][0]["caption"], "Backstage")
+
+    def test_unpublished_objects_removed(self):
+        """Test objects no longer published are removed from the snapshot"""
+        blog = Blog.objects.create(user=self.user, title="REM", published=True)
+        export_snapshot(self.output.name)
+        blog.published = False
+        blog.save()
+
+        rendered, removed = export_snapshot(self.output.name)
+
+        self.assertEqual((rendered, removed), (0, 1))
+        path = os.path.join(self.output.name, "blogs", f"{blog.id}.json")
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(f"{path}.gz"))
+
+    def test_command(self):
+        """Test the export_snapshot command"""
+        Blog.objects.create(user=self.user, title="REM", published=True)
+        out = StringIO()
+
+        call_command("export_snapshot", output=self.output.name, workers=1, stdout=out)
+
+        self.assertIn("Rendered 1 objects", out.getvalue())
+
+
+class ParallelExportSnapshotTests(SnapshotTestMixin, TransactionTestCase):
+    """Test exporting with a pool of worker processes"""
+
+    def test_export_with_workers(self):
+        """Test objects are rendered by worker processes"""
+        blogs = [
+            Blog.objects.create(user=self.user, title=f"Blog {i}", published=True)
+            for i in range(5)
+        ]
+
+        rendered, _ = export_snapshot(self.output.name, workers=2, chunk_size=2)
+
+        self.assertEqual(rendered, 5)
+        for blog in blogs:
+            self.assertEqual(self.read("blogs", f"{blog.id}.json")["id"], blog.id)
@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from feed import views
+
+router = DefaultRouter()
+router.register("blogs", views.PublicBlogViewSet)
+router.register("projects", views.PublicProjectViewSet)
+router.register("slideshows", views.PublicSlideshowViewSet)
+
+app_name = "feed"
+
+urlpatterns = [path("", include(router.urls))]
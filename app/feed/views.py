@@ -0,0 +1,82 @@
+from rest_framework import viewsets
+from rest_framework.permissions import AllowAny
+
+from blog.serializers import BlogDetailSerializer
+from core.conditional import ConditionalResponseMixin
+from core.models import Blog, Project, Slideshow
+from core.pagination import KeysetPagination
+from core.prefetch import prefetch_for_serializer
+from core.public import PublicCacheMixin
+from picture.serializers import SlideshowDetailSerializer
+from portfolio.serializers import ProjectDetailSerializer
+
+
+def slideshow_surrogate_keys(slideshow):
+    """Return the surrogate keys of a slideshow and its pictures"""
+    return [f"slideshow-{slideshow.pk}"] + [
+        f"picture-{membership.picture_id}" for membership in slideshow.memberships.all()
+    ]
+
+
+class BasePublicViewSet(
+    PublicCacheMixin, ConditionalResponseMixin, viewsets.ReadOnlyModelViewSet
+):
+    """Base viewset for published content readable without authentication"""
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        """Return published objects"""
+        queryset = prefetch_for_serializer(self.queryset, self.get_serializer_class())
+        return queryset.filter(published=True).order_by(self.ordering)
+
+
+class PublicBlogViewSet(BasePublicViewSet):
+    """Read published blogs"""
+
+    queryset = Blog.objects.all()
+    serializer_class = BlogDetailSerializer
+    ordering = "-id"
+    conditional_related = ("pictures", "tags")
+    conditional_list_related = conditional_related
+    surrogate_key = "blog"
+
+    def get_surrogate_keys(self, obj):
+        return (
+            super().get_surrogate_keys(obj)
+            + [f"picture-{picture.pk}" for picture in obj.pictures.all()]
+            + [f"tag-{tag.pk}" for tag in obj.tags.all()]
+        )
+
+
+class PublicProjectViewSet(BasePublicViewSet):
+    """Read published projects with their slideshows"""
+
+    queryset = Project.objects.all()
+    serializer_class = ProjectDetailSerializer
+    ordering = "-id"
+    conditional_related = ("slideshow", "slideshow__pictures")
+    conditional_list_related = conditional_related
+    surrogate_key = "project"
+
+    def get_surrogate_keys(self, obj):
+        keys = super().get_surrogate_keys(obj)
+        if obj.slideshow is not None:
+            keys += slideshow_surrogate_keys(obj.slideshow)
+        return keys
+
+
+class PublicSlideshowViewSet(BasePublicViewSet):
+    """Read published slideshows"""
+
+    queryset = Slideshow.objects.all()
+    serializer_class = SlideshowDetailSerializer
+    ordering = "-title"
+    conditional_related = ("pictures",)
+    conditional_list_related = conditional_related
+    surrogate_key = "slideshow"
+
+    def get_surrogate_keys(self, obj):
+        return slideshow_surrogate_keys(obj)
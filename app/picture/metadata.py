@@ -0,0 +1,92 @@
+import base64
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image, ImageFilter
+
+from core.models import Picture
+
+METADATA_FIELDS = (
+    "width",
+    "height",
+    "format",
+    "byte_size",
+    "dominant_color",
+    "placeholder",
+)
+
+# Largest side of the copy the color and placeholder are taken from
+SAMPLE_SIZE = 64
+
+
+def dominant_color(image):
+    """Return the most common color of a small RGB image as #rrggbb"""
+    quantized = image.quantize(colors=8)
+    _, index = max(quantized.getcolors())
+    palette = quantized.getpalette()
+    red, green, blue = (palette[index * 3 + channel] for channel in range(3))
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def placeholder(image):
+    """Return a tiny blurred JPEG of a small RGB image as a data URI"""
+    size = settings.PICTURE_PLACEHOLDER_SIZE
+    tiny = image.copy()
+    tiny.thumbnail((size, size), Image.LANCZOS)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+
+    buffer = BytesIO()
+    tiny.save(buffer, "JPEG", quality=50, optimize=True)
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return f"data:image/jpeg;base64,{encoded}"
+
+
+def image_metadata(image_file):
+    """Return the metadata of an open image file, decoding it at low resolution
+
+    JPEGs are decoded straight at a fraction of their size, so the cost
+    hardly depends on the resolution of the original.
+    """
+    image = Image.open(image_file)
+    width, height = image.size
+    image_format = image.format
+    image.draft("RGB", (SAMPLE_SIZE, SAMPLE_SIZE))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.LANCZOS)
+
+    return {
+        "width": width,
+        "height": height,
+        "format": image_format.lower(),
+        "dominant_color": dominant_color(image),
+        "placeholder": placeholder(image),
+    }
+
+
+def update_metadata(picture):
+    """Store the metadata of a picture's image on the picture
+
+    A picture sharing the same content addressed image already holds the
+    same metadata, which is then copied instead of opening the image.
+    """
+    if not picture.image:
+        values = {
+            name: Picture._meta.get_field(name).get_default()
+            for name in METADATA_FIELDS
+        }
+    else:
+        values = (
+            Picture.objects.filter(image=picture.image.name, width__isnull=False)
+            .exclude(pk=picture.pk)
+            .values(*METADATA_FIELDS)
+            .first()
+        )
+        if values is None:
+            with picture.image.open("rb") as image_file:
+                values = image_metadata(image_file)
+            values["byte_size"] = picture.image.size
+
+    for name, value in values.items():
+        setattr(picture, name, value)
+    picture.save(update_fields=METADATA_FIELDS + ("updated_at",))
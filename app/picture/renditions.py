@@ -0,0 +1,113 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image
+
+from core.models import PictureRendition
+
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+
+def rendition_name(image_name, width, image_format):
+    """Return the storage name of a rendition next to the original image"""
+    stem, _ = os.path.splitext(image_name)
+    return f"{stem}-{width}w.{FORMAT_EXTENSIONS[image_format]}"
+
+
+def render(image, width, image_format):
+    """Return the bytes of image resized to width in image_format"""
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.LANCZOS)
+    if image_format == "JPEG" and resized.mode != "RGB":
+        resized = resized.convert("RGB")
+
+    buffer = BytesIO()
+    resized.save(
+        buffer, image_format, quality=settings.PICTURE_RENDITION_QUALITY, optimize=True
+    )
+    return height, buffer.getvalue()
+
+
+def copy_renditions(picture):
+    """Give a picture the renditions of another picture with the same image
+
+    Identical uploads share one content addressed file, so the renditions
+    already made for it are reused instead of being rendered again.
+    """
+    source = (
+        PictureRendition.objects.filter(picture__image=picture.image.name)
+        .exclude(picture=picture)
+        .values_list("picture_id", flat=True)
+        .first()
+    )
+    if source is None:
+        return []
+    return PictureRendition.objects.bulk_create(
+        PictureRendition(
+            picture=picture,
+            width=rendition.width,
+            height=rendition.height,
+            format=rendition.format,
+            image=rendition.image.name,
+        )
+        for rendition in PictureRendition.objects.filter(picture_id=source)
+    )
+
+
+def generate_renditions(picture):
+    """Replace the renditions of a picture with ones made from its image
+
+    One rendition is made for every configured width smaller than the
+    original, in each configured format, unless a picture with the same
+    image already has renditions to copy.
+    """
+    delete_renditions(picture)
+    if not picture.image:
+        return []
+
+    copied = copy_renditions(picture)
+    if copied:
+        return copied
+
+    storage = picture.image.storage
+    with picture.image.open("rb") as image_file:
+        image = Image.open(image_file)
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    rendered = [
+        (width, image_format, *render(image, width, image_format))
+        for width in settings.PICTURE_RENDITION_WIDTHS
+        if width < image.width
+        for image_format in settings.PICTURE_RENDITION_FORMATS
+    ]
+
+    # Files and the rows referring to them are saved together, see lock_file()
+    with transaction.atomic():
+        renditions = [
+            PictureRendition(
+                picture=picture,
+                width=width,
+                height=height,
+                format=image_format.lower(),
+                image=storage.save(
+                    rendition_name(picture.image.name, width, image_format),
+                    ContentFile(content),
+                ),
+            )
+            for width, image_format, height, content in rendered
+        ]
+        return PictureRendition.objects.bulk_create(renditions)
+
+
+def delete_renditions(picture):
+    """Delete the renditions of a picture
+
+    Their files are released by the post_delete signal once no other
+    rendition shares them.
+    """
+    picture.renditions.all().delete()
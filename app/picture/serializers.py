@@ -1,42 +1,134 @@
+from django.conf import settings
 from rest_framework import serializers
 
-from core.models import Picture, Slideshow
+from core.models import (
+    Picture,
+    PictureRendition,
+    PictureUpload,
+    Slideshow,
+    SlideshowPicture,
+)
+from picture.metadata import METADATA_FIELDS
+from picture.slideshows import set_pictures
+
+
+class PictureRenditionSerializer(serializers.ModelSerializer):
+    """Serializer for a resized copy of a picture image"""
+
+    class Meta:
+        model = PictureRendition
+        fields = ("width", "height", "format", "image")
+        read_only_fields = fields
 
 
 class PictureSerializer(serializers.ModelSerializer):
     """Serializer for a picture object"""
 
+    renditions = PictureRenditionSerializer(many=True, read_only=True)
+
     class Meta:
         model = Picture
-        fields = ("id", "caption", "image")
+        fields = ("id", "caption", "image") + METADATA_FIELDS + ("renditions",)
         read_only_fields = ("id",)
 
 
 class PictureImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading image to Picture"""
 
+    renditions = PictureRenditionSerializer(many=True, read_only=True)
+
     class Meta:
         model = Picture
-        fields = ("id", "image")
+        fields = ("id", "image") + METADATA_FIELDS + ("renditions",)
         read_only_fields = ("id",)
 
 
 class PictureDetailSerializer(serializers.ModelSerializer):
     """Serializer for a single picture object"""
 
+    renditions = PictureRenditionSerializer(many=True, read_only=True)
+
     class Meta:
         model = Picture
-        fields = ("id", "caption", "image")
+        fields = ("id", "caption", "image") + METADATA_FIELDS + ("renditions",)
         read_only_fields = ("id",)
 
 
+class PictureUploadSerializer(serializers.ModelSerializer):
+    """Serializer for resumable chunked picture uploads"""
+
+    checksum = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$", help_text="Hex SHA-256 digest of the whole file"
+    )
+
+    class Meta:
+        model = PictureUpload
+        fields = ("id", "filename", "size", "checksum", "offset", "created_at")
+        read_only_fields = ("id", "offset", "created_at")
+
+    def validate_size(self, value):
+        """Check the upload size is within the configured limit"""
+        if not 0 < value <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_SIZE}"
+            )
+        return value
+
+
+class MembershipPictureField(serializers.PrimaryKeyRelatedField):
+    """Primary key of a picture, read from its slideshow membership"""
+
+    def to_representation(self, value):
+        return value.picture_id
+
+
 class SlideshowSerializer(serializers.ModelSerializer):
     """Serializer for a slideshow object"""
 
-    pictures = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=Picture.objects.all()
+    pictures = MembershipPictureField(
+        many=True, source="memberships", queryset=Picture.objects.all()
     )
 
     class Meta:
         model = Slideshow
-        fields = ("id", "title", "pictures")
+        fields = ("id", "title", "pictures", "published")
+
+    def create(self, validated_data):
+        pictures = validated_data.pop("memberships", [])
+        slideshow = super().create(validated_data)
+        set_pictures(slideshow, [picture.id for picture in pictures])
+        return slideshow
+
+    def update(self, instance, validated_data):
+        pictures = validated_data.pop("memberships", None)
+        slideshow = super().update(instance, validated_data)
+        if pictures is not None:
+            set_pictures(slideshow, [picture.id for picture in pictures])
+        return slideshow
+
+
+class SlideshowPictureSerializer(serializers.ModelSerializer):
+    """Serializer for a picture at its place in a slideshow"""
+
+    picture = PictureSerializer(read_only=True)
+
+    class Meta:
+        model = SlideshowPicture
+        fields = ("picture",)
+
+    def to_representation(self, instance):
+        return super().to_representation(instance)["picture"]
+
+
+class SlideshowDetailSerializer(SlideshowSerializer):
+    """Serialize a slideshow with its pictures in order"""
+
+    pictures = SlideshowPictureSerializer(
+        many=True, read_only=True, source="memberships"
+    )
+
+
+class SlideshowReorderSerializer(serializers.Serializer):
+    """Serializer for the new order of a slideshow's pictures"""
+
+    pictures = serializers.ListField(child=serializers.IntegerField())
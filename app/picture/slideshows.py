@@ -0,0 +1,155 @@
+from bisect import bisect_left
+
+from django.db import transaction
+
+from core.bulk import bulk_update
+from core.cache import bump_generation
+from core.models import Picture, Slideshow, SlideshowPicture
+from core.signals import touch
+
+STEP = SlideshowPicture.POSITION_STEP
+
+
+def _increasing_subsequence(values):
+    """Return the indexes of a longest strictly increasing subsequence"""
+    tails, tail_indexes, previous = [], [], [None] * len(values)
+    for index, value in enumerate(values):
+        slot = bisect_left(tails, value)
+        if slot == len(tails):
+            tails.append(value)
+            tail_indexes.append(index)
+        else:
+            tails[slot] = value
+            tail_indexes[slot] = index
+        previous[index] = tail_indexes[slot - 1] if slot else None
+
+    indexes = []
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        indexes.append(index)
+        index = previous[index]
+    return indexes[::-1]
+
+
+def plan_positions(positions):
+    """Return new positions for rows listed in their wanted order
+
+    positions are the current positions of the rows, in the order they should
+    end up in. The longest run already in order keeps its positions and only
+    the remaining rows are given positions between their neighbours. When a
+    gap is too small every row is spaced out again.
+    """
+    keep = set(_increasing_subsequence(positions))
+    planned = list(positions)
+    index = 0
+    while index < len(positions):
+        if index in keep:
+            index += 1
+            continue
+        end = index
+        while end < len(positions) and end not in keep:
+            end += 1
+
+        low = planned[index - 1] if index else None
+        high = positions[end] if end < len(positions) else None
+        count = end - index
+        if low is None and high is None:
+            new = [STEP * (offset + 1) for offset in range(count)]
+        elif high is None:
+            new = [low + STEP * (offset + 1) for offset in range(count)]
+        elif low is None:
+            new = [high - STEP * (count - offset) for offset in range(count)]
+        elif high - low > count:
+            new = [
+                low + (high - low) * (offset + 1) // (count + 1)
+                for offset in range(count)
+            ]
+        else:
+            return [STEP * (offset + 1) for offset in range(len(positions))]
+
+        planned[index:end] = new
+        index = end
+    return planned
+
+
+def _write_order(memberships, picture_ids):
+    """Move memberships into the order of picture_ids; return the moved rows"""
+    by_picture = {membership.picture_id: membership for membership in memberships}
+    ordered = [by_picture[picture_id] for picture_id in picture_ids]
+    planned = plan_positions([membership.position for membership in ordered])
+
+    moved = []
+    for membership, position in zip(ordered, planned):
+        if membership.position != position:
+            membership.position = position
+            moved.append(membership)
+    bulk_update(SlideshowPicture, moved, ["position"])
+    return moved
+
+
+def _lock(slideshow):
+    """Serialize writers to the memberships of a slideshow"""
+    list(Slideshow.objects.select_for_update().filter(pk=slideshow.pk).values("pk"))
+
+
+def _changed(slideshow, picture_ids=()):
+    touch(Slideshow, [slideshow.pk])
+    touch(Picture, picture_ids)
+    bump_generation(slideshow.user_id)
+
+
+def set_pictures(slideshow, picture_ids):
+    """Make picture_ids, in order, the pictures of a slideshow
+
+    Memberships that stay are kept and only moved if out of order, so
+    resubmitting the same list writes nothing.
+    """
+    picture_ids = list(dict.fromkeys(picture_ids))
+    with transaction.atomic():
+        _lock(slideshow)
+        memberships = list(slideshow.memberships.all())
+        current = {membership.picture_id for membership in memberships}
+        removed = current - set(picture_ids)
+        added = [picture_id for picture_id in picture_ids if picture_id not in current]
+
+        if removed:
+            slideshow.memberships.filter(picture_id__in=removed).delete()
+        # New pictures start past the end and are then moved into place
+        last = max((m.position for m in memberships), default=0)
+        memberships = [m for m in memberships if m.picture_id not in removed]
+        memberships += SlideshowPicture.objects.bulk_create(
+            SlideshowPicture(
+                slideshow=slideshow,
+                picture_id=picture_id,
+                position=last + STEP * (offset + 1),
+            )
+            for offset, picture_id in enumerate(added)
+        )
+        moved = _write_order(memberships, picture_ids)
+
+        if removed or added or moved:
+            _changed(slideshow, removed.union(added))
+
+
+def add_pictures(slideshow, picture_ids):
+    """Append pictures to the end of a slideshow"""
+    current = list(slideshow.memberships.values_list("picture_id", flat=True))
+    set_pictures(slideshow, current + list(picture_ids))
+
+
+def reorder_pictures(slideshow, picture_ids):
+    """Reorder the pictures of a slideshow, writing only the rows that moved
+
+    picture_ids must list every picture of the slideshow exactly once.
+    Returns the number of rows written.
+    """
+    with transaction.atomic():
+        _lock(slideshow)
+        memberships = list(slideshow.memberships.all())
+        if sorted(picture_ids) != sorted(m.picture_id for m in memberships):
+            raise ValueError("Every picture of the slideshow must be listed once")
+
+        moved = _write_order(memberships, picture_ids)
+        if moved:
+            _changed(slideshow)
+    return len(moved)
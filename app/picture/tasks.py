@@ -0,0 +1,24 @@
+from django.utils import timezone
+
+from core.cache import bump_generation
+from core.models import Picture, PictureUpload
+from picture.renditions import generate_renditions
+from picture.uploads import discard_upload
+
+
+def generate_picture_renditions(picture_id):
+    """Background job generating the renditions of a picture"""
+    picture = Picture.objects.filter(pk=picture_id).first()
+    if picture is None:
+        return
+
+    generate_renditions(picture)
+    Picture.objects.filter(pk=picture_id).update(updated_at=timezone.now())
+    bump_generation(picture.user_id)
+
+
+def expire_picture_upload(upload_id):
+    """Background job discarding an upload that was never finished"""
+    upload = PictureUpload.objects.filter(pk=upload_id).first()
+    if upload is not None:
+        discard_upload(upload)
@@ -1,13 +1,19 @@
+import hashlib
+import io
 import tempfile
 import os
+from unittest.mock import patch
 
 from PIL import Image
 
 
 from picture.serializers import PictureSerializer, PictureDetailSerializer
+from core.jobs import run_pending
+from picture.metadata import update_metadata
 from core.models import Picture
+from core.tests.query_budget import QueryBudgetMixin
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -20,6 +26,21 @@ def image_upload_url(picture_id):
     return reverse("picture:picture-upload-image", args=[picture_id])
 
 
+def uploads_url(picture_id):
+    """Return URL to start a chunked image upload"""
+    return reverse("picture:picture-start-upload", args=[picture_id])
+
+
+def upload_url(picture_id, upload_id):
+    """Return URL of a chunked image upload"""
+    return reverse("picture:picture-upload-chunk", args=[picture_id, upload_id])
+
+
+def finish_url(picture_id, upload_id):
+    """Return URL to finish a chunked image upload"""
+    return reverse("picture:picture-finish-upload", args=[picture_id, upload_id])
+
+
 def detail_url(picture_id):
     """Return picture detail URL"""
     return reverse("picture:picture-detail", args=[picture_id])
@@ -46,7 +67,7 @@ class PublicPictureApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivatePictureApiTests(TestCase):
+class PrivatePictureApiTests(QueryBudgetMixin, TestCase):
     """Test Authenticated picture API access"""
 
     def setUp(self):
@@ -66,7 +87,7 @@ class PrivatePictureApiTests(TestCase):
         pictures = Picture.objects.all().order_by("-id")
         serializer = PictureSerializer(pictures, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_pictures_limited_to_user(self):
         """Test retrieving pictures for the user"""
@@ -81,7 +102,13 @@ class PrivatePictureApiTests(TestCase):
         pictures = Picture.objects.filter(user=self.user)
         serializer = PictureSerializer(pictures, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_pictures_query_count_constant(self):
+        """Test listing pictures does not run a query per picture"""
+        self.assertConstantQueries(
+            PICTURES_URL, lambda i: sample_picture(user=self.user)
+        )
 
     def test_view_picture_detail(self):
         """Test viewing a picture detail"""
@@ -104,6 +131,8 @@ class PictureImageUploadTests(TestCase):
         self.picture = sample_picture(user=self.user)
 
     def tearDown(self):
+        for rendition in self.picture.renditions.all():
+            rendition.image.delete()
         self.picture.image.delete()
 
     def test_upload_image_to_picture(self):
@@ -120,9 +149,252 @@ class PictureImageUploadTests(TestCase):
         self.assertIn("image", res.data)
         self.assertTrue(os.path.exists(self.picture.image.path))
 
+    def test_upload_image_stores_metadata(self):
+        """Test uploading an image stores its size, color and placeholder"""
+        buffer = io.BytesIO()
+        Image.new("RGB", (300, 200), (255, 0, 0)).save(buffer, format="PNG")
+        upload = io.BytesIO(buffer.getvalue())
+        upload.name = "red.png"
+
+        res = self.client.post(
+            image_upload_url(self.picture.id), {"image": upload}, format="multipart"
+        )
+
+        self.assertEqual(res.data["width"], 300)
+        self.assertEqual(res.data["height"], 200)
+        self.assertEqual(res.data["format"], "png")
+        self.assertEqual(res.data["byte_size"], len(buffer.getvalue()))
+        self.assertEqual(res.data["dominant_color"], "#ff0000")
+        self.assertTrue(res.data["placeholder"].startswith("data:image/jpeg;base64,"))
+        self.picture.refresh_from_db()
+        self.assertEqual(self.picture.width, 300)
+
     def test_upload_image_bad_request(self):
         """test uploading an invalid image"""
         url = image_upload_url(self.picture.id)
         res = self.client.post(url, {"image": "notimage"}, format="multipart")
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_image_generates_renditions(self):
+        """Test uploading an image queues generation of smaller renditions"""
+        url = image_upload_url(self.picture.id)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            img = Image.new("RGB", (800, 600))
+            img.save(ntf, format="JPEG")
+            ntf.seek(0)
+            res = self.client.post(url, {"image": ntf}, format="multipart")
+
+        self.picture.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["renditions"], [])
+        self.assertEqual(run_pending(), 1)
+
+        res = self.client.get(detail_url(self.picture.id))
+        renditions = self.picture.renditions.all()
+        self.assertEqual(
+            sorted((r.width, r.height, r.format) for r in renditions),
+            [
+                (320, 240, "jpeg"),
+                (320, 240, "webp"),
+                (640, 480, "jpeg"),
+                (640, 480, "webp"),
+            ],
+        )
+        for rendition in renditions:
+            self.assertTrue(os.path.exists(rendition.image.path))
+            self.assertEqual(
+                os.path.dirname(rendition.image.name),
+                os.path.dirname(self.picture.image.name),
+            )
+        self.assertEqual(len(res.data["renditions"]), 4)
+
+        with Image.open(renditions.get(width=320, format="webp").image.path) as webp:
+            self.assertEqual(webp.format, "WEBP")
+            self.assertEqual(webp.size, (320, 240))
+
+    def test_identical_uploads_share_files(self):
+        """Test uploading the same image twice stores and renders it once"""
+        picture2 = sample_picture(user=self.user, caption="copy")
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), "blue").save(buffer, format="JPEG")
+        content = buffer.getvalue()
+        for picture in (self.picture, picture2):
+            upload = io.BytesIO(content)
+            upload.name = "portrait.jpg"
+            self.client.post(
+                image_upload_url(picture.id), {"image": upload}, format="multipart"
+            )
+        self.assertEqual(run_pending(), 2)
+
+        self.picture.refresh_from_db()
+        picture2.refresh_from_db()
+        with patch("picture.metadata.image_metadata") as image_metadata:
+            update_metadata(picture2)
+        image_metadata.assert_not_called()
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(self.picture.image.name, f"uploads/picture/{digest}.jpg")
+        self.assertEqual(picture2.image.name, self.picture.image.name)
+        self.assertEqual(
+            sorted(picture2.renditions.values_list("image", flat=True)),
+            sorted(self.picture.renditions.values_list("image", flat=True)),
+        )
+        self.assertEqual(picture2.renditions.count(), 4)
+        self.assertEqual(
+            (picture2.width, picture2.height, picture2.placeholder),
+            (800, 600, self.picture.placeholder),
+        )
+
+
+class ChunkedPictureUploadTests(TestCase):
+    """Test resumable chunked picture image uploads"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@andrewtdunn.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.picture = sample_picture(user=self.user)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            CHUNKED_UPLOAD_DIR=self.temp_dir.name
+        )
+        self.settings_override.enable()
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (50, 50), "red").save(buffer, format="JPEG")
+        self.content = buffer.getvalue()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.temp_dir.cleanup()
+        self.picture.image.delete()
+
+    def start_upload(self, **params):
+        """Start an upload of self.content and return its response"""
+        payload = {
+            "filename": "portrait.jpg",
+            "size": len(self.content),
+            "checksum": hashlib.sha256(self.content).hexdigest(),
+        }
+        payload.update(params)
+        return self.client.post(uploads_url(self.picture.id), payload)
+
+    def put_chunk(self, upload_id, start, end):
+        """Send content[start:end + 1] as a chunk of an upload"""
+        chunk = self.content[start:][: end - start + 1]
+        return self.client.put(
+            upload_url(self.picture.id, upload_id),
+            chunk,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(self.content)}",
+        )
+
+    def test_chunked_upload(self):
+        """Test an image sent in chunks is attached to the picture"""
+        upload_id = self.start_upload().data["id"]
+        middle = len(self.content) // 2
+
+        res1 = self.put_chunk(upload_id, 0, middle - 1)
+        res2 = self.put_chunk(upload_id, middle, len(self.content) - 1)
+        res = self.client.post(finish_url(self.picture.id, upload_id))
+
+        self.assertEqual(res1.data["offset"], middle)
+        self.assertEqual(res2.data["offset"], len(self.content))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.picture.refresh_from_db()
+        with self.picture.image.open("rb") as image_file:
+            self.assertEqual(image_file.read(), self.content)
+        self.assertFalse(self.picture.uploads.exists())
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_resume_reports_offset(self):
+        """Test an upload's offset can be fetched to resume it"""
+        upload_id = self.start_upload().data["id"]
+        self.put_chunk(upload_id, 0, 99)
+
+        res = self.client.get(upload_url(self.picture.id, upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["offset"], 100)
+
+    def test_chunk_out_of_order_conflicts(self):
+        """Test a chunk not starting at the offset is rejected"""
+        upload_id = self.start_upload().data["id"]
+        self.put_chunk(upload_id, 0, 99)
+
+        res = self.put_chunk(upload_id, 50, 149)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["offset"], 100)
+
+    def test_chunk_requires_content_range(self):
+        """Test a chunk without a valid Content-Range is rejected"""
+        upload_id = self.start_upload().data["id"]
+
+        res = self.client.put(
+            upload_url(self.picture.id, upload_id),
+            self.content,
+            content_type="application/octet-stream",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chunk_with_empty_body(self):
+        """Test a chunk with an empty body is rejected as too short"""
+        upload_id = self.start_upload().data["id"]
+
+        res = self.client.put(
+            upload_url(self.picture.id, upload_id),
+            b"",
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes 0-0/{len(self.content)}",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["offset"], 0)
+
+    def test_finish_checksum_mismatch(self):
+        """Test an upload whose checksum does not match is not attached"""
+        upload_id = self.start_upload(checksum="0" * 64).data["id"]
+        self.put_chunk(upload_id, 0, len(self.content) - 1)
+
+        res = self.client.post(finish_url(self.picture.id, upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.picture.refresh_from_db()
+        self.assertFalse(self.picture.image)
+
+    def test_finish_incomplete_upload(self):
+        """Test an upload cannot be finished before all chunks arrive"""
+        upload_id = self.start_upload().data["id"]
+        self.put_chunk(upload_id, 0, 99)
+
+        res = self.client.post(finish_url(self.picture.id, upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["offset"], 100)
+
+    def test_malformed_upload_id_not_found(self):
+        """Test an upload id that is not a UUID is not found"""
+        upload_id = self.start_upload().data["id"]
+        url = finish_url(self.picture.id, upload_id).replace(upload_id, "abc")
+
+        res = self.client.post(url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_upload_limited_to_user(self):
+        """Test uploads to another user's picture are not found"""
+        user2 = get_user_model().objects.create_user(
+            "other@andrewtdunn.com", "testpass"
+        )
+        picture = sample_picture(user=user2)
+
+        res = self.client.post(
+            uploads_url(picture.id),
+            {"filename": "a.jpg", "size": 10, "checksum": "0" * 64},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
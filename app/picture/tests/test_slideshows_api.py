@@ -1,10 +1,12 @@
 from picture.serializers import SlideshowSerializer
 from core.models import Slideshow
+from core.tests.query_budget import QueryBudgetMixin
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
+from picture.slideshows import add_pictures
 from picture.tests.test_pictures_api import sample_picture
 
 SLIDESHOWS_URL = reverse("picture:slideshow-list")
@@ -15,11 +17,15 @@ def sample_slideshow(user, title="sample slideshow"):
     picture1 = sample_picture(user=user)
     picture2 = sample_picture(user=user)
     slideshow = Slideshow.objects.create(user=user, title=title)
-    slideshow.pictures.add(picture1)
-    slideshow.pictures.add(picture2)
+    add_pictures(slideshow, [picture1.id, picture2.id])
     return slideshow
 
 
+def reorder_url(slideshow_id):
+    """Return slideshow reorder URL"""
+    return reverse("picture:slideshow-reorder", args=[slideshow_id])
+
+
 def detail_url(slideshow_id):
     """Return slideshow detail URL"""
     return reverse("picture:slideshow-detail", args=[slideshow_id])
@@ -37,7 +43,7 @@ class PublicSlideshowAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateSlideshowAPITests(TestCase):
+class PrivateSlideshowAPITests(QueryBudgetMixin, TestCase):
     """Test authenticated slideshow API access"""
 
     def setUp(self):
@@ -57,7 +63,7 @@ class PrivateSlideshowAPITests(TestCase):
         slideshows = Slideshow.objects.all().order_by("-id")
         serializer = SlideshowSerializer(slideshows, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_slideshow_limited_to_user(self):
         """Test retreiving slideshows for user"""
@@ -72,7 +78,13 @@ class PrivateSlideshowAPITests(TestCase):
         slideshows = Slideshow.objects.filter(user=self.user)
         serializer = SlideshowSerializer(slideshows, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_slideshows_query_count_constant(self):
+        """Test listing slideshows does not run a query per slideshow"""
+        self.assertConstantQueries(
+            SLIDESHOWS_URL, lambda i: sample_slideshow(user=self.user)
+        )
 
     def test_create_slideshow_with_pictures(self):
         """Test creating slideshow with pictures"""
@@ -92,7 +104,7 @@ class PrivateSlideshowAPITests(TestCase):
     def test_partial_update_slideshow(self):
         """Test updating a slideshow with patch"""
         slideshow = sample_slideshow(user=self.user)
-        slideshow.pictures.add(sample_picture(user=self.user))
+        add_pictures(slideshow, [sample_picture(user=self.user).id])
         new_picture = sample_picture(user=self.user, caption="Sample Picture 2")
 
         payload = {"title": "Sample Slideshow", "pictures": [new_picture.id]}
@@ -108,7 +120,7 @@ class PrivateSlideshowAPITests(TestCase):
     def test_full_update_slideshow(self):
         """Test updating a slideshow with put"""
         slideshow = sample_slideshow(user=self.user)
-        slideshow.pictures.add(sample_picture(user=self.user))
+        add_pictures(slideshow, [sample_picture(user=self.user).id])
         payload = {"title": "JT"}
         url = detail_url(slideshow.id)
         self.client.put(url, payload)
@@ -117,3 +129,102 @@ class PrivateSlideshowAPITests(TestCase):
         self.assertEqual(slideshow.title, payload["title"])
         pictures = slideshow.pictures.all()
         self.assertEqual(len(pictures), 0)
+
+
+class SlideshowOrderTests(TestCase):
+    """Test the order of pictures in a slideshow"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.pictures = [sample_picture(user=self.user) for _ in range(5)]
+        self.ids = [picture.id for picture in self.pictures]
+        self.slideshow = Slideshow.objects.create(user=self.user, title="Travel")
+        add_pictures(self.slideshow, self.ids)
+
+    def positions(self):
+        return dict(self.slideshow.memberships.values_list("picture_id", "position"))
+
+    def test_pictures_keep_their_order(self):
+        """Test pictures are returned in the order they were given"""
+        order = [self.ids[3], self.ids[0], self.ids[4]]
+        res = self.client.post(SLIDESHOWS_URL, {"title": "Ordered", "pictures": order})
+
+        res = self.client.get(detail_url(res.data["id"]))
+
+        self.assertEqual(res.data["pictures"], order)
+
+    def test_reorder_moves_one_row(self):
+        """Test moving a single picture writes only its row"""
+        before = self.positions()
+        order = self.ids[1:4] + self.ids[:1] + self.ids[4:]
+
+        res = self.client.post(
+            reorder_url(self.slideshow.id), {"pictures": order}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["pictures"], order)
+        after = self.positions()
+        moved = [pk for pk in self.ids if before[pk] != after[pk]]
+        self.assertEqual(moved, [self.ids[0]])
+
+    def test_reorder_reversed(self):
+        """Test reversing a slideshow keeps one picture in place"""
+        before = self.positions()
+        order = self.ids[::-1]
+
+        res = self.client.post(
+            reorder_url(self.slideshow.id), {"pictures": order}, format="json"
+        )
+
+        self.assertEqual(res.data["pictures"], order)
+        after = self.positions()
+        self.assertEqual(sum(before[pk] == after[pk] for pk in self.ids), 1)
+
+    def test_reorder_respaces_when_gap_exhausted(self):
+        """Test positions are spread out again once a gap is used up"""
+        for _ in range(12):
+            order = [self.ids[0], self.ids[2], self.ids[1]] + self.ids[3:]
+            self.client.post(
+                reorder_url(self.slideshow.id), {"pictures": order}, format="json"
+            )
+            order = self.ids
+            self.client.post(
+                reorder_url(self.slideshow.id), {"pictures": order}, format="json"
+            )
+
+        res = self.client.get(detail_url(self.slideshow.id))
+
+        self.assertEqual(res.data["pictures"], self.ids)
+        self.assertEqual(len(set(self.positions().values())), len(self.ids))
+
+    def test_reorder_requires_every_picture(self):
+        """Test a reorder must list each picture of the slideshow once"""
+        res = self.client.post(
+            reorder_url(self.slideshow.id),
+            {"pictures": self.ids[:4] + self.ids[:1]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_keeps_unmoved_rows(self):
+        """Test replacing the pictures keeps the rows that stay in order"""
+        before = self.positions()
+        new_picture = sample_picture(user=self.user)
+        order = self.ids[:2] + [new_picture.id] + self.ids[3:]
+
+        self.client.patch(
+            detail_url(self.slideshow.id), {"pictures": order}, format="json"
+        )
+
+        after = self.positions()
+        self.assertEqual(list(after), sorted(after, key=after.get))
+        for pk in self.ids[:2] + self.ids[3:]:
+            self.assertEqual(before[pk], after[pk])
+        res = self.client.get(detail_url(self.slideshow.id))
+        self.assertEqual(res.data["pictures"], order)
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from PIL import Image
+
+from core.files import release_files
+from core.models import PictureUpload
+from picture.metadata import update_metadata
+
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class ChunkError(Exception):
+    """A chunk or upload is malformed"""
+
+
+class OffsetConflict(ChunkError):
+    """A chunk does not start at the upload's current offset"""
+
+
+def parse_content_range(header):
+    """Return (start, end, total) of a Content-Range header, end inclusive"""
+    match = CONTENT_RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        raise ChunkError("Content-Range must be of the form 'bytes start-end/total'")
+    start, end, total = (int(value) for value in match.groups())
+    if end < start:
+        raise ChunkError("Content-Range end is before its start")
+    return start, end, total
+
+
+def start_upload(picture, filename, size, checksum):
+    """Create an upload session and the empty file receiving its chunks"""
+    upload = PictureUpload.objects.create(
+        picture=picture, filename=filename, size=size, checksum=checksum.lower()
+    )
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(upload.temp_path, "wb").close()
+    return upload
+
+
+def write_chunk(upload, stream, start, end, total):
+    """Stream a chunk into the upload's file and advance its offset
+
+    The chunk must start where the previous one ended. The offset is only
+    advanced if it is still at start, so of two requests racing for the same
+    range one wins and the other is told the new offset. A stream of None,
+    which is what an empty request body gives, reads as no bytes.
+    """
+    if total != upload.size:
+        raise ChunkError("Content-Range total does not match the upload size")
+    if end >= upload.size:
+        raise ChunkError("Content-Range ends past the upload size")
+    if start != upload.offset:
+        raise OffsetConflict(f"Chunk must start at offset {upload.offset}")
+
+    remaining = end - start + 1
+    with open(upload.temp_path, "r+b") as temp_file:
+        temp_file.seek(start)
+        while remaining and stream is not None:
+            data = stream.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            temp_file.write(data)
+            remaining -= len(data)
+    if remaining:
+        raise ChunkError("Chunk body is shorter than its Content-Range")
+
+    updated = PictureUpload.objects.filter(pk=upload.pk, offset=start).update(
+        offset=end + 1
+    )
+    upload.refresh_from_db(fields=["offset"])
+    if not updated:
+        raise OffsetConflict(f"Chunk must start at offset {upload.offset}")
+    return upload
+
+
+def file_checksum(path):
+    """Return the hex SHA-256 digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as temp_file:
+        for data in iter(lambda: temp_file.read(CHUNK_SIZE), b""):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def finish_upload(upload):
+    """Verify a complete upload and attach it as its picture's image"""
+    if upload.offset != upload.size:
+        raise ChunkError(f"Upload is incomplete at offset {upload.offset}")
+    if file_checksum(upload.temp_path) != upload.checksum:
+        raise ChunkError("Upload checksum does not match")
+    try:
+        with Image.open(upload.temp_path) as image:
+            image.verify()
+    except Exception:
+        raise ChunkError("Upload a valid image")
+
+    picture = upload.picture
+    previous = picture.image.name
+    with open(upload.temp_path, "rb") as temp_file, transaction.atomic():
+        content = File(temp_file)
+        # Already verified above, so the storage need not hash it again
+        content.content_hash = upload.checksum
+        picture.image.save(upload.filename, content)
+        update_metadata(picture)
+        release_files(picture.image.storage, [previous])
+    discard_upload(upload)
+    return picture
+
+
+def discard_upload(upload):
+    """Delete an upload session and its partial file"""
+    try:
+        os.remove(upload.temp_path)
+    except FileNotFoundError:
+        pass
+    upload.delete()
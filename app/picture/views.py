@@ -1,55 +1,166 @@
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from core.bulk import BulkModelMixin
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalResponseMixin
+from core.fastpath import FastListMixin
+from core.files import release_files
+from core.jobs import enqueue
 from core.models import Picture, Slideshow
-from picture import serializers
-
-
-class PictureViewSet(viewsets.ModelViewSet):
+from core.pagination import KeysetPagination
+from core.prefetch import prefetch_for_serializer
+from core.sparse import SparseFieldsMixin
+from picture import serializers, slideshows, uploads
+from picture.metadata import update_metadata
+from picture.tasks import expire_picture_upload, generate_picture_renditions
+from user.authentication import SignedTokenAuthentication
+
+# Upload ids are UUIDs; anything else must not reach the UUID primary key
+UPLOAD_ID_PATTERN = (
+    r"(?P<upload_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})"
+)
+
+
+class PictureViewSet(
+    BulkModelMixin,
+    ConditionalResponseMixin,
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     """Manage pictures in the database"""
 
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (SignedTokenAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
     queryset = Picture.objects.all()
     serializer_class = serializers.PictureSerializer
+    ordering = "-caption"
 
     def get_queryset(self):
         """Return objects for the current authenticated user"""
-        return self.queryset.filter(user=self.request.user).order_by("-caption")
+        queryset = prefetch_for_serializer(self.queryset, self.get_serializer_class())
+        return queryset.filter(user=self.request.user).order_by("-caption")
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
-        if self.action == "upload_image":
+        if self.action in ("upload_image", "finish_upload"):
             return serializers.PictureImageSerializer
 
+        if self.action in ("start_upload", "upload_chunk"):
+            return serializers.PictureUploadSerializer
+
+        serializer_class = self.serializer_class
         if self.action == "retrieve":
-            return serializers.PictureDetailSerializer
+            serializer_class = serializers.PictureDetailSerializer
 
-        return self.serializer_class
+        return self.get_sparse_serializer_class(serializer_class)
 
     @action(methods=["POST"], detail=True, url_path="upload-image")
     def upload_image(self, request, pk=None):
         """Upload an image to a picture"""
         picture = self.get_object()
+        previous = picture.image.name
         serializer = self.get_serializer(picture, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                update_metadata(picture)
+                release_files(picture.image.storage, [previous])
+            enqueue(generate_picture_renditions, picture_id=picture.id)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-
-class SlideshowViewSet(viewsets.ModelViewSet):
+    @action(methods=["POST"], detail=True, url_path="uploads")
+    def start_upload(self, request, pk=None):
+        """Start a resumable chunked upload of a picture's image"""
+        picture = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        upload = uploads.start_upload(picture, **serializer.validated_data)
+        enqueue(
+            expire_picture_upload,
+            delay=settings.CHUNKED_UPLOAD_EXPIRY,
+            upload_id=str(upload.id),
+        )
+        return Response(
+            self.get_serializer(upload).data, status=status.HTTP_201_CREATED
+        )
+
+    @action(
+        methods=["GET", "PUT"],
+        detail=True,
+        url_path=f"uploads/{UPLOAD_ID_PATTERN}",
+    )
+    def upload_chunk(self, request, pk=None, upload_id=None):
+        """Report the offset of an upload or append a chunk to it
+
+        Chunks are sent raw with a ``Content-Range: bytes start-end/total``
+        header and streamed to disk. A chunk that does not start at the
+        current offset is rejected with 409 and the offset to resume from.
+        """
+        upload = get_object_or_404(self.get_object().uploads, pk=upload_id)
+        if request.method == "PUT":
+            try:
+                start, end, total = uploads.parse_content_range(
+                    request.META.get("HTTP_CONTENT_RANGE")
+                )
+                uploads.write_chunk(upload, request.stream, start, end, total)
+            except uploads.OffsetConflict as exc:
+                return Response(
+                    {"detail": str(exc), "offset": upload.offset},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            except uploads.ChunkError as exc:
+                return Response(
+                    {"detail": str(exc), "offset": upload.offset},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        return Response(self.get_serializer(upload).data)
+
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path=f"uploads/{UPLOAD_ID_PATTERN}/finish",
+    )
+    def finish_upload(self, request, pk=None, upload_id=None):
+        """Verify a complete upload and attach it as the picture's image"""
+        upload = get_object_or_404(self.get_object().uploads, pk=upload_id)
+        try:
+            picture = uploads.finish_upload(upload)
+        except uploads.ChunkError as exc:
+            return Response(
+                {"detail": str(exc), "offset": upload.offset},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        enqueue(generate_picture_renditions, picture_id=picture.id)
+        return Response(self.get_serializer(picture).data)
+
+
+class SlideshowViewSet(
+    ConditionalResponseMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     """Manage pictures in the database"""
 
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (SignedTokenAuthentication, TokenAuthentication)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
     queryset = Slideshow.objects.all()
     serializer_class = serializers.SlideshowSerializer
+    ordering = "-title"
 
     def perform_create(self, serializer):
         """Create a new tag"""
@@ -57,4 +168,36 @@ class SlideshowViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Return objects for the current authenticated user"""
-        return self.queryset.filter(user=self.request.user).order_by("-title")
+        queryset = prefetch_for_serializer(self.queryset, self.get_serializer_class())
+        return queryset.filter(user=self.request.user).order_by("-title")
+
+    def get_serializer_class(self):
+        """Return appropriate serializer class"""
+        if self.action == "reorder":
+            return serializers.SlideshowReorderSerializer
+
+        return self.serializer_class
+
+    @action(methods=["POST"], detail=True, url_path="reorder")
+    def reorder(self, request, pk=None):
+        """Reorder the pictures of a slideshow
+
+        Only the pictures that moved relative to the others are written.
+        """
+        slideshow = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            slideshows.reorder_pictures(
+                slideshow, serializer.validated_data["pictures"]
+            )
+        except ValueError as exc:
+            return Response(
+                {"pictures": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        slideshow = prefetch_for_serializer(
+            Slideshow.objects.filter(pk=slideshow.pk), self.serializer_class
+        ).get()
+        return Response(self.serializer_class(slideshow).data)
@@ -1,13 +1,36 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
 from core.models import Project, Slideshow
+from picture.serializers import SlideshowDetailSerializer
 
 
 class ProjectSerializer(serializers.ModelSerializer):
     """Serializer for a project object"""
 
-    slideshow = serializers.PrimarKeyRelatedField(queryset=Slideshow.objects.all())
+    slideshow = serializers.PrimaryKeyRelatedField(
+        queryset=Slideshow.objects.all(),
+        allow_null=True,
+        default=None,
+        validators=[UniqueValidator(queryset=Project.objects.all())],
+    )
 
     class Meta:
         model = Project
-        fields = ("id", "title", "tagline", "slideshow")
+        fields = ("id", "title", "tagline", "slideshow", "published")
+        read_only_fields = ("id",)
+
+    def validate_slideshow(self, value):
+        """Check the slideshow belongs to the requesting user"""
+        request = self.context.get("request")
+        if value is not None and request and value.user_id != request.user.id:
+            raise serializers.ValidationError(
+                f'Invalid pk "{value.pk}" - object does not exist.'
+            )
+        return value
+
+
+class ProjectDetailSerializer(ProjectSerializer):
+    """Serialize a project with its slideshow and pictures"""
+
+    slideshow = SlideshowDetailSerializer(read_only=True)
@@ -1,10 +1,12 @@
-from portfolio.serializers import ProjectDetailSerializer, ProjectSerializer
+from portfolio.serializers import ProjectDetailSerializer
 from core.models import Project
+from core.tests.query_budget import QueryBudgetMixin
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
+from picture.slideshows import reorder_pictures
 from picture.tests.test_slideshows_api import sample_slideshow
 
 PROJECT_URL = reverse("portfolio:project-list")
@@ -12,7 +14,7 @@ PROJECT_URL = reverse("portfolio:project-list")
 
 def detail_url(project_id):
     """Return project detail URL"""
-    return reverse("project:project-detail", args=[project_id])
+    return reverse("portfolio:project-detail", args=[project_id])
 
 
 def sample_project(user, **params):
@@ -33,28 +35,30 @@ class PublicProjectApiTests(TestCase):
         """Test that authentication is required"""
         res = self.client.get(PROJECT_URL)
 
-        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHENTICATED)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateProjectApiTests(TestCase):
+class PrivateProjectApiTests(QueryBudgetMixin, TestCase):
     """Test authenticated project API access"""
 
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create("test@andrewtdunn.com", "testpass")
+        self.user = get_user_model().objects.create_user(
+            "test@andrewtdunn.com", "testpass"
+        )
         self.client.force_authenticate(self.user)
 
     def test_retrieve_projects(self):
-        """Test retrieving a list of projects"""
-        sample_project(user=self.user)
+        """Test retrieving a list of projects with their slideshows"""
         sample_project(user=self.user)
+        sample_project(user=self.user, slideshow=sample_slideshow(user=self.user))
 
         res = self.client.get(PROJECT_URL)
 
         projects = Project.objects.all().order_by("-id")
-        serializer = ProjectSerializer(projects, many=True)
+        serializer = ProjectDetailSerializer(projects, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_projects_limited_to_user(self):
         """Test retrieving projects fro user"""
@@ -67,55 +71,126 @@ class PrivateProjectApiTests(TestCase):
         res = self.client.get(PROJECT_URL)
 
         projects = Project.objects.filter(user=self.user)
-        serializer = ProjectSerializer(projects, many=True)
+        serializer = ProjectDetailSerializer(projects, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_projects_query_count_constant(self):
+        """Test listing projects does not run a query per project or picture"""
+        self.assertConstantQueries(
+            PROJECT_URL,
+            lambda i: sample_project(
+                user=self.user, slideshow=sample_slideshow(user=self.user)
+            ),
+        )
 
     def test_view_project_detail(self):
         """Test viewing a project detail"""
         project = sample_project(user=self.user)
         project.slideshow = sample_slideshow(user=self.user)
+        project.save()
 
         url = detail_url(project.id)
         res = self.client.get(url)
 
         serializer = ProjectDetailSerializer(project)
         self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data["slideshow"]["pictures"]), 2)
+
+    def test_project_detail_pictures_in_slideshow_order(self):
+        """Test nested pictures follow the slideshow order"""
+        slideshow = sample_slideshow(user=self.user)
+        project = sample_project(user=self.user, slideshow=slideshow)
+        order = list(slideshow.memberships.values_list("picture_id", flat=True))[::-1]
+        reorder_pictures(slideshow, order)
+
+        res = self.client.get(detail_url(project.id))
+
+        self.assertEqual(
+            [picture["id"] for picture in res.data["slideshow"]["pictures"]], order
+        )
+
+    def test_reorder_changes_list_etag(self):
+        """Test reordering a nested slideshow changes the list validators"""
+        slideshow = sample_slideshow(user=self.user)
+        sample_project(user=self.user, slideshow=slideshow)
+        etag = self.client.get(PROJECT_URL)["ETag"]
+        order = list(slideshow.memberships.values_list("picture_id", flat=True))
+        reorder_pictures(slideshow, order[::-1])
+
+        res = self.client.get(PROJECT_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_create_project_with_slideshow(self):
         """Test creatign project with slideshow"""
         slideshow1 = sample_slideshow(user=self.user)
-        payload = {"title": "Google", "tagline": "tagline one", "slideshow": slideshow1}
+        payload = {
+            "title": "Google",
+            "tagline": "tagline one",
+            "slideshow": slideshow1.id,
+        }
         res = self.client.post(PROJECT_URL, payload)
 
-        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         project = Project.objects.get(id=res.data["id"])
         slideshow = project.slideshow
         self.assertEqual(slideshow1, slideshow)
 
+    def test_create_project_with_other_users_slideshow(self):
+        """Test a project cannot use another user's slideshow"""
+        user2 = get_user_model().objects.create_user(
+            "other@andrewtdunn.com", "testpass"
+        )
+        payload = {"title": "Google", "slideshow": sample_slideshow(user=user2).id}
+
+        res = self.client.post(PROJECT_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_project_with_used_slideshow(self):
+        """Test a slideshow cannot be shown by two projects"""
+        slideshow = sample_slideshow(user=self.user)
+        project = sample_project(user=self.user, slideshow=slideshow)
+        other = sample_project(user=self.user, title="Time Inc")
+
+        payload = {"title": "Google", "slideshow": slideshow.id}
+        res = self.client.post(PROJECT_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("slideshow", res.data)
+
+        res = self.client.patch(detail_url(other.id), {"slideshow": slideshow.id})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.patch(detail_url(project.id), {"slideshow": slideshow.id})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     def test_partial_update_blog(self):
         """Test updateing a project with patch"""
         project = sample_project(user=self.user)
         project.slideshow = sample_slideshow(user=self.user, title="Google")
+        project.save()
         new_slideshow = sample_slideshow(user=self.user, title="Time Inc")
 
         payload = {"title": "New title", "slideshow": new_slideshow.id}
         url = detail_url(project.id)
-        self.client.put(url, payload)
+        self.client.patch(url, payload)
 
         project.refresh_from_db()
         self.assertEqual(project.title, payload["title"])
+        self.assertEqual(project.slideshow, new_slideshow)
 
     def test_full_update_blog(self):
         """Test updating a project with put"""
         project = sample_project(user=self.user)
         project.slideshow = sample_slideshow(user=self.user)
+        project.save()
         payload = {"title": "Google", "tagline": "test1"}
         url = detail_url(project.id)
         self.client.put(url, payload)
 
         project.refresh_from_db()
         self.assertEqual(project.title, payload["title"])
-        self.assertEqual(project.taglind, payload["tagline"])
+        self.assertEqual(project.tagline, payload["tagline"])
         slideshow = project.slideshow
         self.assertEqual(slideshow, None)
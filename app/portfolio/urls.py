@@ -0,0 +1,11 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from portfolio import views
+
+router = DefaultRouter()
+router.register("projects", views.ProjectViewSet)
+
+app_name = "portfolio"
+
+urlpatterns = [path("", include(router.urls))]
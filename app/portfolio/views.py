@@ -1,3 +1,46 @@
-# from django.shortcuts import render
+from rest_framework import viewsets
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import IsAuthenticated
 
-# Create your views here.
+from core.cache import CachedResponseMixin
+from core.conditional import ConditionalResponseMixin
+from core.models import Project
+from core.pagination import KeysetPagination
+from core.prefetch import prefetch_for_serializer
+from portfolio import serializers
+from user.authentication import SignedTokenAuthentication
+
+
+class ProjectViewSet(
+    ConditionalResponseMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
+    """Manage portfolio projects in the database
+
+    Projects are read with their slideshow and its pictures nested, in a
+    fixed number of queries however many projects and pictures there are.
+    """
+
+    authentication_classes = (SignedTokenAuthentication, TokenAuthentication)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    queryset = Project.objects.all()
+    serializer_class = serializers.ProjectSerializer
+    ordering = "-id"
+    conditional_related = ("slideshow", "slideshow__pictures")
+    conditional_list_related = conditional_related
+
+    def get_queryset(self):
+        """Return objects for the current authenticated user"""
+        queryset = prefetch_for_serializer(self.queryset, self.get_serializer_class())
+        return queryset.filter(user=self.request.user).order_by("-id")
+
+    def get_serializer_class(self):
+        """Return appropriate serializer class"""
+        if self.action in ("list", "retrieve"):
+            return serializers.ProjectDetailSerializer
+
+        return self.serializer_class
+
+    def perform_create(self, serializer):
+        """Create a new project"""
+        serializer.save(user=self.request.user)
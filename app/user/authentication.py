@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import get_cache
+
+SIGNED_TOKEN_SALT = "user.signed-token"
+
+
+def issue_signed_token(user):
+    """Return a signed token carrying the user id and revocation generation"""
+    payload = {"uid": user.pk, "gen": user.token_generation}
+    return signing.dumps(payload, salt=SIGNED_TOKEN_SALT)
+
+
+def _user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """Return the user with the given id, consulting the cache first"""
+    cache = get_cache()
+    key = _user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, settings.SIGNED_TOKEN_USER_CACHE_TIMEOUT)
+    return user
+
+
+def forget_cached_user(user_id):
+    """Drop a user from the cache so the next lookup hits the database"""
+    get_cache().delete(_user_cache_key(user_id))
+
+
+class SignedTokenAuthentication(TokenAuthentication):
+    """Stateless authentication with signed, expiring tokens
+
+    Clients pass the token issued by CreateTokenView in the "Authorization"
+    header, prepended with the string "Bearer ". The signature and expiry
+    are checked in memory and the user comes from a short-lived cache, so a
+    request does not need the token table. Bumping the user's
+    token_generation revokes every token issued before it.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate_credentials(self, key):
+        try:
+            payload = signing.loads(
+                key, salt=SIGNED_TOKEN_SALT, max_age=settings.SIGNED_TOKEN_MAX_AGE
+            )
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_("Token has expired."))
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        user = get_cached_user(payload.get("uid"))
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        if user.token_generation != payload.get("gen"):
+            raise exceptions.AuthenticationFailed(_("Token has been revoked."))
+
+        return (user, payload)
@@ -34,6 +34,7 @@ class AuthTokenSerializer(serializers.Serializer):
     password = serializers.CharField(
         style={"input_type": "password"}, trim_whitespace=False
     )
+    token_type = serializers.ChoiceField(choices=("db", "signed"), required=False)
 
     def validate(self, attrs):
         """Validate and authenticate the user"""
@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.authentication import issue_signed_token
+
+TOKEN_URL = reverse("user:token")
+REVOKE_URL = reverse("user:token-revoke")
+ME_URL = reverse("user:me")
+BLOG_URL = reverse("blog:blog-list")
+
+
+class SignedTokenTests(TestCase):
+    """Test the stateless signed token authentication"""
+
+    def setUp(self):
+        self.payload = {"email": "test@andrewtdunn.com", "password": "testpass"}
+        self.user = get_user_model().objects.create_user(**self.payload)
+        self.client = APIClient()
+
+    def test_create_signed_token(self):
+        """Test requesting a signed token"""
+        res = self.client.post(TOKEN_URL, {**self.payload, "token_type": "signed"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["keyword"], "Bearer")
+        self.assertIn("token", res.data)
+
+    @override_settings(AUTH_TOKEN_TYPE="signed")
+    def test_signed_token_default_type(self):
+        """Test AUTH_TOKEN_TYPE selects the token issued by default"""
+        res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.data["keyword"], "Bearer")
+
+    def test_authenticate_without_queries(self):
+        """Test a signed token authenticates from the cache"""
+        token = issue_signed_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_tampered_token_rejected(self):
+        """Test a token with a bad signature is rejected"""
+        token = issue_signed_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}x")
+
+        res = self.client.get(BLOG_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(SIGNED_TOKEN_MAX_AGE=-1)
+    def test_expired_token_rejected(self):
+        """Test an expired token is rejected"""
+        token = issue_signed_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_tokens(self):
+        """Test revoking invalidates both signed and database tokens"""
+        signed = issue_signed_token(self.user)
+        db_token = self.client.post(TOKEN_URL, self.payload).data["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {signed}")
+        self.assertEqual(self.client.get(ME_URL).status_code, status.HTTP_200_OK)
+
+        res = self.client.post(REVOKE_URL)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {db_token}")
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_keeps_newer_revocation(self):
+        """Test updating the profile through a cached user keeps newer fields"""
+        token = issue_signed_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            token_generation=F("token_generation") + 1
+        )
+
+        res = self.client.patch(ME_URL, {"name": "New name"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, "New name")
+        self.assertEqual(self.user.token_generation, 1)
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_database_token_still_accepted(self):
+        """Test database tokens keep working alongside signed tokens"""
+        token = self.client.post(TOKEN_URL, self.payload).data["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+        res = self.client.get(BLOG_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
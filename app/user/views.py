@@ -1,7 +1,18 @@
-from rest_framework import authentication, generics, permissions
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from rest_framework import authentication, generics, permissions, status
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from user.authentication import (
+    SignedTokenAuthentication,
+    forget_cached_user,
+    issue_signed_token,
+)
 from user.serializers import AuthTokenSerializer, UserSerializer
 
 
@@ -17,14 +28,68 @@ class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
+    def post(self, request, *args, **kwargs):
+        """Issue a database token or, if requested, a signed token"""
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+        token_type = serializer.validated_data.get(
+            "token_type", settings.AUTH_TOKEN_TYPE
+        )
+
+        if token_type == "signed":
+            return Response(
+                {
+                    "token": issue_signed_token(user),
+                    "keyword": SignedTokenAuthentication.keyword,
+                    "expires_in": settings.SIGNED_TOKEN_MAX_AGE,
+                }
+            )
+
+        token, created = Token.objects.get_or_create(user=user)
+        return Response({"token": token.key})
+
+
+class RevokeTokenView(APIView):
+    """Revoke every token issued to the authenticated user"""
+
+    authentication_classes = (
+        SignedTokenAuthentication,
+        authentication.TokenAuthentication,
+    )
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        """Invalidate outstanding signed tokens and delete the database token"""
+        # request.user may be a cached copy, so the bump is done in the row
+        user_id = request.user.pk
+        get_user_model().objects.filter(pk=user_id).update(
+            token_generation=F("token_generation") + 1
+        )
+        forget_cached_user(user_id)
+        Token.objects.filter(user_id=user_id).delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class ManagerUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (
+        SignedTokenAuthentication,
+        authentication.TokenAuthentication,
+    )
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
-        """Retrieve and return authenticated user"""
-        return self.request.user
+        """Retrieve and return authenticated user
+
+        The user authenticated may be a cached copy; writes reload it so
+        saving it never overwrites newer fields, such as a token revocation.
+        """
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        return get_user_model().objects.get(pk=self.request.user.pk)